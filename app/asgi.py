@@ -0,0 +1,260 @@
+"""
+ASGI entry point for the Admission Analysis System
+
+    uvicorn app.asgi:application
+
+Regular requests go to the Flask application through asgiref's WSGI adapter:
+the request body is received asynchronously and the view runs in a pool of
+ASGI_REQUEST_THREADS threads, so requests are served concurrently. Requests
+that wait for a long time are served natively on the event loop: the
+passing-score event stream, /generate_report and ?wait= of a report job
+await their job without holding a thread.
+"""
+
+import asyncio
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from tempfile import SpooledTemporaryFile
+from urllib.parse import parse_qsl, urlencode
+
+from asgiref.sync import AsyncToSync, sync_to_async
+from asgiref.wsgi import WsgiToAsgi, WsgiToAsgiInstance
+
+from app.main import create_app
+from app.controllers.main_controller import REPORT_WAIT_TIMEOUT, submit_report_job
+from app.utils import report_jobs
+from app.utils.score_events import EVENT_STREAM_HEADERS, broker
+
+
+# Path of the passing-score event stream (same as the Flask route)
+EVENTS_PATH = '/api/events/passing_scores'
+# Paths of the report routes awaited natively (same as the Flask routes)
+GENERATE_REPORT_PATH = '/generate_report'
+REPORT_STATUS_PATH = re.compile(r'^/api/reports/(?P<job_id>[0-9a-f]+)$')
+
+# Flask views running at once; further requests wait for a free thread
+REQUEST_THREADS = int(os.environ.get('ASGI_REQUEST_THREADS', 16))
+# Request bodies up to this size are kept in memory, larger ones are spooled to disk
+REQUEST_BODY_MEMORY = 64 * 1024
+
+_request_executor = ThreadPoolExecutor(max_workers=REQUEST_THREADS, thread_name_prefix='asgi-request')
+
+
+def run_in_request_thread(func, *args):
+    """Runs a blocking function in the request pool without blocking the event loop"""
+    return sync_to_async(func, thread_sensitive=False, executor=_request_executor)(*args)
+
+
+class ThreadedWsgiToAsgiInstance(WsgiToAsgiInstance):
+    """
+    Per-request instance of the WSGI adapter that runs the Flask view in the
+    request pool. asgiref's own instance runs every request on the one thread
+    shared by thread-sensitive sync_to_async calls, i.e. one request at a
+    time; of it only the public build_environ is used here.
+    """
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            raise ValueError('WSGI wrapper received a non-HTTP scope')
+        self.scope = scope
+        self.response_started = False
+        with SpooledTemporaryFile(max_size=REQUEST_BODY_MEMORY) as body:
+            while True:
+                message = await receive()
+                if message['type'] == 'http.disconnect':
+                    return
+                body.write(message.get('body', b''))
+                if not message.get('more_body'):
+                    break
+            body.seek(0)
+            await run_in_request_thread(self.serve, body, AsyncToSync(send))
+
+    def start_response(self, status, response_headers, exc_info=None):
+        if exc_info and self.response_started:
+            raise exc_info[1].with_traceback(exc_info[2])
+        self.response_start = {
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(name.lower().encode('ascii'), value.encode('ascii')) for name, value in response_headers],
+        }
+
+    def serve(self, body, send):
+        """Runs the WSGI application in a request thread, sending its response as it is produced"""
+        try:
+            environ = self.build_environ(self.scope, body)
+        except ValueError as e:
+            # Too many duplicate headers
+            send({'type': 'http.response.start', 'status': 400, 'headers': [(b'content-type', b'text/plain')]})
+            send({'type': 'http.response.body', 'body': str(e).encode()})
+            return
+
+        response = self.wsgi_application(environ, self.start_response)
+        try:
+            for output in response:
+                if not self.response_started:
+                    self.response_started = True
+                    send(self.response_start)
+                send({'type': 'http.response.body', 'body': output, 'more_body': True})
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        if not self.response_started:
+            self.response_started = True
+            send(self.response_start)
+        send({'type': 'http.response.body'})
+
+
+class ThreadedWsgiToAsgi(WsgiToAsgi):
+    """WSGI adapter that serves each request in the request thread pool"""
+
+    async def __call__(self, scope, receive, send):
+        await ThreadedWsgiToAsgiInstance(self.wsgi_application)(scope, receive, send)
+
+
+flask_app = create_app()
+wsgi_application = ThreadedWsgiToAsgi(flask_app)
+
+
+async def read_body(receive):
+    """Request body, or None if the client disconnected before sending it"""
+    body = b''
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return None
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            return body
+
+
+async def no_body():
+    return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+
+async def send_json(send, status, data, headers=()):
+    body = json.dumps(data).encode()
+    await send({
+        'type': 'http.response.start',
+        'status': status,
+        'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()), *headers],
+    })
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def forward(scope, send, path, query=None):
+    """Answers with the Flask GET route at path (the original body is already read)"""
+    scope = dict(scope, method='GET', path=path, raw_path=path.encode(),
+                 query_string=urlencode(query or {}).encode())
+    await wsgi_application(scope, no_body, send)
+
+
+async def score_events_application(scope, receive, send):
+    """Native ASGI handler of the passing-score event stream"""
+    broker.watch(flask_app)
+    await send({
+        'type': 'http.response.start',
+        'status': 200,
+        'headers': [(name.lower().encode(), value.encode()) for name, value in EVENT_STREAM_HEADERS.items()],
+    })
+
+    async def pump():
+        stream = broker.astream()
+        try:
+            async for chunk in stream:
+                await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        finally:
+            await stream.aclose()
+
+    async def wait_for_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    stream_task = asyncio.ensure_future(pump())
+    disconnect_task = asyncio.ensure_future(wait_for_disconnect())
+    done, pending = await asyncio.wait({stream_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+    for task in pending:
+        task.cancel()
+    # Let the cancelled stream unsubscribe before the connection is released
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    if stream_task in done:
+        # The broker ended the stream: finish the response so the client reconnects
+        stream_task.result()
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+
+async def generate_report_application(scope, receive, send):
+    """
+    Native ASGI handler of /generate_report: the report job is submitted in
+    the request pool and awaited on the event loop, then the finished PDF is
+    sent by the Flask download route
+    """
+    body = await read_body(receive)
+    if body is None:
+        return
+
+    def submit():
+        with flask_app.app_context():
+            return submit_report_job(json.loads(body) if body else {})
+
+    try:
+        job = await run_in_request_thread(submit)
+    except report_jobs.JobQueueFull as e:
+        return await send_json(send, 503, {'status': 'error', 'message': str(e)})
+    except Exception as e:
+        return await send_json(send, 500, {'status': 'error', 'message': str(e)})
+
+    state = await job.wait_async(REPORT_WAIT_TIMEOUT)
+    if state == 'failed':
+        await send_json(send, 500, {'status': 'error', 'message': str(job.future.exception())})
+    elif state != 'done':
+        await send_json(send, 504, {'status': 'error', 'message': 'Report is still being generated', 'job_id': job.id})
+    else:
+        await forward(scope, send, f'/api/reports/{job.id}/download')
+
+
+async def report_status_application(scope, receive, send, job_id):
+    """
+    Native ASGI handling of ?wait= of a report job: the job is awaited on the
+    event loop, then the Flask route answers with its state without waiting
+    """
+    query = dict(parse_qsl(scope['query_string'].decode()))
+    job = report_jobs.reports.get(job_id)
+    try:
+        wait = min(float(query.pop('wait', 0)), REPORT_WAIT_TIMEOUT)
+    except ValueError:
+        # Let the Flask route report the invalid value
+        return await wsgi_application(scope, receive, send)
+
+    if job is not None and wait > 0:
+        await job.wait_async(wait)
+    await forward(scope, send, scope['path'], query)
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+
+    route = (scope.get('method'), scope['path'])
+    report_status = REPORT_STATUS_PATH.match(scope['path'])
+    if route == ('GET', EVENTS_PATH):
+        await score_events_application(scope, receive, send)
+    elif route == ('POST', GENERATE_REPORT_PATH):
+        await generate_report_application(scope, receive, send)
+    elif route[0] == 'GET' and report_status:
+        await report_status_application(scope, receive, send, report_status.group('job_id'))
+    else:
+        await wsgi_application(scope, receive, send)
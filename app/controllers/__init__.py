@@ -1,8 +1,4 @@
 """
 Controller module initialization
 """
-from flask import Blueprint
-
-bp = Blueprint('main', __name__)
-
-from . import main_controller
\ No newline at end of file
+from .main_controller import bp
@@ -1,11 +1,20 @@
 """
 Main controller for the Admission Analysis System
 """
-from flask import render_template, request, jsonify, send_file
+from flask import current_app, render_template, request, jsonify, send_file, stream_with_context
 from ..models import db, Applicant, EducationalProgram, AdmissionData
 from ..utils.data_generator import generate_admission_data
-from ..utils.calculator import calculate_passing_scores
-from ..utils.report_generator import generate_pdf_report
+from ..utils.calculator import calculate_passing_scores, calculate_passing_scores_range
+from ..utils.aggregates import refresh_daily_aggregates, get_application_counts
+from ..utils.results import refresh_daily_results
+from ..utils.pagination import encode_cursor, decode_cursor, parse_page_size
+from ..utils.snapshots import bump_snapshot, get_snapshot, get_range_version, not_modified_response, add_snapshot_headers
+from ..utils import singleflight, score_events, report_jobs
+from ..utils.rank_index import get_rank_index
+from ..utils.streaming import STREAM_CHUNK_SIZE, STREAM_FORMATS, fast_jsonify, streaming_json_response
+from ..utils.exports import EXPORT_FORMATS, COMPETITION_COLUMNS, ACCEPTED_COLUMNS, competition_rows, accepted_rows, export_response
+from sqlalchemy import select, or_, and_
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from datetime import datetime, date
 import pandas as pd
 import json
@@ -103,13 +112,44 @@ def update_database():
             if applicant_id not in new_applicant_ids:
                 db.session.delete(record)
         
+        # Keep the daily counts, results and the snapshot version in step with the data
+        refresh_daily_aggregates([target_date])
+        refresh_daily_results([target_date])
+        bump_snapshot(target_date)
         db.session.commit()
         
-        return jsonify({'status': 'success', 'message': 'Database updated successfully'})
-        
     except Exception as e:
         db.session.rollback()
         return jsonify({'status': 'error', 'message': str(e)}), 500
+    
+    # The connected clients of every worker learn about the change from the
+    # bumped snapshot version (score_events.ScoreEventBroker.poll)
+    return jsonify({'status': 'success', 'message': 'Database updated successfully'})
+
+
+def serialize_passing_scores(scores):
+    """Passing scores with the accepted applicants as plain dicts instead of ORM rows"""
+    return {
+        code: dict(result, accepted_applicants=[
+            {'id': row.applicant_id, 'total_score': row.total_score, 'priority': row.priority_op}
+            for row in result['accepted_applicants']
+        ]) if 'accepted_applicants' in result else result
+        for code, result in scores.items()
+    }
+
+
+def passing_scores_data(target_date):
+    """
+    calculate_passing_scores as plain data: the ORM rows it returns belong to
+    the computing thread's session and must not reach other requests
+    """
+    return serialize_passing_scores(calculate_passing_scores(target_date))
+
+
+def coalesced_passing_scores(target_date):
+    """Passing scores shared by concurrent requests for the same snapshot"""
+    key = (target_date, get_snapshot(target_date))
+    return singleflight.allocations.do(key, passing_scores_data, target_date)
 
 
 @bp.route('/passing_scores')
@@ -123,27 +163,82 @@ def get_passing_scores():
         else:
             target_date = date.today()
         
-        # Calculate passing scores
-        scores = calculate_passing_scores(target_date)
+        # Unchanged since the client's copy: answer without recomputing
+        not_modified = not_modified_response(target_date)
+        if not_modified is not None:
+            return not_modified
+        
+        # Calculate passing scores (one computation for concurrent identical requests)
+        scores = coalesced_passing_scores(target_date)
         
-        return jsonify({
+        return add_snapshot_headers(jsonify({
             'date': target_date.isoformat(),
             'scores': scores
-        })
+        }), target_date)
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@bp.route('/api/passing_scores/range')
+def get_passing_scores_range():
+    """Passing scores for every date in a range as a program x date matrix"""
+    try:
+        try:
+            start_date = datetime.strptime(request.args.get('start', ''), '%Y-%m-%d').date()
+            end_date = datetime.strptime(request.args.get('end', ''), '%Y-%m-%d').date()
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'start and end must be dates in YYYY-MM-DD format'}), 400
+        
+        return fast_jsonify(calculate_passing_scores_range(start_date, end_date))
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@bp.route('/api/events/passing_scores')
+def passing_score_events():
+    """Server-Sent Events stream of passing-score changes after each ingest"""
+    score_events.broker.watch(current_app._get_current_object())
+    return current_app.response_class(
+        stream_with_context(score_events.broker.stream()),
+        headers=score_events.EVENT_STREAM_HEADERS
+    )
+
+
+# Columns returned by /api/applicants, fetched as plain tuples
+APPLICANT_COLUMNS = (
+    'id', 'applicant_id', 'educational_program', 'priority_op', 'consent_given',
+    'physics_ikt', 'russian_lang', 'math', 'individual_achievements', 'total_score'
+)
+
+
 @bp.route('/api/applicants')
 def get_applicants():
-    """API endpoint to get filtered applicants data"""
+    """API endpoint to get filtered applicants data, one keyset page at a time.
+
+    Rows are ordered by (total_score desc, id). The response carries
+    ``next_cursor``; passing it back as ``cursor`` returns the following page.
+    With ``format=ndjson`` or ``format=json`` all matching rows (after
+    ``cursor``, if given) are streamed instead of paged.
+    """
     try:
         # Get filter parameters
         date_str = request.args.get('date', '')
         program = request.args.get('program', '')
         priority = request.args.get('priority', '')
         consent = request.args.get('consent', '')
+        cursor = request.args.get('cursor', '')
+        stream_format = request.args.get('format', '')
+        
+        if stream_format and stream_format not in STREAM_FORMATS:
+            return jsonify({'status': 'error', 'message': f'Unsupported format: {stream_format}'}), 400
+        
+        try:
+            page_size = parse_page_size(request.args.get('limit', ''))
+            after = decode_cursor(cursor, 2) if cursor else None
+        except ValueError as e:
+            return jsonify({'status': 'error', 'message': str(e)}), 400
         
         # Parse date
         if date_str:
@@ -151,37 +246,122 @@ def get_applicants():
         else:
             target_date = date.today()
         
-        # Build query
-        query = AdmissionData.query.filter(AdmissionData.date == target_date)
+        # Build query: plain column tuples, no ORM instances
+        conditions = [AdmissionData.date == target_date]
         
         if program:
-            query = query.filter(AdmissionData.educational_program == program)
+            conditions.append(AdmissionData.educational_program == program)
         
         if priority:
-            query = query.filter(AdmissionData.priority_op == int(priority))
+            conditions.append(AdmissionData.priority_op == int(priority))
         
         if consent == 'true':
-            query = query.filter(AdmissionData.consent_given == True)
+            conditions.append(AdmissionData.consent_given == True)
+        
+        # Continue strictly after the last row of the previous page
+        if after:
+            last_score, last_id = after
+            conditions.append(or_(
+                AdmissionData.total_score < last_score,
+                and_(AdmissionData.total_score == last_score, AdmissionData.id > last_id)
+            ))
+        
+        query = select(
+            *[getattr(AdmissionData, column) for column in APPLICANT_COLUMNS]
+        ).where(*conditions).order_by(AdmissionData.total_score.desc(), AdmissionData.id)
+        
+        # Streaming mode: rows are serialized as they are fetched from the cursor
+        if stream_format:
+            result = db.session.execute(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+            rows = (dict(zip(APPLICANT_COLUMNS, row)) for row in result)
+            return streaming_json_response(rows, stream_format, 'applicants')
         
-        applicants = query.order_by(AdmissionData.total_score.desc()).all()
+        # One extra row tells whether there is a next page
+        rows = db.session.execute(query.limit(page_size + 1)).all()
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
         
         # Convert to JSON-serializable format
-        applicants_data = []
-        for applicant in applicants:
-            applicants_data.append({
-                'id': applicant.id,
-                'applicant_id': applicant.applicant_id,
-                'educational_program': applicant.educational_program,
-                'priority_op': applicant.priority_op,
-                'consent_given': applicant.consent_given,
-                'physics_ikt': applicant.physics_ikt,
-                'russian_lang': applicant.russian_lang,
-                'math': applicant.math,
-                'individual_achievements': applicant.individual_achievements,
-                'total_score': applicant.total_score
-            })
+        applicants_data = [dict(zip(APPLICANT_COLUMNS, row)) for row in rows]
+        
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.total_score, last.id)
+        
+        return fast_jsonify({'applicants': applicants_data, 'next_cursor': next_cursor})
+        
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+# Exportable lists: columns and row source
+EXPORT_LISTS = {
+    'competition': (COMPETITION_COLUMNS, competition_rows),
+    'accepted': (ACCEPTED_COLUMNS, accepted_rows),
+}
+
+
+@bp.route('/api/export/<list_name>')
+def export_list(list_name):
+    """Download the competition lists or the accepted lists of a date as CSV or XLSX.
+
+    Rows are written as they are read from the database cursor, so memory
+    use does not depend on the size of the export.
+    """
+    try:
+        if list_name not in EXPORT_LISTS:
+            return jsonify({'status': 'error', 'message': f'Unknown list: {list_name}'}), 404
+        
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'status': 'error', 'message': f'Unsupported format: {export_format}'}), 400
+        
+        try:
+            date_str = request.args.get('date', '')
+            target_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else date.today()
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Invalid date, expected YYYY-MM-DD'}), 400
+        
+        not_modified = not_modified_response(target_date)
+        if not_modified is not None:
+            return not_modified
+        
+        # The allocation of the snapshot is taken from the rank index, built
+        # by the row generator once the response has started
+        columns, rows = EXPORT_LISTS[list_name]
+        response = export_response(
+            columns,
+            rows(target_date, request.args.get('program', '')),
+            export_format,
+            f'{list_name}_{target_date.isoformat()}'
+        )
+        return add_snapshot_headers(response, target_date)
         
-        return jsonify({'applicants': applicants_data})
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@bp.route('/api/applicants/<int:applicant_id>/status')
+def get_applicant_status(applicant_id):
+    """Rank, consent, passing score and allocation outcome of one applicant in every program applied to"""
+    try:
+        date_str = request.args.get('date', '')
+        if date_str:
+            target_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        else:
+            target_date = date.today()
+        
+        # Unchanged since the client's copy: answer without touching the index
+        not_modified = not_modified_response(target_date)
+        if not_modified is not None:
+            return not_modified
+        
+        status = get_rank_index(target_date).status(applicant_id)
+        if status is None:
+            return jsonify({'status': 'error', 'message': f'Applicant {applicant_id} is not in the lists for {target_date.isoformat()}'}), 404
+        
+        return add_snapshot_headers(fast_jsonify(status), target_date)
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -197,59 +377,158 @@ def get_stats():
         else:
             target_date = date.today()
         
+        # Unchanged since the client's copy: answer without touching the database
+        not_modified = not_modified_response(target_date)
+        if not_modified is not None:
+            return not_modified
+        
         # Get all educational programs
         programs = EducationalProgram.query.all()
         
         # Calculate passing scores
-        passing_scores = calculate_passing_scores(target_date)
+        passing_scores = coalesced_passing_scores(target_date)
+        
+        # Application counts come from the daily aggregates
+        counts = get_application_counts(target_date)
         
         # Prepare stats data
         stats_data = []
         for program in programs:
-            # Get all applicants for this program on the target date
-            all_applicants = AdmissionData.query.filter(
-                AdmissionData.date == target_date,
-                AdmissionData.educational_program == program.code
-            ).count()
-            
-            # Get applicants with consent for this program
-            consent_applicants = AdmissionData.query.filter(
-                AdmissionData.date == target_date,
-                AdmissionData.educational_program == program.code,
-                AdmissionData.consent_given == True
-            ).count()
-            
+            program_counts = counts[program.code]
             stats_data.append({
                 'code': program.code,
                 'program_name': program.name,
                 'places': program.budget_places,
-                'applications': all_applicants,
-                'with_consent': consent_applicants,
+                'applications': program_counts['applications'],
+                'with_consent': program_counts['with_consent'],
                 'passing_score': passing_scores[program.code]['score'] if program.code in passing_scores else 'Н/Д'
             })
         
-        return jsonify({'stats': stats_data})
+        return add_snapshot_headers(jsonify({'stats': stats_data}), target_date)
         
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+# Seconds /generate_report and a polling client with ?wait= wait for a report job
+REPORT_WAIT_TIMEOUT = 60
+
+
+def submit_report_job(req_data):
+    """Report job for the date of a /generate_report request (today by default)"""
+    report_date = datetime.strptime(req_data.get('date', ''), '%Y-%m-%d').date() if req_data.get('date') else date.today()
+    
+    # Rendered by the report workers (one job per snapshot of the date,
+    # served from the report cache until the data of the date changes)
+    return report_jobs.reports.submit_pdf_report(report_date, get_snapshot(report_date))
+
+
 @bp.route('/generate_report', methods=['POST'])
 def generate_report():
     """Generate PDF report with admission statistics"""
     try:
-        req_data = request.json
-        report_date = datetime.strptime(req_data.get('date', ''), '%Y-%m-%d').date() if req_data.get('date') else date.today()
+        job = submit_report_job(request.json)
+        report_path = job.future.result(timeout=REPORT_WAIT_TIMEOUT)
         
-        # Generate the report
-        report_path = generate_pdf_report(report_date)
+        return send_file(report_path, as_attachment=True, download_name=f'report_{job.key[1]}.pdf')
         
-        return send_file(report_path, as_attachment=True)
+    except report_jobs.JobQueueFull as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 503
+    except FutureTimeoutError:
+        return jsonify({'status': 'error', 'message': 'Report is still being generated', 'job_id': job.id}), 504
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+def report_job_response(job, status=200):
+    """JSON description of a report job with the URLs to poll and download it"""
+    data = job.to_dict()
+    data['status'] = 'error' if data['state'] == 'failed' else 'success'
+    data['status_url'] = f'/api/reports/{job.id}'
+    if data['state'] == 'done':
+        data['download_url'] = f'/api/reports/{job.id}/download'
+    return jsonify(data), status
+
+
+@bp.route('/api/reports', methods=['POST'])
+def submit_report():
+    """Queue a PDF report for a date; returns the job to poll and download"""
+    try:
+        req_data = request.json or {}
+        try:
+            report_date = datetime.strptime(req_data['date'], '%Y-%m-%d').date() if req_data.get('date') else date.today()
+        except ValueError:
+            return jsonify({'status': 'error', 'message': 'Invalid date, expected YYYY-MM-DD'}), 400
         
+        job = report_jobs.reports.submit_pdf_report(report_date, get_snapshot(report_date))
+        return report_job_response(job, 202)
+        
+    except report_jobs.JobQueueFull as e:
+        response = jsonify({'status': 'error', 'message': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
 
+@bp.route('/api/reports/dynamics', methods=['POST'])
+def submit_dynamic_report():
+    """Queue a passing score dynamics report for the period start..end"""
+    try:
+        req_data = request.json or {}
+        try:
+            start_date = datetime.strptime(req_data['start'], '%Y-%m-%d').date()
+            end_date = datetime.strptime(req_data['end'], '%Y-%m-%d').date()
+        except (KeyError, TypeError, ValueError):
+            return jsonify({'status': 'error', 'message': 'start and end dates are required, expected YYYY-MM-DD'}), 400
+        if start_date > end_date:
+            return jsonify({'status': 'error', 'message': 'start must not be after end'}), 400
+        
+        job = report_jobs.reports.submit_dynamic_report(start_date, end_date, get_range_version(start_date, end_date))
+        return report_job_response(job, 202)
+        
+    except report_jobs.JobQueueFull as e:
+        response = jsonify({'status': 'error', 'message': str(e)})
+        response.headers['Retry-After'] = '5'
+        return response, 503
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+
+@bp.route('/api/reports/<job_id>')
+def report_status(job_id):
+    """State of a report job; ?wait=N waits up to N seconds for it to finish"""
+    job = report_jobs.reports.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown report job'}), 404
+    
+    try:
+        wait = min(float(request.args.get('wait', 0)), REPORT_WAIT_TIMEOUT)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Invalid wait'}), 400
+    if wait > 0:
+        job.wait(wait)
+    
+    return report_job_response(job)
+
+
+@bp.route('/api/reports/<job_id>/download')
+def download_report(job_id):
+    """Rendered PDF of a finished report job"""
+    job = report_jobs.reports.get(job_id)
+    if job is None:
+        return jsonify({'status': 'error', 'message': 'Unknown report job'}), 404
+    if job.state != 'done':
+        return report_job_response(job, 409)
+    
+    kind, period = job.key[:2]
+    download_name = f"{'report' if kind == 'pdf' else kind}_{period}.pdf"
+    try:
+        return send_file(job.future.result(), as_attachment=True, download_name=download_name)
+    except FileNotFoundError:
+        return jsonify({'status': 'error', 'message': 'Report expired, submit it again'}), 410
+
+
 def save_admission_data(df):
     """Save admission data from DataFrame to database"""
     for _, row in df.iterrows():
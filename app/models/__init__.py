@@ -52,4 +52,54 @@ class AdmissionData(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationship
-    applicant = db.relationship('Applicant', backref=db.backref('admission_data', lazy=True))
\ No newline at end of file
+    applicant = db.relationship('Applicant', backref=db.backref('admission_data', lazy=True))
+
+    __table_args__ = (
+        # Keyset pagination order within a date: total_score desc, id
+        db.Index('ix_admission_data_date_score_id', 'date', total_score.desc(), 'id'),
+        # Competition-list order within a date, used by the list exports
+        db.Index('ix_admission_data_date_program_rank', 'date', 'educational_program',
+                 total_score.desc(), 'priority_op', 'id'),
+    )
+
+
+class DailyAggregate(db.Model):
+    """
+    Materialized application counts per date, program, priority and consent
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False, index=True)
+    educational_program = db.Column(db.String(50), nullable=False)
+    priority_op = db.Column(db.Integer, nullable=False)
+    consent_given = db.Column(db.Boolean, nullable=False)
+    applications = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('date', 'educational_program', 'priority_op', 'consent_given'),
+    )
+
+
+class DailyResult(db.Model):
+    """
+    Materialized allocation outcome per date and program
+    """
+    id = db.Column(db.Integer, primary_key=True)
+    date = db.Column(db.Date, nullable=False, index=True)
+    educational_program = db.Column(db.String(50), nullable=False)
+    # None when the program is short of consenting applicants
+    passing_score = db.Column(db.Integer, nullable=True)
+    shortage = db.Column(db.Boolean, nullable=False, default=False)
+    accepted_count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('date', 'educational_program'),
+    )
+
+
+class SnapshotVersion(db.Model):
+    """
+    Version of the admission data for a date, bumped on every change of that date
+    """
+    date = db.Column(db.Date, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=1)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
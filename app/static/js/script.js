@@ -6,9 +6,15 @@ document.addEventListener('DOMContentLoaded', function() {
     const loadDataBtn = document.getElementById('load-data-btn');
     const calculatePassingScoresBtn = document.getElementById('calculate-passing-scores-btn');
     const generateReportBtn = document.getElementById('generate-report-btn');
+    const exportCsvBtn = document.getElementById('export-csv-btn');
+    const exportXlsxBtn = document.getElementById('export-xlsx-btn');
     const programFilter = document.getElementById('program-filter');
     const priorityFilter = document.getElementById('priority-filter');
     const consentFilter = document.getElementById('consent-filter');
+    const loadMoreBtn = document.getElementById('load-more-btn');
+    
+    // Cursor of the next applicants page (null when there are no more rows)
+    let nextCursor = null;
     
     // Load initial data
     loadApplicantsData();
@@ -23,11 +29,29 @@ document.addEventListener('DOMContentLoaded', function() {
     loadDataBtn.addEventListener('click', loadSampleData);
     calculatePassingScoresBtn.addEventListener('click', calculatePassingScores);
     generateReportBtn.addEventListener('click', generateReport);
+    exportCsvBtn.addEventListener('click', () => exportLists('csv'));
+    exportXlsxBtn.addEventListener('click', () => exportLists('xlsx'));
     
     // Filter event listeners
     programFilter.addEventListener('change', loadApplicantsData);
     priorityFilter.addEventListener('change', loadApplicantsData);
     consentFilter.addEventListener('change', loadApplicantsData);
+    loadMoreBtn.addEventListener('click', () => loadApplicantsData(nextCursor));
+    
+    // Passing-score changes pushed by the server after each ingest
+    if (window.EventSource) {
+        const scoreEvents = new EventSource('/api/events/passing_scores');
+        let connectedBefore = false;
+        
+        // After a reconnect some changes may have been missed: reload the stats once
+        scoreEvents.addEventListener('open', function() {
+            if (connectedBefore) {
+                loadStatsData();
+            }
+            connectedBefore = true;
+        });
+        scoreEvents.addEventListener('scores', event => applyScoreChanges(JSON.parse(event.data)));
+    }
     
     // Function to load sample data
     async function loadSampleData() {
@@ -54,8 +78,8 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
-    // Function to load applicants data
-    async function loadApplicantsData() {
+    // Function to load applicants data (first page, or the page after cursor)
+    async function loadApplicantsData(cursor) {
         try {
             const selectedDate = dateSelector.value;
             const program = programFilter.value;
@@ -67,6 +91,7 @@ document.addEventListener('DOMContentLoaded', function() {
             if (program) queryString += `&program=${program}`;
             if (priority) queryString += `&priority=${priority}`;
             if (consent) queryString += `&consent=true`;
+            if (typeof cursor === 'string') queryString += `&cursor=${encodeURIComponent(cursor)}`;
             
             const response = await fetch(`/api/applicants${queryString}`);
             const data = await response.json();
@@ -76,7 +101,9 @@ document.addEventListener('DOMContentLoaded', function() {
                 return;
             }
             
-            populateApplicantsTable(data.applicants || []);
+            populateApplicantsTable(data.applicants || [], typeof cursor === 'string');
+            nextCursor = data.next_cursor || null;
+            loadMoreBtn.style.display = nextCursor ? '' : 'none';
         } catch (error) {
             console.error('Error loading applicants data:', error);
         }
@@ -130,29 +157,32 @@ document.addEventListener('DOMContentLoaded', function() {
         try {
             const selectedDate = dateSelector.value;
             
-            const response = await fetch('/generate_report', {
+            // The report is rendered in the background: submit it, then wait for the job
+            let response = await fetch('/api/reports', {
                 method: 'POST',
                 headers: {
                     'Content-Type': 'application/json'
                 },
                 body: JSON.stringify({ date: selectedDate })
             });
+            let job = await response.json();
+            
+            while (response.ok && (job.state === 'queued' || job.state === 'running')) {
+                response = await fetch(`${job.status_url}?wait=20`);
+                job = await response.json();
+            }
             
-            if (response.ok) {
-                // Create a download link for the PDF
-                const blob = await response.blob();
-                const url = window.URL.createObjectURL(blob);
+            if (response.ok && job.state === 'done') {
+                // Download the rendered PDF
                 const a = document.createElement('a');
-                a.href = url;
+                a.href = job.download_url;
                 a.download = `report_${selectedDate}.pdf`;
                 document.body.appendChild(a);
                 a.click();
                 a.remove();
-                window.URL.revokeObjectURL(url);
             } else {
-                const errorData = await response.json();
-                console.error('Error generating report:', errorData.message);
-                alert('Error generating report: ' + errorData.message);
+                console.error('Error generating report:', job.message);
+                alert('Error generating report: ' + job.message);
             }
         } catch (error) {
             console.error('Error generating report:', error);
@@ -160,10 +190,19 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
     
+    // The export is streamed by the server, so the browser downloads it directly
+    function exportLists(format) {
+        const params = new URLSearchParams({ date: dateSelector.value, format: format });
+        if (programFilter.value) params.append('program', programFilter.value);
+        window.location.href = `/api/export/competition?${params.toString()}`;
+    }
+    
     // Function to populate applicants table
-    function populateApplicantsTable(applicants) {
+    function populateApplicantsTable(applicants, append) {
         const tbody = document.getElementById('applicants-body');
-        tbody.innerHTML = '';
+        if (!append) {
+            tbody.innerHTML = '';
+        }
         
         applicants.forEach(applicant => {
             const row = document.createElement('tr');
@@ -191,6 +230,7 @@ document.addEventListener('DOMContentLoaded', function() {
         
         stats.forEach(stat => {
             const row = document.createElement('tr');
+            row.dataset.code = stat.code || '';
             
             row.innerHTML = `
                 <td>${stat.program_name || ''}</td>
@@ -198,13 +238,31 @@ document.addEventListener('DOMContentLoaded', function() {
                 <td>${stat.places || 0}</td>
                 <td>${stat.applications || 0}</td>
                 <td>${stat.with_consent || 0}</td>
-                <td>${stat.passing_score || 'Н/Д'}</td>
+                <td class="passing-score">${stat.passing_score || 'Н/Д'}</td>
             `;
             
             tbody.appendChild(row);
         });
     }
     
+    // Function to apply a pushed passing-score delta to the stats table
+    function applyScoreChanges(delta) {
+        if (delta.date !== dateSelector.value) {
+            return;
+        }
+        
+        const tbody = document.getElementById('stats-body');
+        for (const [code, change] of Object.entries(delta.changes)) {
+            const row = tbody.querySelector(`tr[data-code="${code}"]`);
+            if (!row) {
+                // The table does not show this program yet: reload it entirely
+                loadStatsData();
+                return;
+            }
+            row.querySelector('.passing-score').textContent = change.score || 'Н/Д';
+        }
+    }
+    
     // Initialize chart if element exists
     const chartCanvas = document.getElementById('passingScoresChart');
     if (chartCanvas) {
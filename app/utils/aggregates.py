@@ -0,0 +1,72 @@
+"""
+Utility module for maintaining materialized daily application counts
+"""
+from sqlalchemy import func
+
+from ..models import db, EducationalProgram, AdmissionData, DailyAggregate
+
+
+PRIORITIES = (1, 2, 3, 4)
+
+
+def refresh_daily_aggregates(dates):
+    """
+    Recompute aggregates for the given dates from AdmissionData.
+
+    Runs in the caller's session so the counts are committed together
+    with the data change that made them stale.
+    """
+    db.session.flush()
+    for target_date in set(dates):
+        DailyAggregate.query.filter(DailyAggregate.date == target_date).delete(synchronize_session=False)
+        counts = db.session.query(
+            AdmissionData.educational_program,
+            AdmissionData.priority_op,
+            AdmissionData.consent_given,
+            func.count(AdmissionData.id)
+        ).filter(
+            AdmissionData.date == target_date
+        ).group_by(
+            AdmissionData.educational_program,
+            AdmissionData.priority_op,
+            AdmissionData.consent_given
+        ).all()
+        db.session.bulk_insert_mappings(DailyAggregate, [
+            {
+                'date': target_date,
+                'educational_program': program,
+                'priority_op': priority,
+                'consent_given': bool(consent),
+                'applications': applications
+            }
+            for program, priority, consent, applications in counts
+        ])
+
+
+def get_application_counts(target_date):
+    """
+    Application counts per program code for a date, read from the aggregates
+    """
+    counts = {
+        program.code: {
+            'applications': 0,
+            'with_consent': 0,
+            'by_priority': {priority: 0 for priority in PRIORITIES}
+        }
+        for program in EducationalProgram.query.all()
+    }
+
+    rows = DailyAggregate.query.filter(DailyAggregate.date == target_date).all()
+    for row in rows:
+        program_counts = counts.setdefault(row.educational_program, {
+            'applications': 0,
+            'with_consent': 0,
+            'by_priority': {priority: 0 for priority in PRIORITIES}
+        })
+        program_counts['applications'] += row.applications
+        if row.consent_given:
+            program_counts['with_consent'] += row.applications
+        if row.priority_op in program_counts['by_priority']:
+            program_counts['by_priority'][row.priority_op] += row.applications
+
+    return counts
@@ -3,6 +3,9 @@ Utility module for calculating passing scores based on admission data
 """
 from ..models import db, Applicant, EducationalProgram, AdmissionData
 from datetime import datetime, date
+from itertools import groupby
+from operator import itemgetter
+from sqlalchemy import select
 
 
 def calculate_passing_scores(target_date):
@@ -138,76 +141,119 @@ def calculate_advanced_passing_scores(target_date):
     return scores
 
 
-def get_statistics_for_date(target_date):
+class DayAllocator:
     """
-    Get comprehensive statistics for a specific date
+    Allocation of single dates with the rules of calculate_passing_scores,
+    working on plain row tuples. The per-program buffers are reused between
+    the dates allocated by one instance.
     """
-    programs = EducationalProgram.query.all()
-    stats = {}
-    
-    for program in programs:
-        # All applicants for this program
-        all_applicants = db.session.query(AdmissionData).filter(
-            AdmissionData.date == target_date,
-            AdmissionData.educational_program == program.code
-        ).all()
-        
-        # Applicants with consent
-        consent_applicants = [a for a in all_applicants if a.consent_given]
-        
-        # Count by priority
-        priority_counts = {1: 0, 2: 0, 3: 0, 4: 0}
-        for app in all_applicants:
-            if 1 <= app.priority_op <= 4:
-                priority_counts[app.priority_op] += 1
-        
-        # Accepted applicants (based on passing score algorithm)
-        passing_scores = calculate_passing_scores(target_date)
-        accepted_count = passing_scores[program.code]['accepted_count'] if passing_scores[program.code]['score'] != 'НЕДОБОР' else len(consent_applicants)
-        
-        # Calculate accepted by priority - this requires the advanced algorithm to determine who got accepted
-        accepted_by_priority = {1: 0, 2: 0, 3: 0, 4: 0}
-        
-        # Get the list of actually accepted applicants using the advanced algorithm
-        advanced_results = calculate_advanced_passing_scores(target_date)
-        if program.code in advanced_results and 'accepted_applicants' in advanced_results[program.code]:
-            accepted_apps = advanced_results[program.code]['accepted_applicants']
-            for app in accepted_apps:
-                if 1 <= app.priority_op <= 4:
-                    accepted_by_priority[app.priority_op] += 1
-        else:
-            # Fallback: if we don't have the accepted_applicants list, just count by priority from consent applicants
-            # up to the number of accepted positions
-            consent_apps_by_priority = {}
-            for app in consent_applicants:
-                if app.priority_op not in consent_apps_by_priority:
-                    consent_apps_by_priority[app.priority_op] = []
-                consent_apps_by_priority[app.priority_op].append(app)
-            
-            # Sort by total score descending for each priority
-            for priority in consent_apps_by_priority:
-                consent_apps_by_priority[priority].sort(key=lambda x: x.total_score, reverse=True)
-            
-            # Take top applicants up to accepted count
-            taken_count = 0
-            for priority in sorted(consent_apps_by_priority.keys()):
-                for app in consent_apps_by_priority[priority]:
-                    if taken_count < accepted_count:
-                        accepted_by_priority[app.priority_op] += 1
-                        taken_count += 1
-                    else:
-                        break
-                if taken_count >= accepted_count:
+
+    def __init__(self, program_seats):
+        self.program_seats = program_seats
+        self.consenting = {code: [] for code in program_seats}
+        self.filled_seats = dict.fromkeys(program_seats, 0)
+        self.last_accepted_score = dict.fromkeys(program_seats)
+
+    def allocate(self, day_rows):
+        """
+        Allocate one date. day_rows are the consenting applications of the
+        date ending with (applicant_id, educational_program, priority_op,
+        total_score), ordered by total score desc, then priority.
+
+        Returns ({code: (passing score, accepted count)},
+                 {code: [(applicant_id, total_score, priority_op) of the
+                         admitted applicants, best first]})
+        """
+        program_seats = self.program_seats
+        consenting = self.consenting
+        filled_seats = self.filled_seats
+        last_accepted_score = self.last_accepted_score
+        for code in program_seats:
+            consenting[code].clear()
+            filled_seats[code] = 0
+            last_accepted_score[code] = None
+
+        # Programs of each applicant, most preferred first
+        preferences = {}
+        for *_, applicant_id, prog_code, priority, total_score in day_rows:
+            consenting[prog_code].append(total_score)
+            preferences.setdefault(applicant_id, []).append((priority, prog_code))
+        for applicant_programs in preferences.values():
+            applicant_programs.sort(key=itemgetter(0))
+
+        # Same assignment as calculate_advanced_passing_scores
+        accepted = {code: [] for code in program_seats}
+        for *_, applicant_id, _, _, total_score in day_rows:
+            for priority, prog_code in preferences[applicant_id]:
+                if filled_seats[prog_code] < program_seats[prog_code]:
+                    filled_seats[prog_code] += 1
+                    last_accepted_score[prog_code] = total_score
+                    accepted[prog_code].append((applicant_id, total_score, priority))
                     break
-        
-        stats[program.code] = {
-            'program_name': program.name,
-            'total_applications': len(all_applicants),
-            'budget_places': program.budget_places,
-            'applications_by_priority': priority_counts,
-            'applications_with_consent': len(consent_applicants),
-            'accepted_total': accepted_count,
-            'accepted_by_priority': accepted_by_priority
-        }
-    
-    return stats
\ No newline at end of file
+
+        scores = {}
+        for code, seats in program_seats.items():
+            if filled_seats[code] and filled_seats[code] == seats:
+                # Advanced allocation filled every seat
+                scores[code] = (last_accepted_score[code], seats)
+            elif len(consenting[code]) <= seats:
+                scores[code] = ('НЕДОБОР', len(consenting[code]))
+            else:
+                scores[code] = (consenting[code][seats - 1], seats)
+
+        return scores, accepted
+
+
+def calculate_passing_scores_range(start_date, end_date):
+    """
+    Passing scores for every date in [start_date, end_date] in a single pass.
+
+    The consenting rows of the whole range are loaded with one query and
+    grouped by date; each date is allocated with the same rules as
+    calculate_passing_scores, reusing the per-program buffers between dates.
+    Only dates that have data are included.
+
+    Returns a program x date matrix:
+    {'dates': [...], 'programs': [...], 'scores': {code: [score per date]},
+     'accepted': {code: [accepted count per date]}}
+    """
+    programs = EducationalProgram.query.all()
+    program_seats = {prog.code: prog.budget_places for prog in programs}
+
+    rows = db.session.execute(
+        select(
+            AdmissionData.date,
+            AdmissionData.applicant_id,
+            AdmissionData.educational_program,
+            AdmissionData.priority_op,
+            AdmissionData.total_score
+        ).where(
+            AdmissionData.date >= start_date,
+            AdmissionData.date <= end_date,
+            AdmissionData.consent_given == True
+        ).order_by(
+            AdmissionData.date,
+            AdmissionData.total_score.desc(),
+            AdmissionData.priority_op,
+            AdmissionData.id
+        )
+    )
+
+    dates = []
+    scores = {code: [] for code in program_seats}
+    accepted = {code: [] for code in program_seats}
+    allocator = DayAllocator(program_seats)
+
+    for target_date, day_rows in groupby(rows, key=itemgetter(0)):
+        day_scores, _ = allocator.allocate(list(day_rows))
+        dates.append(target_date.isoformat())
+        for code, (score, accepted_count) in day_scores.items():
+            scores[code].append(score)
+            accepted[code].append(accepted_count)
+
+    return {
+        'dates': dates,
+        'programs': list(program_seats),
+        'scores': scores,
+        'accepted': accepted
+    }
@@ -7,6 +7,70 @@ from datetime import datetime, date
 from ..models import EducationalProgram
 
 
+# Applicant counts per date and program (from spec Table 8)
+APPLICANT_COUNTS = {
+    '2023-08-01': {'PM': 60, 'IVT': 100, 'ITSS': 50, 'IB': 70},
+    '2023-08-02': {'PM': 380, 'IVT': 370, 'ITSS': 350, 'IB': 260},
+    '2023-08-03': {'PM': 1000, 'IVT': 1150, 'ITSS': 1050, 'IB': 800},
+    '2023-08-04': {'PM': 1240, 'IVT': 1390, 'ITSS': 1240, 'IB': 1190}
+}
+
+# Intersection counts for pairs of programs (from spec Table 9)
+PAIR_INTERSECTIONS = {
+    '2023-08-01': {
+        ('PM', 'IVT'): 22, ('PM', 'ITSS'): 17, ('PM', 'IB'): 20,
+        ('IVT', 'ITSS'): 19, ('IVT', 'IB'): 22, ('ITSS', 'IB'): 17
+    },
+    '2023-08-02': {
+        ('PM', 'IVT'): 190, ('PM', 'ITSS'): 190, ('PM', 'IB'): 150,
+        ('IVT', 'ITSS'): 190, ('IVT', 'IB'): 140, ('ITSS', 'IB'): 120
+    },
+    '2023-08-03': {
+        ('PM', 'IVT'): 760, ('PM', 'ITSS'): 600, ('PM', 'IB'): 410,
+        ('IVT', 'ITSS'): 750, ('IVT', 'IB'): 460, ('ITSS', 'IB'): 500
+    },
+    '2023-08-04': {
+        ('PM', 'IVT'): 1090, ('PM', 'ITSS'): 1110, ('PM', 'IB'): 1070,
+        ('IVT', 'ITSS'): 1050, ('IVT', 'IB'): 1040, ('ITSS', 'IB'): 1090
+    }
+}
+
+# Intersection counts for triple/four programs (from spec Table 10)
+TRIPLE_FOUR_INTERSECTIONS = {
+    '2023-08-01': {
+        ('PM', 'IVT', 'ITSS'): 5, ('PM', 'IVT', 'IB'): 5,
+        ('IVT', 'ITSS', 'IB'): 5, ('PM', 'ITSS', 'IB'): 5,
+        ('PM', 'IVT', 'ITSS', 'IB'): 3
+    },
+    '2023-08-02': {
+        ('PM', 'IVT', 'ITSS'): 70, ('PM', 'IVT', 'IB'): 70,
+        ('IVT', 'ITSS', 'IB'): 70, ('PM', 'ITSS', 'IB'): 70,
+        ('PM', 'IVT', 'ITSS', 'IB'): 50
+    },
+    '2023-08-03': {
+        ('PM', 'IVT', 'ITSS'): 500, ('PM', 'IVT', 'IB'): 260,
+        ('IVT', 'ITSS', 'IB'): 300, ('PM', 'ITSS', 'IB'): 250,
+        ('PM', 'IVT', 'ITSS', 'IB'): 200
+    },
+    '2023-08-04': {
+        ('PM', 'IVT', 'ITSS'): 1020, ('PM', 'IVT', 'IB'): 1020,
+        ('IVT', 'ITSS', 'IB'): 1000, ('PM', 'ITSS', 'IB'): 1040,
+        ('PM', 'IVT', 'ITSS', 'IB'): 1000
+    }
+}
+
+
+def intersection_targets(date_str):
+    """
+    Intersection sizes every group of programs must have on a spec date,
+    single programs included: {frozenset of programs: count}
+    """
+    targets = {frozenset((prog,)): count for prog, count in APPLICANT_COUNTS[date_str].items()}
+    targets.update((frozenset(progs), count) for progs, count in PAIR_INTERSECTIONS.get(date_str, {}).items())
+    targets.update((frozenset(progs), count) for progs, count in TRIPLE_FOUR_INTERSECTIONS.get(date_str, {}).items())
+    return targets
+
+
 def generate_admission_data(target_date=None):
     """
     Generate admission data according to the specifications:
@@ -26,129 +90,22 @@ def generate_admission_data(target_date=None):
         'IB': {'name': 'Информационная безопасность', 'seats': 20}
     }
     
-    # Define applicant counts per date and program (from spec Table 8)
-    applicant_counts = {
-        '2023-08-01': {'PM': 60, 'IVT': 100, 'ITSS': 50, 'IB': 70},
-        '2023-08-02': {'PM': 380, 'IVT': 370, 'ITSS': 350, 'IB': 260},
-        '2023-08-03': {'PM': 1000, 'IVT': 1150, 'ITSS': 1050, 'IB': 800},
-        '2023-08-04': {'PM': 1240, 'IVT': 1390, 'ITSS': 1240, 'IB': 1190}
-    }
-    
-    # Define intersection counts for pairs of programs (from spec Table 9)
-    pair_intersections = {
-        '2023-08-01': {
-            ('PM', 'IVT'): 22, ('PM', 'ITSS'): 17, ('PM', 'IB'): 20,
-            ('IVT', 'ITSS'): 19, ('IVT', 'IB'): 22, ('ITSS', 'IB'): 17
-        },
-        '2023-08-02': {
-            ('PM', 'IVT'): 190, ('PM', 'ITSS'): 190, ('PM', 'IB'): 150,
-            ('IVT', 'ITSS'): 190, ('IVT', 'IB'): 140, ('ITSS', 'IB'): 120
-        },
-        '2023-08-03': {
-            ('PM', 'IVT'): 760, ('PM', 'ITSS'): 600, ('PM', 'IB'): 410,
-            ('IVT', 'ITSS'): 750, ('IVT', 'IB'): 460, ('ITSS', 'IB'): 500
-        },
-        '2023-08-04': {
-            ('PM', 'IVT'): 1090, ('PM', 'ITSS'): 1110, ('PM', 'IB'): 1070,
-            ('IVT', 'ITSS'): 1050, ('IVT', 'IB'): 1040, ('ITSS', 'IB'): 1090
-        }
-    }
-    
-    # Define intersection counts for triple/four programs (from spec Table 10)
-    triple_four_intersections = {
-        '2023-08-01': {
-            ('PM', 'IVT', 'ITSS'): 5, ('PM', 'IVT', 'IB'): 5,
-            ('IVT', 'ITSS', 'IB'): 5, ('PM', 'ITSS', 'IB'): 5,
-            ('PM', 'IVT', 'ITSS', 'IB'): 3
-        },
-        '2023-08-02': {
-            ('PM', 'IVT', 'ITSS'): 70, ('PM', 'IVT', 'IB'): 70,
-            ('IVT', 'ITSS', 'IB'): 70, ('PM', 'ITSS', 'IB'): 70,
-            ('PM', 'IVT', 'ITSS', 'IB'): 50
-        },
-        '2023-08-03': {
-            ('PM', 'IVT', 'ITSS'): 500, ('PM', 'IVT', 'IB'): 260,
-            ('IVT', 'ITSS', 'IB'): 300, ('PM', 'ITSS', 'IB'): 250,
-            ('PM', 'IVT', 'ITSS', 'IB'): 200
-        },
-        '2023-08-04': {
-            ('PM', 'IVT', 'ITSS'): 1020, ('PM', 'IVT', 'IB'): 1020,
-            ('IVT', 'ITSS', 'IB'): 1000, ('PM', 'ITSS', 'IB'): 1040,
-            ('PM', 'IVT', 'ITSS', 'IB'): 1000
-        }
-    }
-    
     # Convert target date to string for lookup
     date_str = target_date.strftime('%Y-%m-%d')
     
-    if date_str not in applicant_counts:
+    if date_str not in APPLICANT_COUNTS:
         # Use defaults if date not in spec
         date_str = '2023-08-01'
     
-    # Get counts for this date
-    counts = applicant_counts[date_str]
-    pair_int = pair_intersections.get(date_str, {})
-    triple_four_int = triple_four_intersections.get(date_str, {})
-    
-    # Generate unique applicant IDs
-    total_applicants = sum(counts.values())
-    applicant_ids = list(range(1, total_applicants + 1))
-    
-    # Create base dataframes for each program
+    targets = intersection_targets(date_str)
+
     all_data = []
-    
-    # Start with triple/four-way intersections to ensure proper overlap
-    processed_applicants = set()
-    
-    # Handle 4-program intersections
-    if ('PM', 'IVT', 'ITSS', 'IB') in triple_four_int:
-        count = triple_four_int[('PM', 'IVT', 'ITSS', 'IB')]
-        selected_ids = random.sample(applicant_ids, min(count, len(applicant_ids)))
-        for aid in selected_ids[:count]:
-            if aid in processed_applicants:
-                continue
-            # Add this applicant to all 4 programs
-            for prog in ['PM', 'IVT', 'ITSS', 'IB']:
-                all_data.append(create_applicant_record(aid, prog, target_date))
-            processed_applicants.add(aid)
-    
-    # Handle 3-program intersections
-    for progs, count in triple_four_int.items():
-        if len(progs) == 3:  # Three-way intersection
-            selected_ids = random.sample(applicant_ids, min(count, len(applicant_ids)))
-            for aid in selected_ids:
-                if aid in processed_applicants:
-                    continue
-                # Add this applicant to these 3 programs
-                for prog in progs:
-                    all_data.append(create_applicant_record(aid, prog, target_date))
-                processed_applicants.add(aid)
-    
-    # Handle 2-program intersections
-    for progs, count in pair_int.items():
-        if len(progs) == 2:  # Two-way intersection
-            selected_ids = random.sample(applicant_ids, min(count, len(applicant_ids)))
-            for aid in selected_ids:
-                if aid in processed_applicants:
-                    continue
-                # Add this applicant to these 2 programs
-                for prog in progs:
-                    all_data.append(create_applicant_record(aid, prog, target_date))
-                processed_applicants.add(aid)
-    
-    # Now fill remaining spots for each program
-    for prog, needed_count in counts.items():
-        current_prog_count = len([d for d in all_data if d['educational_program'] == prog])
-        still_needed = needed_count - current_prog_count
-        
-        if still_needed > 0:
-            available_ids = [aid for aid in applicant_ids if aid not in processed_applicants]
-            selected_ids = random.sample(available_ids, min(still_needed, len(available_ids)))
-            
-            for aid in selected_ids:
-                all_data.append(create_applicant_record(aid, prog, target_date))
-                processed_applicants.add(aid)
-    
+    for aid, progs in assign_memberships(exact_region_counts(targets)):
+        for prog in progs:
+            all_data.append(create_applicant_record(aid, prog, target_date))
+
+    verify_intersections(((d['applicant_id'], d['educational_program']) for d in all_data), targets)
+
     # Convert to DataFrame
     df = pd.DataFrame(all_data)
     
@@ -187,6 +144,75 @@ def generate_admission_data(target_date=None):
     return df
 
 
+def exact_region_counts(targets):
+    """
+    Number of applicants applying to exactly each group of programs, solved
+    from the intersection sizes by inclusion-exclusion:
+    exact(S) = sum over T containing S of (-1)^(|T| - |S|) * targets(T).
+    Groups missing from targets are treated as empty intersections.
+    """
+    regions = {}
+    for group in targets:
+        exact = sum(
+            (-1) ** (len(other) - len(group)) * count
+            for other, count in targets.items() if other >= group
+        )
+        if exact < 0:
+            raise ValueError(
+                f"Inconsistent intersection counts: {exact} applicants would apply "
+                f"to exactly {', '.join(sorted(group))}"
+            )
+        if exact:
+            regions[group] = exact
+    return regions
+
+
+def assign_memberships(regions):
+    """
+    Give every applicant the group of programs they apply to: the shuffled
+    applicant ids are cut into consecutive slices, one slice per group.
+    Yields (applicant_id, programs) pairs.
+    """
+    applicant_ids = list(range(1, sum(regions.values()) + 1))
+    random.shuffle(applicant_ids)
+
+    start = 0
+    for group, size in regions.items():
+        progs = sorted(group)
+        for aid in applicant_ids[start:start + size]:
+            yield aid, progs
+        start += size
+
+
+def verify_intersections(memberships, targets):
+    """
+    Check in one pass over (applicant_id, program) pairs that every group of
+    programs in targets has exactly the required intersection size
+    """
+    groups = {}
+    for aid, prog in memberships:
+        groups.setdefault(aid, set()).add(prog)
+
+    # Applicants with the same programs count towards the same intersections
+    group_sizes = {}
+    for progs in groups.values():
+        key = frozenset(progs)
+        group_sizes[key] = group_sizes.get(key, 0) + 1
+
+    actual = dict.fromkeys(targets, 0)
+    for progs, size in group_sizes.items():
+        for group in actual:
+            if group <= progs:
+                actual[group] += size
+
+    mismatched = {
+        ', '.join(sorted(group)): (actual[group], count)
+        for group, count in targets.items() if actual[group] != count
+    }
+    if mismatched:
+        raise ValueError(f"Generated intersections differ from the specification (actual, expected): {mismatched}")
+
+
 def create_applicant_record(applicant_id, program, date):
     """
     Create a single applicant record with realistic data
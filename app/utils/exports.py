@@ -0,0 +1,143 @@
+"""
+Utility module for streaming competition lists and allocation results as CSV or XLSX
+"""
+import csv
+import io
+import tempfile
+
+from flask import Response, stream_with_context
+from openpyxl import Workbook
+from sqlalchemy import select
+
+from ..models import db, AdmissionData
+from .rank_index import get_rank_index
+from .streaming import STREAM_CHUNK_SIZE
+
+
+EXPORT_FORMATS = ('csv', 'xlsx')
+
+# Columns of the full competition lists and of the accepted lists
+COMPETITION_COLUMNS = (
+    'rank', 'applicant_id', 'educational_program', 'priority_op', 'consent_given',
+    'physics_ikt', 'russian_lang', 'math', 'individual_achievements', 'total_score',
+    'allocated_program', 'passing_score'
+)
+ACCEPTED_COLUMNS = ('rank', 'applicant_id', 'educational_program', 'priority_op', 'total_score', 'passing_score')
+
+# Bytes read per chunk when sending a finished XLSX file
+XLSX_READ_SIZE = 64 * 1024
+
+
+def _list_rows(target_date, program, consenting_only):
+    """
+    Rows of a date in competition-list order (program, total score desc,
+    priority, id), read from the cursor STREAM_CHUNK_SIZE at a time
+    """
+    conditions = [AdmissionData.date == target_date]
+    if program:
+        conditions.append(AdmissionData.educational_program == program)
+    if consenting_only:
+        conditions.append(AdmissionData.consent_given == True)
+
+    query = select(
+        AdmissionData.applicant_id,
+        AdmissionData.educational_program,
+        AdmissionData.priority_op,
+        AdmissionData.consent_given,
+        AdmissionData.physics_ikt,
+        AdmissionData.russian_lang,
+        AdmissionData.math,
+        AdmissionData.individual_achievements,
+        AdmissionData.total_score
+    ).where(*conditions).order_by(
+        AdmissionData.educational_program,
+        AdmissionData.total_score.desc(),
+        AdmissionData.priority_op,
+        AdmissionData.id
+    )
+    return db.session.execute(query.execution_options(yield_per=STREAM_CHUNK_SIZE))
+
+
+def competition_rows(target_date, program=None):
+    """
+    Full competition lists with the rank in the program, the program the
+    applicant is allocated to and the program's passing score
+    """
+    # Built on the first row, i.e. after the header has been sent
+    index = get_rank_index(target_date)
+    current, rank = None, 0
+    for row in _list_rows(target_date, program, consenting_only=False):
+        applicant_id, prog_code = row[0], row[1]
+        if prog_code != current:
+            current, rank = prog_code, 0
+        rank += 1
+        yield (rank, *row, index.admitted.get(applicant_id, ''), index.scores[prog_code][0])
+
+
+def accepted_rows(target_date, program=None):
+    """
+    Accepted lists: the applicants allocated to each program, in admission order
+    """
+    index = get_rank_index(target_date)
+    current, rank = None, 0
+    for applicant_id, prog_code, priority, _, _, _, _, _, total_score in _list_rows(target_date, program, consenting_only=True):
+        if index.admitted.get(applicant_id) != prog_code:
+            continue
+        if prog_code != current:
+            current, rank = prog_code, 0
+        rank += 1
+        yield (rank, applicant_id, prog_code, priority, total_score, index.scores[prog_code][0])
+
+
+def csv_chunks(columns, rows):
+    """Serialize rows as CSV, STREAM_CHUNK_SIZE rows per chunk after a chunk with the header"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    # The header goes out at once, while the first rows may still be computed
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    for count, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if count % STREAM_CHUNK_SIZE == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def xlsx_chunks(columns, rows, title):
+    """
+    Write rows into a write-only workbook, which keeps them in a temporary
+    file instead of memory, then send the finished file piece by piece.
+    An XLSX file is a zip archive, so it can only be sent once complete.
+    """
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title)
+    sheet.append(columns)
+    for row in rows:
+        sheet.append(row)
+
+    with tempfile.TemporaryFile() as output:
+        workbook.save(output)
+        output.seek(0)
+        while True:
+            chunk = output.read(XLSX_READ_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+def export_response(columns, rows, export_format, filename):
+    """
+    Streamed CSV or XLSX attachment with the given rows
+    """
+    if export_format == 'csv':
+        chunks, mimetype = csv_chunks(columns, rows), 'text/csv'
+    else:
+        chunks = xlsx_chunks(columns, rows, filename)
+        mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}.{export_format}'
+    return response
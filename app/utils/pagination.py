@@ -0,0 +1,45 @@
+"""
+Utility module for keyset (cursor) pagination of list endpoints
+"""
+import base64
+import json
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*key):
+    """
+    Encode the sort key of the last row on a page into an opaque cursor
+    """
+    raw = json.dumps(key, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Decode a cursor produced by encode_cursor back into its sort key.
+
+    Raises ValueError for anything that is not a cursor of the expected size.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError('Invalid cursor') from e
+    if not isinstance(key, list) or len(key) != size or not all(isinstance(part, int) for part in key):
+        raise ValueError('Invalid cursor')
+    return tuple(key)
+
+
+def parse_page_size(value):
+    """
+    Page size from a request argument, capped at MAX_PAGE_SIZE
+    """
+    if not value:
+        return DEFAULT_PAGE_SIZE
+    page_size = int(value)
+    if page_size < 1:
+        raise ValueError('limit must be positive')
+    return min(page_size, MAX_PAGE_SIZE)
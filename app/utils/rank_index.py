@@ -0,0 +1,203 @@
+"""
+Utility module for per-applicant status lookups from an in-memory rank index
+"""
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+from sqlalchemy import select
+
+from ..models import db, EducationalProgram, AdmissionData
+from . import singleflight
+from .calculator import DayAllocator
+from .snapshots import get_snapshot, snapshot_number
+
+
+# A rank key packs the competition-list order (total score desc, priority,
+# row id) into one integer, so a program's list is a flat array('q')
+SCORE_SPAN = 1 << 20
+
+# Dates whose index is kept in memory; beyond it the least recently used is dropped
+RANK_INDEX_MAX_DATES = int(os.environ.get('RANK_INDEX_MAX_DATES', 8))
+
+
+def rank_key(total_score, priority, row_id):
+    return ((SCORE_SPAN - total_score) << 40) | (priority << 32) | row_id
+
+
+class RankIndex:
+    """
+    Competition lists and allocation of one date snapshot, kept in memory.
+
+    Built from a single pass over the date's rows: every program's list is
+    a sorted array of rank keys (all applications and consenting ones), and
+    the applications themselves are parallel arrays sorted by applicant id.
+    A lookup is a binary search for the applicant plus one per application.
+    """
+
+    def __init__(self, target_date, version, program_seats, rows):
+        """
+        rows are (id, applicant_id, educational_program, priority_op,
+        consent_given, total_score) ordered by total score desc, priority, id
+        """
+        self.date = target_date
+        self.version = version
+        self.program_seats = program_seats
+        self.programs = list(program_seats)
+        program_numbers = {code: number for number, code in enumerate(self.programs)}
+
+        self.rank_keys = {code: array('q') for code in self.programs}
+        self.consent_rank_keys = {code: array('q') for code in self.programs}
+        consenting = []
+        for row_id, applicant_id, prog_code, priority, consent, total_score in rows:
+            key = rank_key(total_score, priority, row_id)
+            self.rank_keys[prog_code].append(key)
+            if consent:
+                self.consent_rank_keys[prog_code].append(key)
+                consenting.append((applicant_id, prog_code, priority, total_score))
+
+        self.scores, accepted = DayAllocator(program_seats).allocate(consenting)
+        self.admitted = {
+            applicant_id: code
+            for code, applicants in accepted.items()
+            for applicant_id, _, _ in applicants
+        }
+
+        rows.sort(key=lambda row: (row[1], row[3]))
+        self.applicant_ids = array('q', (row[1] for row in rows))
+        self.row_ids = array('q', (row[0] for row in rows))
+        self.program_numbers = array('b', (program_numbers[row[2]] for row in rows))
+        self.priorities = array('b', (row[3] for row in rows))
+        self.consents = array('b', (bool(row[4]) for row in rows))
+        self.total_scores = array('h', (row[5] for row in rows))
+
+    def status(self, applicant_id):
+        """
+        The applicant's standing in every program they applied to, or None
+        when they are not in the lists of this date
+        """
+        start = bisect_left(self.applicant_ids, applicant_id)
+        end = bisect_right(self.applicant_ids, applicant_id, start)
+        if start == end:
+            return None
+
+        admitted_to = self.admitted.get(applicant_id)
+        programs = []
+        for i in range(start, end):
+            code = self.programs[self.program_numbers[i]]
+            consent = bool(self.consents[i])
+            key = rank_key(self.total_scores[i], self.priorities[i], self.row_ids[i])
+            passing_score, accepted_count = self.scores[code]
+
+            if admitted_to == code:
+                outcome = 'admitted'
+            elif not consent:
+                outcome = 'no_consent'
+            elif admitted_to is not None:
+                outcome = 'admitted_elsewhere'
+            else:
+                outcome = 'not_admitted'
+
+            programs.append({
+                'program': code,
+                'priority': self.priorities[i],
+                'consent_given': consent,
+                'total_score': self.total_scores[i],
+                'rank': bisect_left(self.rank_keys[code], key) + 1,
+                'applications': len(self.rank_keys[code]),
+                'consent_rank': bisect_left(self.consent_rank_keys[code], key) + 1 if consent else None,
+                'applications_with_consent': len(self.consent_rank_keys[code]),
+                'places': self.program_seats[code],
+                'passing_score': passing_score,
+                'accepted_count': accepted_count,
+                'outcome': outcome
+            })
+
+        return {
+            'applicant_id': applicant_id,
+            'date': self.date.isoformat(),
+            'admitted_to': admitted_to,
+            'programs': programs
+        }
+
+
+def build_rank_index(target_date, version):
+    """Load the rows of target_date once and allocate them into a RankIndex"""
+    program_seats = {prog.code: prog.budget_places for prog in EducationalProgram.query.all()}
+    rows = db.session.execute(
+        select(
+            AdmissionData.id,
+            AdmissionData.applicant_id,
+            AdmissionData.educational_program,
+            AdmissionData.priority_op,
+            AdmissionData.consent_given,
+            AdmissionData.total_score
+        ).where(
+            AdmissionData.date == target_date
+        ).order_by(
+            AdmissionData.total_score.desc(),
+            AdmissionData.priority_op,
+            AdmissionData.id
+        )
+    ).all()
+    return RankIndex(target_date, version, program_seats, rows)
+
+
+class RankIndexCache:
+    """
+    Latest RankIndex of recently queried dates, at most max_dates of them (LRU).
+
+    An index never replaces one of a newer snapshot of its date (a slow build
+    started before the date changed may finish after a fresh one), and
+    indexes of dates without applications are not kept.
+    """
+
+    def __init__(self, max_dates):
+        self.max_dates = max_dates
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()
+
+    def get(self, target_date, version):
+        """Index of the snapshot version of target_date, or None if it is not cached"""
+        with self._lock:
+            index = self._indexes.get(target_date)
+            if index is None or index.version != version:
+                return None
+            self._indexes.move_to_end(target_date)
+            return index
+
+    def put(self, index):
+        if not index.applicant_ids:
+            return
+        with self._lock:
+            cached = self._indexes.get(index.date)
+            if cached is not None and snapshot_number(cached.version) > snapshot_number(index.version):
+                return
+            self._indexes[index.date] = index
+            self._indexes.move_to_end(index.date)
+            while len(self._indexes) > self.max_dates:
+                self._indexes.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._indexes.clear()
+
+
+# Shared by every request of the process
+_indexes = RankIndexCache(RANK_INDEX_MAX_DATES)
+
+
+def get_rank_index(target_date):
+    """
+    RankIndex of the current snapshot of target_date, built on first use
+    (one build for concurrent callers)
+    """
+    snapshot = get_snapshot(target_date)
+    version = snapshot[0] if snapshot else None
+    index = _indexes.get(target_date, version)
+    if index is None:
+        index = singleflight.allocations.do(('rank_index', target_date, version), build_rank_index, target_date, version)
+        _indexes.put(index)
+    return index
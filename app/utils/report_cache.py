@@ -0,0 +1,113 @@
+"""
+Utility module for caching rendered reports on disk
+"""
+import glob
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+
+REPORT_CACHE_DIR = os.environ.get('REPORT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'admission-reports'))
+# Total size of the cached files; the least recently used ones are removed above it
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 256 * 1024 * 1024))
+# Partial files older than this were left by a worker that died while rendering
+PARTIAL_FILE_TTL = 3600
+
+
+class ReportCache:
+    """
+    Rendered report files addressed by (report type, date, snapshot version).
+
+    A file is rendered once per snapshot and served from disk until the data
+    of its date changes: storing a new version removes the older versions of
+    the same report, and the total size is kept under max_bytes by removing
+    the least recently served files (access time is kept in the file mtime).
+    The directory can be shared by several worker processes.
+    """
+
+    def __init__(self, directory=REPORT_CACHE_DIR, max_bytes=REPORT_CACHE_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def _prefix(self, kind, report_date):
+        return os.path.join(self.directory, f'{kind}-{report_date}-')
+
+    def path(self, kind, report_date, version, suffix='.pdf'):
+        digest = hashlib.sha1(repr(version).encode()).hexdigest()[:16]
+        return f'{self._prefix(kind, report_date)}{digest}{suffix}'
+
+    def get(self, kind, report_date, version, suffix='.pdf'):
+        """Path of the cached report, or None if it has not been rendered"""
+        path = self.path(kind, report_date, version, suffix)
+        try:
+            os.utime(path)
+            return path
+        except FileNotFoundError:
+            return None
+
+    def get_or_render(self, kind, report_date, version, render, suffix='.pdf'):
+        """
+        Path of the cached report, calling render(filename) to create it on a miss
+        """
+        cached = self.get(kind, report_date, version, suffix)
+        if cached is not None:
+            return cached
+
+        path = self.path(kind, report_date, version, suffix)
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Rendered under a private name, so readers never see a partial file
+        fd, partial = tempfile.mkstemp(dir=self.directory, suffix='.part')
+        os.close(fd)
+        try:
+            render(partial)
+            os.replace(partial, path)
+        except BaseException:
+            self._remove(partial)
+            raise
+
+        with self._lock:
+            self._remove_superseded(kind, report_date, path, suffix)
+            self._evict(keep=path)
+        return path
+
+    def _remove_superseded(self, kind, report_date, current, suffix):
+        for path in glob.glob(f'{glob.escape(self._prefix(kind, report_date))}*{suffix}'):
+            if path != current:
+                self._remove(path)
+
+    def _evict(self, keep):
+        entries = []
+        abandoned = time.time() - PARTIAL_FILE_TTL
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith('.part'):
+                if stat.st_mtime < abandoned:
+                    self._remove(entry.path)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                self._remove(path)
+                total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+# Shared by every request of the process
+reports = ReportCache()
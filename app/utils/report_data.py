@@ -0,0 +1,191 @@
+"""
+Utility module for collecting the data of a PDF report into an immutable model
+"""
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Optional, Tuple, Union
+
+from sqlalchemy import func, select
+
+from ..models import db, EducationalProgram, AdmissionData, DailyAggregate, DailyResult
+from .aggregates import get_application_counts
+from .calculator import DayAllocator
+from .results import ensure_daily_results
+
+
+PRIORITIES = (1, 2, 3, 4)
+
+
+@dataclass(frozen=True)
+class AcceptedApplicant:
+    applicant_id: int
+    total_score: int
+    priority: int
+
+
+@dataclass(frozen=True)
+class ProgramReport:
+    code: str
+    name: str
+    budget_places: int
+    passing_score: Union[int, str]
+    total_applications: int
+    # Applications and admitted applicants by priority 1-4
+    applications_by_priority: Tuple[int, ...]
+    accepted_by_priority: Tuple[int, ...]
+    accepted: Tuple[AcceptedApplicant, ...]
+
+
+@dataclass(frozen=True)
+class AdmissionReport:
+    report_date: date
+    generated_at: datetime
+    programs: Tuple[ProgramReport, ...]
+
+
+@dataclass(frozen=True)
+class ProgramDynamics:
+    code: str
+    name: str
+    budget_places: int
+    # One value per date of the report; None for a shortage
+    passing_scores: Tuple[Optional[int], ...]
+    accepted: Tuple[int, ...]
+    applications: Tuple[int, ...]
+    with_consent: Tuple[int, ...]
+
+
+@dataclass(frozen=True)
+class DynamicsReport:
+    start_date: date
+    end_date: date
+    generated_at: datetime
+    # Dates of the period that have applications
+    dates: Tuple[date, ...]
+    programs: Tuple[ProgramDynamics, ...]
+
+
+def collect_report_data(report_date):
+    """
+    Everything the admission report shows for report_date, from one
+    allocation run: one query for the consenting applications, the daily
+    aggregates for the application counts and one query for the programs
+    """
+    programs = EducationalProgram.query.all()
+    program_seats = {program.code: program.budget_places for program in programs}
+
+    consenting = db.session.execute(
+        select(
+            AdmissionData.applicant_id,
+            AdmissionData.educational_program,
+            AdmissionData.priority_op,
+            AdmissionData.total_score
+        ).where(
+            AdmissionData.date == report_date,
+            AdmissionData.consent_given == True
+        ).order_by(
+            AdmissionData.total_score.desc(),
+            AdmissionData.priority_op,
+            AdmissionData.id
+        )
+    ).all()
+    scores, accepted = DayAllocator(program_seats).allocate(consenting)
+    counts = get_application_counts(report_date)
+
+    program_reports = []
+    for program in programs:
+        program_counts = counts[program.code]
+        program_accepted = tuple(AcceptedApplicant(*applicant) for applicant in accepted[program.code])
+        program_reports.append(ProgramReport(
+            code=program.code,
+            name=program.name,
+            budget_places=program.budget_places,
+            passing_score=scores[program.code][0],
+            total_applications=program_counts['applications'],
+            applications_by_priority=tuple(program_counts['by_priority'].get(p, 0) for p in PRIORITIES),
+            accepted_by_priority=tuple(
+                sum(1 for applicant in program_accepted if applicant.priority == p) for p in PRIORITIES
+            ),
+            accepted=program_accepted
+        ))
+
+    return AdmissionReport(
+        report_date=report_date,
+        generated_at=datetime.now(),
+        programs=tuple(program_reports)
+    )
+
+
+def collect_dynamics_data(start_date, end_date):
+    """
+    Passing scores, accepted counts and consent counts of every program for
+    each date of [start_date, end_date], read from the stored daily results
+    and aggregates: the number of queries does not depend on the period length
+    """
+    ensure_daily_results(start_date, end_date)
+    programs = EducationalProgram.query.all()
+
+    results = db.session.execute(
+        select(
+            DailyResult.date,
+            DailyResult.educational_program,
+            DailyResult.passing_score,
+            DailyResult.accepted_count
+        ).where(
+            DailyResult.date >= start_date,
+            DailyResult.date <= end_date
+        )
+    ).all()
+    counts = db.session.execute(
+        select(
+            DailyAggregate.date,
+            DailyAggregate.educational_program,
+            DailyAggregate.consent_given,
+            func.sum(DailyAggregate.applications)
+        ).where(
+            DailyAggregate.date >= start_date,
+            DailyAggregate.date <= end_date
+        ).group_by(
+            DailyAggregate.date,
+            DailyAggregate.educational_program,
+            DailyAggregate.consent_given
+        )
+    ).all()
+
+    dates = sorted({row[0] for row in results})
+    position = {target_date: i for i, target_date in enumerate(dates)}
+    series = {
+        program.code: {
+            'passing_scores': [None] * len(dates),
+            'accepted': [0] * len(dates),
+            'applications': [0] * len(dates),
+            'with_consent': [0] * len(dates)
+        }
+        for program in programs
+    }
+
+    for target_date, code, passing_score, accepted_count in results:
+        if code in series:
+            series[code]['passing_scores'][position[target_date]] = passing_score
+            series[code]['accepted'][position[target_date]] = accepted_count
+    for target_date, code, consent, applications in counts:
+        if code in series and target_date in position:
+            series[code]['applications'][position[target_date]] += applications
+            if consent:
+                series[code]['with_consent'][position[target_date]] += applications
+
+    return DynamicsReport(
+        start_date=start_date,
+        end_date=end_date,
+        generated_at=datetime.now(),
+        dates=tuple(dates),
+        programs=tuple(
+            ProgramDynamics(
+                code=program.code,
+                name=program.name,
+                budget_places=program.budget_places,
+                **{name: tuple(values) for name, values in series[program.code].items()}
+            )
+            for program in programs
+        )
+    )
@@ -2,31 +2,86 @@
 Utility module for generating PDF reports
 """
 import os
+import tempfile
 from datetime import datetime
+from itertools import islice
+from pypdf import PdfWriter
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, LongTable, TableStyle
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
-from ..models import db, EducationalProgram, AdmissionData
-from .calculator import calculate_passing_scores, get_statistics_for_date
-import tempfile
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.widgets.markers import makeMarker
+from .report_data import collect_report_data, collect_dynamics_data
+from .report_cache import reports as report_cache
+
+
+# Accepted rows from which a multi-program report is laid out section by
+# section, every section as a separate task of the report workers
+PARALLEL_REPORT_MIN_ROWS = int(os.environ.get('PARALLEL_REPORT_MIN_ROWS', 5000))
 
+# Line colors of the programs in trend charts
+CHART_COLORS = (
+    colors.HexColor('#1f77b4'), colors.HexColor('#ff7f0e'),
+    colors.HexColor('#2ca02c'), colors.HexColor('#d62728')
+)
 
-def generate_pdf_report(report_date):
+# Rows per table of a long list. ReportLab splits a table again on every page
+# it spans, so one table per list makes layout quadratic in its length;
+# fixed-size repeat-header chunks keep it linear.
+LIST_CHUNK_ROWS = 500
+
+
+def list_tables(header, rows, col_widths, style):
     """
-    Generate a comprehensive PDF report with admission statistics
+    Lay out a long list as repeat-header LongTable chunks of at most
+    LIST_CHUNK_ROWS rows; rows is any iterable and is consumed chunk by chunk
     """
-    # Create temporary file for the PDF
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    temp_filename = temp_file.name
-    temp_file.close()
-    
-    # Create document
-    doc = SimpleDocTemplate(temp_filename, pagesize=A4)
-    elements = []
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, LIST_CHUNK_ROWS))
+        if not chunk:
+            return
+        table = LongTable([header] + chunk, colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        yield table
+
+
+def prepare_pdf_report(report_date, version, split=False):
+    """
+    Generate a comprehensive PDF report with admission statistics, rendered
+    once per snapshot version of the date (the version of the report job).
+
+    Returns the path of the report file, or - when split is allowed and the
+    report lays out in sections - the collected report, whose sections are
+    then rendered by render_program_section and joined by finish_pdf_report
+    """
+    cached = report_cache.get('pdf', report_date, version)
+    if cached is not None:
+        return cached
     
-    # Get styles
+    # Collect the data once, then lay it out
+    report = collect_report_data(report_date)
+    if split and lays_out_in_sections(report):
+        return report
+    return report_cache.get_or_render('pdf', report_date, version, lambda filename: render_pdf_report(report, filename))
+
+
+def finish_pdf_report(report_date, version, report, section_files, section_pages):
+    """Path of the report file joined from its separately rendered sections"""
+    return report_cache.get_or_render(
+        'pdf', report_date, version,
+        lambda filename: merge_report_sections(report, section_files, section_pages, filename)
+    )
+
+
+def report_styles():
+    """
+    (styles, title_style, heading_style) shared by all parts of the report
+    """
     styles = getSampleStyleSheet()
     title_style = ParagraphStyle(
         'CustomTitle',
@@ -43,35 +98,46 @@ def generate_pdf_report(report_date):
         spaceAfter=12,
         alignment=0
     )
+    return styles, title_style, heading_style
+
+
+def summary_elements(report, contents=None):
+    """
+    Title, passing scores and statistics of the report; contents is an
+    optional list of (section title, first page) for a table of contents
+    """
+    styles, title_style, heading_style = report_styles()
+    elements = []
     
     # Title
     title = Paragraph("Отчет о конкурсе на образовательные программы", title_style)
     elements.append(title)
     
     # Report generation info
-    gen_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    gen_time = report.generated_at.strftime("%Y-%m-%d %H:%M:%S")
     gen_info = Paragraph(f"Дата и время формирования отчета: {gen_time}", styles['Normal'])
     elements.append(gen_info)
     elements.append(Spacer(1, 12))
     
+    if contents is not None:
+        elements.append(Paragraph("Содержание:", heading_style))
+        contents_table = Table(
+            [[section_title, str(page)] for section_title, page in contents],
+            colWidths=[5.5 * inch, 0.7 * inch]
+        )
+        contents_table.setStyle(TableStyle([
+            ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
+            ('LINEBELOW', (0, 0), (-1, -1), 0.25, colors.grey)
+        ]))
+        elements.append(contents_table)
+        elements.append(Spacer(1, 20))
+    
     # Passing scores section
     elements.append(Paragraph("Проходные баллы на образовательные программы:", heading_style))
     
-    passing_scores = calculate_passing_scores(report_date)
     score_data = [['Программа', 'Код', 'Проходной балл']]
-    
-    for code, score_info in passing_scores.items():
-        program = EducationalProgram.query.filter_by(code=code).first()
-        if score_info['score'] == 'НЕДОБОР':
-            score_display = 'НЕДОБОР'
-        else:
-            score_display = str(score_info['score'])
-        
-        score_data.append([
-            program.name if program else code,
-            code,
-            score_display
-        ])
+    for program in report.programs:
+        score_data.append([program.name, program.code, str(program.passing_score)])
     
     score_table = Table(score_data)
     score_table.setStyle(TableStyle([
@@ -91,7 +157,6 @@ def generate_pdf_report(report_date):
     # Statistics table
     elements.append(Paragraph("Статистика по образовательным программам:", heading_style))
     
-    stats = get_statistics_for_date(report_date)
     stats_headers = [
         'Программа', 'Код', 'Всего заявлений', 'Мест', 
         'Заявления 1-го приоритета', 'Заявления 2-го приоритета', 
@@ -102,22 +167,15 @@ def generate_pdf_report(report_date):
     
     stats_data = [stats_headers]
     
-    for code, stat_info in stats.items():
-        row = [
-            stat_info['program_name'],
-            code,
-            stat_info['total_applications'],
-            stat_info['budget_places'],
-            stat_info['applications_by_priority'][1],
-            stat_info['applications_by_priority'][2],
-            stat_info['applications_by_priority'][3],
-            stat_info['applications_by_priority'][4],
-            stat_info['accepted_by_priority'][1],
-            stat_info['accepted_by_priority'][2],
-            stat_info['accepted_by_priority'][3],
-            stat_info['accepted_by_priority'][4]
-        ]
-        stats_data.append(row)
+    for program in report.programs:
+        stats_data.append([
+            program.name,
+            program.code,
+            program.total_applications,
+            program.budget_places,
+            *program.applications_by_priority,
+            *program.accepted_by_priority
+        ])
     
     stats_table = Table(stats_data)
     stats_table.setStyle(TableStyle([
@@ -134,35 +192,28 @@ def generate_pdf_report(report_date):
     
     elements.append(stats_table)
     elements.append(Spacer(1, 20))
+    return elements
+
+
+def section_title(program):
+    return f"Список абитуриентов, зачисленных на программу '{program.name}' ({program.code})"
+
+
+def program_elements(program):
+    """
+    Accepted applicants section of one program of the report
+    """
+    styles, _, heading_style = report_styles()
+    elements = [Paragraph(f"{section_title(program)}:", heading_style)]
     
-    # Accepted applicants for each program
-    programs = EducationalProgram.query.all()
-    for program in programs:
-        elements.append(Paragraph(f"Список абитуриентов, зачисленных на программу '{program.name}' ({program.code}):", heading_style))
-        
-        # Get accepted applicants for this program
-        passing_scores_for_date = calculate_passing_scores(report_date)
-        if passing_scores_for_date[program.code]['score'] != 'НЕДОБОР':
-            accepted_applicants = db.session.query(AdmissionData).filter(
-                AdmissionData.date == report_date,
-                AdmissionData.educational_program == program.code,
-                AdmissionData.consent_given == True
-            ).order_by(AdmissionData.total_score.desc()).limit(program.budget_places).all()
-        else:
-            # If shortage, get all applicants with consent
-            accepted_applicants = db.session.query(AdmissionData).filter(
-                AdmissionData.date == report_date,
-                AdmissionData.educational_program == program.code,
-                AdmissionData.consent_given == True
-            ).order_by(AdmissionData.total_score.desc()).all()
-        
-        if accepted_applicants:
-            applicants_data = [['ID абитуриента', 'Сумма баллов', 'Приоритет']]
-            for app in accepted_applicants:
-                applicants_data.append([str(app.applicant_id), str(app.total_score), str(app.priority_op)])
-            
-            applicants_table = Table(applicants_data)
-            applicants_table.setStyle(TableStyle([
+    if program.accepted:
+        # Long lists are split into chunks that repeat the header on every page
+        elements.extend(list_tables(
+            ['ID абитуриента', 'Сумма баллов', 'Приоритет'],
+            ([str(applicant.applicant_id), str(applicant.total_score), str(applicant.priority)]
+             for applicant in program.accepted),
+            [1.8 * inch] * 3,
+            TableStyle([
                 ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
                 ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
                 ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -171,99 +222,229 @@ def generate_pdf_report(report_date):
                 ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
                 ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
                 ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elements.append(applicants_table)
-        else:
-            elements.append(Paragraph("Нет зачисленных абитуриентов.", styles['Normal']))
-        
-        elements.append(Spacer(1, 20))
+            ])
+        ))
+    else:
+        elements.append(Paragraph("Нет зачисленных абитуриентов.", styles['Normal']))
     
-    # Build the PDF
-    doc.build(elements)
+    elements.append(Spacer(1, 20))
+    return elements
+
+
+def lays_out_in_sections(report):
+    """Whether the report is large enough to lay out its program sections in parallel"""
+    accepted_rows = sum(len(program.accepted) for program in report.programs)
+    return len(report.programs) > 1 and accepted_rows >= PARALLEL_REPORT_MIN_ROWS
+
+
+def render_pdf_report(report, filename):
+    """
+    Lay out an AdmissionReport as a PDF file in one piece; works only on the report model
+    """
+    elements = summary_elements(report)
+    for program in report.programs:
+        elements.extend(program_elements(program))
     
-    return temp_filename
+    # Build the PDF
+    SimpleDocTemplate(filename, pagesize=A4).build(elements)
 
 
-def generate_dynamic_report(start_date, end_date):
+def render_program_section(program, filename):
+    """
+    Lay out the section of one program as a separate PDF; returns its page count
     """
-    Generate a dynamic report showing the dynamics of passing scores over time
+    doc = SimpleDocTemplate(filename, pagesize=A4)
+    doc.build(program_elements(program))
+    return doc.page
+
+
+def merge_report_sections(report, section_files, section_pages, filename):
     """
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf')
-    temp_filename = temp_file.name
-    temp_file.close()
+    Put the summary with a table of contents in front of the separately laid
+    out program sections (render_program_section) in one PDF.
+
+    Sections start on a new page; the document outline has an entry per section.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        # The contents list the first page of every section, which depends on
+        # the length of the summary itself: lay it out until the length is stable
+        summary_file = os.path.join(directory, 'summary.pdf')
+        summary_pages = 1
+        while True:
+            first_pages = [summary_pages + 1 + sum(section_pages[:index]) for index in range(len(section_pages))]
+            contents = [(section_title(program), page) for program, page in zip(report.programs, first_pages)]
+            doc = SimpleDocTemplate(summary_file, pagesize=A4)
+            doc.build(summary_elements(report, contents))
+            if doc.page == summary_pages:
+                break
+            summary_pages = doc.page
+        
+        writer = PdfWriter()
+        writer.append(summary_file)
+        for program, section_file in zip(report.programs, section_files):
+            writer.append(section_file, outline_item=f'{program.name} ({program.code})')
+        with open(filename, 'wb') as output:
+            writer.write(output)
+
+
+def generate_dynamic_report(start_date, end_date, version):
+    """
+    Generate a dynamic report showing the dynamics of passing scores over time.
+    Returns the path of the report file, rendered once per version of the
+    period (the version the report job was submitted for)
+    """
+    return report_cache.get_or_render(
+        'dynamics', f'{start_date}_{end_date}', version,
+        lambda filename: render_dynamic_report(collect_dynamics_data(start_date, end_date), filename)
+    )
+
+
+def trend_chart(title, dates, series):
+    """
+    Line chart of per-program values over the dates of a dynamics report;
+    series is a list of (program code, values), None values are left out
+    """
+    drawing = Drawing(6.2 * inch, 2.8 * inch)
+    drawing.add(String(0, drawing.height - 12, title, fontName='Helvetica-Bold', fontSize=10))
     
-    doc = SimpleDocTemplate(temp_filename, pagesize=A4)
-    elements = []
+    chart = HorizontalLineChart()
+    chart.x, chart.y = 35, 40
+    chart.width, chart.height = drawing.width - 130, drawing.height - 65
+    chart.data = [tuple(values) for _, values in series]
+    chart.joinedLines = 1
     
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        spaceAfter=30,
-        alignment=1
-    )
+    # At most about a dozen date labels, whatever the length of the period
+    step = max(1, len(dates) // 12)
+    chart.categoryAxis.categoryNames = [
+        d.strftime('%d.%m') if i % step == 0 else '' for i, d in enumerate(dates)
+    ]
+    chart.categoryAxis.labels.angle = 45
+    chart.categoryAxis.labels.boxAnchor = 'ne'
+    chart.categoryAxis.labels.fontSize = 7
+    chart.valueAxis.labels.fontSize = 7
     
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=14,
-        spaceAfter=12,
-        alignment=0
-    )
+    for i in range(len(series)):
+        chart.lines[i].strokeColor = CHART_COLORS[i % len(CHART_COLORS)]
+        chart.lines[i].symbol = makeMarker('FilledCircle', size=3)
+    drawing.add(chart)
+    
+    legend = Legend()
+    legend.x, legend.y = drawing.width - 80, drawing.height - 30
+    legend.fontSize = 8
+    legend.colorNamePairs = [
+        (CHART_COLORS[i % len(CHART_COLORS)], code) for i, (code, _) in enumerate(series)
+    ]
+    drawing.add(legend)
+    return drawing
+
+
+def _change(first, last):
+    if first is None or last is None:
+        return '-'
+    return f'{last - first:+d}'
+
+
+def render_dynamic_report(report, filename):
+    """
+    Lay out a DynamicsReport as a PDF file: trend charts of passing scores,
+    accepted counts and consents, then the day-by-day figures of every program
+    """
+    doc = SimpleDocTemplate(filename, pagesize=A4)
+    styles, title_style, heading_style = report_styles()
+    elements = []
     
     # Title
     title = Paragraph("Динамика проходных баллов по образовательным программам", title_style)
     elements.append(title)
+    elements.append(Paragraph(
+        f"Период: {report.start_date.strftime('%d.%m.%Y')} - {report.end_date.strftime('%d.%m.%Y')}. "
+        f"Дата и время формирования отчета: {report.generated_at.strftime('%Y-%m-%d %H:%M:%S')}",
+        styles['Normal']
+    ))
+    elements.append(Spacer(1, 12))
     
-    # TODO: Add charts showing the dynamics of passing scores over time
-    elements.append(Paragraph("Динамика проходных баллов (графики):", heading_style))
-    elements.append(Paragraph("На этой странице должны отображаться графики динамики проходных баллов по программам за указанный период.", styles['Normal']))
+    if not report.dates:
+        elements.append(Paragraph("Нет данных за указанный период.", styles['Normal']))
+        doc.build(elements)
+        return
+    
+    # Trends
+    elements.append(Paragraph("Динамика по программам:", heading_style))
+    charts = (
+        ("Проходной балл", 'passing_scores'),
+        ("Зачислено", 'accepted'),
+        ("Заявления с согласием", 'with_consent'),
+    )
+    for chart_title, field in charts:
+        series = [(program.code, getattr(program, field)) for program in report.programs]
+        if any(value is not None for _, values in series for value in values):
+            elements.append(trend_chart(chart_title, report.dates, series))
+            elements.append(Spacer(1, 12))
     
+    # Changes over the whole period
+    elements.append(Paragraph("Изменения за период:", heading_style))
+    summary_data = [['Код', 'Проходной балл (начало)', 'Проходной балл (конец)', 'Изменение',
+                     'Согласия (начало)', 'Согласия (конец)', 'Прирост согласий']]
+    for program in report.programs:
+        first_score, last_score = program.passing_scores[0], program.passing_scores[-1]
+        summary_data.append([
+            program.code,
+            'НЕДОБОР' if first_score is None else str(first_score),
+            'НЕДОБОР' if last_score is None else str(last_score),
+            _change(first_score, last_score),
+            str(program.with_consent[0]),
+            str(program.with_consent[-1]),
+            _change(program.with_consent[0], program.with_consent[-1])
+        ])
+    summary_table = Table(summary_data)
+    summary_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ]))
+    elements.append(summary_table)
     elements.append(Spacer(1, 20))
     
     # Detailed daily breakdown
-    elements.append(Paragraph("Детальная информация по дням:", heading_style))
-    
-    # For simplicity, let's assume we're looking at the standard dates from the assignment
-    standard_dates = ["2023-08-01", "2023-08-02", "2023-08-03", "2023-08-04"]
-    
-    for date_str in standard_dates:
-        report_date = datetime.strptime(date_str, '%Y-%m-%d').date()
-        elements.append(Paragraph(f"Дата: {report_date.strftime('%d.%m.%Y')}", styles['Heading3']))
-        
-        daily_scores = calculate_passing_scores(report_date)
-        daily_data = [['Программа', 'Код', 'Проходной балл']]
-        
-        for code, score_info in daily_scores.items():
-            program = EducationalProgram.query.filter_by(code=code).first()
-            if score_info['score'] == 'НЕДОБОР':
-                score_display = 'НЕДОБОР'
-            else:
-                score_display = str(score_info['score'])
-            
-            daily_data.append([
-                program.name if program else code,
-                code,
-                score_display
-            ])
+    daily_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    for program in report.programs:
+        elements.append(Paragraph(f"{program.name} ({program.code}), мест: {program.budget_places}", heading_style))
         
-        daily_table = Table(daily_data)
-        daily_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
+        def daily_rows(program=program):
+            previous_score = previous_consent = None
+            for i, report_date in enumerate(report.dates):
+                score, consent = program.passing_scores[i], program.with_consent[i]
+                yield [
+                    report_date.strftime('%d.%m.%Y'),
+                    'НЕДОБОР' if score is None else str(score),
+                    _change(previous_score, score),
+                    str(program.accepted[i]),
+                    str(program.applications[i]),
+                    str(consent),
+                    _change(previous_consent, consent)
+                ]
+                previous_score, previous_consent = score, consent
         
-        elements.append(daily_table)
+        elements.extend(list_tables(
+            ['Дата', 'Проходной балл', 'Изменение', 'Зачислено', 'Заявления', 'С согласием', 'Прирост'],
+            daily_rows(),
+            [0.95 * inch, 0.95 * inch, 0.8 * inch, 0.8 * inch, 0.8 * inch, 0.9 * inch, 0.7 * inch],
+            daily_style
+        ))
         elements.append(Spacer(1, 15))
     
     doc.build(elements)
-    
-    return temp_filename
\ No newline at end of file
@@ -0,0 +1,209 @@
+"""
+Utility module for rendering reports in a pool of worker processes
+"""
+import asyncio
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+
+# Reports rendered at the same time; the rest wait in the queue
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+# Jobs queued or running at once; submitting more is refused until some finish
+MAX_PENDING_REPORT_JOBS = int(os.environ.get('MAX_PENDING_REPORT_JOBS', 16))
+# Seconds a finished job is kept for polling and download
+FINISHED_JOB_TTL = 600
+
+
+class JobQueueFull(Exception):
+    """Raised when MAX_PENDING_REPORT_JOBS jobs are already queued or running"""
+
+
+_worker_app = None
+
+
+def _init_worker():
+    global _worker_app
+    from ..main import create_app
+    _worker_app = create_app()
+
+
+# The version of the job's key is passed in: the snapshot cache of a worker
+# process is not invalidated by commits of the request processes
+def _prepare_pdf_report(report_date, version, split):
+    from .report_generator import prepare_pdf_report
+    with _worker_app.app_context():
+        return prepare_pdf_report(report_date, version, split)
+
+
+def _render_program_section(program, filename):
+    from .report_generator import render_program_section
+    return render_program_section(program, filename)
+
+
+def _finish_pdf_report(report_date, version, report, section_files, section_pages):
+    from .report_generator import finish_pdf_report
+    return finish_pdf_report(report_date, version, report, section_files, section_pages)
+
+
+def _render_dynamic_report(start_date, end_date, version):
+    from .report_generator import generate_dynamic_report
+    with _worker_app.app_context():
+        return generate_dynamic_report(start_date, end_date, version)
+
+
+class ReportJob:
+    def __init__(self, job_id, key, future):
+        self.id = job_id
+        self.key = key
+        self.future = future
+        self.finished_at = None
+
+    def reusable(self):
+        """Whether a new request for the same report can be answered by this job"""
+        if not self.future.done():
+            return True
+        return self.future.exception() is None and os.path.exists(self.future.result())
+
+    @property
+    def state(self):
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds for the job to finish; returns its state"""
+        try:
+            self.future.exception(timeout=timeout)
+        except TimeoutError:
+            pass
+        return self.state
+
+    async def wait_async(self, timeout):
+        """wait() for ASGI handlers: waits on the running event loop without holding a thread"""
+        await asyncio.wait({asyncio.wrap_future(self.future)}, timeout=timeout)
+        return self.state
+
+    def to_dict(self):
+        data = {'job_id': self.id, 'state': self.state}
+        if data['state'] == 'failed':
+            data['message'] = str(self.future.exception())
+        return data
+
+
+class ReportJobQueue:
+    """
+    Report rendering jobs of this process, run by a bounded pool of worker
+    processes so ReportLab layout never occupies the request workers.
+
+    Every rendering step is a task of that one pool: a large multi-program
+    PDF report is collected by one task, its program sections are laid out
+    by parallel tasks and joined by a last one. A thread of this process
+    waits for the steps in between, so at most `workers` processes render.
+
+    A job is submitted per (report type, date, snapshot version); submitting
+    the same key while its job is still known returns that job. The rendered
+    file is written to the shared report cache, so any process can serve it.
+    Job ids are only known to the process that created them.
+    """
+
+    def __init__(self, workers=REPORT_WORKERS, max_pending=MAX_PENDING_REPORT_JOBS):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._lock = threading.RLock()
+        self._executor = None
+        # Threads waiting for the steps of split PDF reports
+        self._coordinator = ThreadPoolExecutor(max_workers=max_pending, thread_name_prefix='report-job')
+        self._jobs = {}
+        self._by_key = {}
+
+    def _pool(self):
+        if self._executor is None:
+            # Spawned workers do not inherit the database connections of this process
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def _run(self, func, *args):
+        """Submit one task to the report pool"""
+        with self._lock:
+            try:
+                return self._pool().submit(func, *args)
+            except BrokenProcessPool:
+                # A worker died and took the pool down with it; start a new one
+                self._executor = None
+                return self._pool().submit(func, *args)
+
+    def submit_pdf_report(self, report_date, version):
+        return self._submit(
+            ('pdf', report_date, version),
+            lambda: self._coordinator.submit(self._render_pdf_report, report_date, version)
+        )
+
+    def submit_dynamic_report(self, start_date, end_date, version):
+        return self._submit(
+            ('dynamics', f'{start_date}_{end_date}', version),
+            lambda: self._run(_render_dynamic_report, start_date, end_date, version)
+        )
+
+    def _render_pdf_report(self, report_date, version):
+        prepared = self._run(_prepare_pdf_report, report_date, version, self.workers > 1).result()
+        if isinstance(prepared, str):
+            return prepared
+
+        # The sections are laid out in parallel by the pool, then joined
+        directory = tempfile.mkdtemp(prefix='report-sections-')
+        try:
+            section_files = [os.path.join(directory, f'section-{index}.pdf') for index in range(len(prepared.programs))]
+            sections = [
+                self._run(_render_program_section, program, section_file)
+                for program, section_file in zip(prepared.programs, section_files)
+            ]
+            section_pages = [section.result() for section in sections]
+            return self._run(
+                _finish_pdf_report, report_date, version, prepared, section_files, section_pages
+            ).result()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    def _submit(self, key, start):
+        with self._lock:
+            self._forget_expired()
+            job = self._by_key.get(key)
+            if job is not None and job.reusable():
+                return job
+
+            pending = sum(1 for queued in self._jobs.values() if not queued.future.done())
+            if pending >= self.max_pending:
+                raise JobQueueFull('Too many reports are being generated, try again later')
+
+            job = ReportJob(uuid.uuid4().hex, key, start())
+            job.future.add_done_callback(lambda _: setattr(job, 'finished_at', time.monotonic()))
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._forget_expired()
+            return self._jobs.get(job_id)
+
+    def _forget_expired(self):
+        expired = time.monotonic() - FINISHED_JOB_TTL
+        for job in [job for job in self._jobs.values() if job.finished_at and job.finished_at < expired]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+
+# Shared by every request of the process
+reports = ReportJobQueue()
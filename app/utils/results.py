@@ -0,0 +1,87 @@
+"""
+Utility module for maintaining materialized daily allocation results
+"""
+from itertools import groupby
+from operator import itemgetter
+
+from sqlalchemy import select
+
+from ..models import db, EducationalProgram, AdmissionData, DailyAggregate, DailyResult
+from .calculator import DayAllocator
+
+
+def refresh_daily_results(dates):
+    """
+    Recompute the passing score and accepted count of every program for the
+    given dates, with one query over their consenting rows.
+
+    Runs in the caller's session after refresh_daily_aggregates, so the
+    results are committed together with the data change that made them
+    stale. Dates without any applications get no results.
+    """
+    dates = set(dates)
+    db.session.flush()
+    DailyResult.query.filter(DailyResult.date.in_(dates)).delete(synchronize_session=False)
+
+    dates_with_data = set(db.session.scalars(
+        select(DailyAggregate.date).where(DailyAggregate.date.in_(dates)).distinct()
+    ))
+    if not dates_with_data:
+        return
+
+    program_seats = {prog.code: prog.budget_places for prog in EducationalProgram.query.all()}
+    rows = db.session.execute(
+        select(
+            AdmissionData.date,
+            AdmissionData.applicant_id,
+            AdmissionData.educational_program,
+            AdmissionData.priority_op,
+            AdmissionData.total_score
+        ).where(
+            AdmissionData.date.in_(dates_with_data),
+            AdmissionData.consent_given == True
+        ).order_by(
+            AdmissionData.date,
+            AdmissionData.total_score.desc(),
+            AdmissionData.priority_op,
+            AdmissionData.id
+        )
+    )
+    rows_by_date = {target_date: list(day_rows) for target_date, day_rows in groupby(rows, key=itemgetter(0))}
+
+    allocator = DayAllocator(program_seats)
+    mappings = []
+    for target_date in sorted(dates_with_data):
+        scores, _ = allocator.allocate(rows_by_date.get(target_date, []))
+        for code, (score, accepted_count) in scores.items():
+            shortage = score == 'НЕДОБОР'
+            mappings.append({
+                'date': target_date,
+                'educational_program': code,
+                'passing_score': None if shortage else score,
+                'shortage': shortage,
+                'accepted_count': accepted_count
+            })
+    db.session.bulk_insert_mappings(DailyResult, mappings)
+
+
+def ensure_daily_results(start_date, end_date):
+    """
+    Compute and commit the results of dates in [start_date, end_date] that
+    have applications but no stored results yet (data loaded before the
+    results were materialized)
+    """
+    missing = set(db.session.scalars(
+        select(DailyAggregate.date).where(
+            DailyAggregate.date >= start_date,
+            DailyAggregate.date <= end_date
+        ).distinct()
+    )) - set(db.session.scalars(
+        select(DailyResult.date).where(
+            DailyResult.date >= start_date,
+            DailyResult.date <= end_date
+        ).distinct()
+    ))
+    if missing:
+        refresh_daily_results(missing)
+        db.session.commit()
@@ -0,0 +1,234 @@
+"""
+Utility module for pushing passing-score changes to clients (Server-Sent Events)
+"""
+import asyncio
+import os
+import queue
+import threading
+import time
+
+from sqlalchemy import select
+
+from ..models import db, DailyResult, SnapshotVersion
+from .streaming import dumps
+
+
+# Seconds between keep-alive comments on an idle event stream
+HEARTBEAT_INTERVAL = 15
+
+# Milliseconds a disconnected EventSource waits before reconnecting
+RETRY_INTERVAL = 5000
+
+# Undelivered events kept per client; a client that falls this far behind is dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Seconds between checks of the snapshot versions for changes made by any worker process
+POLL_INTERVAL = float(os.environ.get('SCORE_EVENTS_POLL_INTERVAL', 2))
+
+# Response headers of an event stream
+EVENT_STREAM_HEADERS = {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    # Let reverse proxies pass events through without buffering
+    'X-Accel-Buffering': 'no',
+}
+
+
+def format_event(event):
+    """Serialize an event in the text/event-stream format"""
+    return f"id: {event['version']}\nevent: scores\ndata: {dumps(event).decode()}\n\n"
+
+
+class _ThreadSubscriber:
+    """Event queue of a client served by a worker thread (WSGI)"""
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            return False
+        return True
+
+    def close(self):
+        with self.queue.mutex:
+            self.queue.queue.clear()
+        self.queue.put_nowait(None)
+
+
+class _AsyncSubscriber:
+    """Event queue of a client served by an event loop (ASGI); fed from any thread"""
+
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue()
+        self.closed = False
+        # Each counter has a single writer: the broker and the consumer respectively
+        self.delivered = 0
+        self.consumed = 0
+
+    def deliver(self, event):
+        if self.delivered - self.consumed >= SUBSCRIBER_QUEUE_SIZE:
+            return False
+        self.delivered += 1
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, event)
+        return True
+
+    def close(self):
+        self.closed = True
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, None)
+
+
+class ScoreEventBroker:
+    """
+    Fan-out of passing-score deltas to the event streams of this process.
+
+    Changes are not handed over in memory by the request that made them:
+    every worker process polls the snapshot versions in the database, which
+    each ingest bumps in its own transaction, and publishes the stored
+    results of the dates that changed. Subscribers of any worker therefore
+    see every ingest, whichever worker handled it.
+
+    The broker remembers the last published allocation of every date, so an
+    event carries only the programs whose passing score or accepted count
+    actually changed (the first event of a date after the process started
+    carries all of them). Clients are served either by a worker thread
+    (stream) or by an event loop without a thread of their own (astream).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._published = {}
+        # Snapshot versions seen by the previous poll, None before the first one
+        self._versions = None
+        self._poller = None
+
+    def watch(self, app):
+        """Start polling the database of app for changes (once per process)"""
+        with self._lock:
+            if self._poller is not None:
+                return
+            self._poller = threading.Thread(target=self._poll_forever, args=(app,), name='score-events', daemon=True)
+            self._poller.start()
+
+    def _poll_forever(self, app):
+        while True:
+            try:
+                with app.app_context():
+                    self.poll()
+            except Exception:
+                app.logger.exception('Could not poll passing-score changes')
+            time.sleep(POLL_INTERVAL)
+
+    def poll(self):
+        """
+        Publish the stored allocation of every date whose snapshot version
+        changed since the previous poll; the first poll only records the
+        current versions. Runs in an application context. Returns the events.
+        """
+        versions = dict(db.session.execute(select(SnapshotVersion.date, SnapshotVersion.version)).all())
+        previous, self._versions = self._versions, versions
+        if previous is None:
+            return []
+        changed = sorted(target_date for target_date, version in versions.items() if previous.get(target_date) != version)
+        if not changed:
+            return []
+
+        allocations = {target_date: {} for target_date in changed}
+        results = db.session.execute(
+            select(
+                DailyResult.date,
+                DailyResult.educational_program,
+                DailyResult.passing_score,
+                DailyResult.shortage,
+                DailyResult.accepted_count
+            ).where(DailyResult.date.in_(changed))
+        )
+        for target_date, code, passing_score, shortage, accepted_count in results:
+            allocations[target_date][code] = {
+                'score': 'НЕДОБОР' if shortage else passing_score,
+                'accepted_count': accepted_count
+            }
+
+        events = []
+        for target_date in changed:
+            event = self.publish(target_date, f'{target_date.isoformat()}-v{versions[target_date]}', allocations[target_date])
+            if event is not None:
+                events.append(event)
+        return events
+
+    def subscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, target_date, version, allocation):
+        """
+        Publish the changes of allocation ({code: {'score', 'accepted_count'}})
+        against the previous one for target_date. Returns the event or None
+        when nothing changed.
+        """
+        with self._lock:
+            previous = self._published.get(target_date, {})
+            changes = {
+                code: values for code, values in allocation.items()
+                if previous.get(code) != values
+            }
+            self._published[target_date] = allocation
+            if not changes:
+                return None
+
+            event = {'date': target_date.isoformat(), 'version': version, 'changes': changes}
+            for subscriber in list(self._subscribers):
+                if not subscriber.deliver(event):
+                    # The client stopped reading: end its stream so that it
+                    # reconnects and reloads the page data
+                    self._subscribers.discard(subscriber)
+                    subscriber.close()
+        return event
+
+    def stream(self):
+        """Generator of the text/event-stream body for one client (blocks a thread)"""
+        subscriber = self.subscribe(_ThreadSubscriber())
+        try:
+            yield f'retry: {RETRY_INTERVAL}\n\n'
+            while True:
+                try:
+                    event = subscriber.queue.get(timeout=HEARTBEAT_INTERVAL)
+                except queue.Empty:
+                    yield ': keep-alive\n\n'
+                    continue
+                if event is None:
+                    return
+                yield format_event(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def astream(self):
+        """Async generator of the text/event-stream body for one client"""
+        subscriber = self.subscribe(_AsyncSubscriber())
+        try:
+            yield f'retry: {RETRY_INTERVAL}\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), HEARTBEAT_INTERVAL)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                if event is None or subscriber.closed:
+                    return
+                subscriber.consumed += 1
+                yield format_event(event)
+        finally:
+            self.unsubscribe(subscriber)
+
+
+broker = ScoreEventBroker()
+
@@ -0,0 +1,120 @@
+"""
+Utility module for per-date snapshot versions and conditional GET responses
+"""
+import threading
+import time
+from datetime import datetime
+
+from flask import current_app, request
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from ..models import db, SnapshotVersion
+
+
+# Seconds a version is served from process memory without querying the database.
+# The process that changes a date drops its entry at once; other worker
+# processes pick the new version up within this interval.
+VERSION_TTL = 5.0
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+
+def bump_snapshot(target_date):
+    """
+    Record a change of the data for target_date in the caller's session
+    """
+    snapshot = db.session.get(SnapshotVersion, target_date)
+    if snapshot is None:
+        snapshot = SnapshotVersion(date=target_date, version=0)
+        db.session.add(snapshot)
+    snapshot.version += 1
+    snapshot.updated_at = datetime.utcnow().replace(microsecond=0)
+    # The cached version is dropped once the change is committed
+    db.session.info.setdefault('snapshot_dates', set()).add(target_date)
+
+
+@event.listens_for(Session, 'after_commit')
+def _forget_committed_snapshots(session):
+    dates = session.info.pop('snapshot_dates', ())
+    with _versions_lock:
+        for target_date in dates:
+            _versions.pop(target_date, None)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_snapshots(session):
+    session.info.pop('snapshot_dates', None)
+
+
+def get_snapshot(target_date):
+    """
+    (etag, last_modified) of the snapshot for target_date, or None when the
+    date has never been written. Served from memory while fresh.
+    """
+    now = time.monotonic()
+    with _versions_lock:
+        cached = _versions.get(target_date)
+    if cached and cached[0] > now:
+        return cached[1]
+
+    snapshot = db.session.get(SnapshotVersion, target_date)
+    value = None
+    if snapshot is not None:
+        value = (f'{target_date.isoformat()}-v{snapshot.version}', snapshot.updated_at)
+    with _versions_lock:
+        _versions[target_date] = (now + VERSION_TTL, value)
+    return value
+
+
+def snapshot_number(etag):
+    """Change counter of a snapshot etag ('2024-08-01-v3' -> 3); 0 for None"""
+    return int(etag.rsplit('-v', 1)[1]) if etag else 0
+
+
+def get_range_version(start_date, end_date):
+    """
+    Versions of every written date in [start_date, end_date]; changes whenever
+    the data of any date of the period changes
+    """
+    rows = db.session.execute(
+        select(SnapshotVersion.date, SnapshotVersion.version).where(
+            SnapshotVersion.date >= start_date,
+            SnapshotVersion.date <= end_date
+        ).order_by(SnapshotVersion.date)
+    )
+    return tuple((row_date.isoformat(), version) for row_date, version in rows)
+
+
+def not_modified_response(target_date):
+    """
+    Empty 304 response when the client already has the current snapshot, else None
+    """
+    snapshot = get_snapshot(target_date)
+    if snapshot is None:
+        return None
+    etag, last_modified = snapshot
+
+    if request.if_none_match:
+        if not request.if_none_match.contains(etag):
+            return None
+    elif request.if_modified_since is None or request.if_modified_since.replace(tzinfo=None) < last_modified:
+        return None
+
+    response = current_app.response_class(status=304)
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    return response
+
+
+def add_snapshot_headers(response, target_date):
+    """
+    Attach the snapshot's strong ETag and Last-Modified to a response
+    """
+    snapshot = get_snapshot(target_date)
+    if snapshot is not None:
+        etag, last_modified = snapshot
+        response.set_etag(etag)
+        response.last_modified = last_modified
+    return response
@@ -0,0 +1,57 @@
+"""
+Utility module for fast JSON serialization and streaming large JSON / NDJSON responses
+"""
+import json
+
+from flask import Response, stream_with_context
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - fall back to the standard library
+    orjson = None
+
+
+# Rows fetched from the database cursor per round trip
+STREAM_CHUNK_SIZE = 2000
+
+# NDJSON (one JSON document per line) or a single JSON object with an array
+STREAM_FORMATS = ('ndjson', 'json')
+
+
+def dumps(obj):
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def ndjson_chunks(rows):
+    """Serialize rows one line at a time as they are read"""
+    for row in rows:
+        yield dumps(row) + b'\n'
+
+
+def json_array_chunks(rows, key):
+    """Serialize rows as {"<key>": [...]} piece by piece, without building the list"""
+    yield b'{' + dumps(key) + b':['
+    separator = b''
+    for row in rows:
+        yield separator + dumps(row)
+        separator = b','
+    yield b']}'
+
+
+def fast_jsonify(data, status=200):
+    """Like jsonify, but serialized with the fast encoder"""
+    return Response(dumps(data), status=status, mimetype='application/json')
+
+
+def streaming_json_response(rows, stream_format, key):
+    """
+    Streamed response with rows in ndjson or json format
+    """
+    if stream_format == 'ndjson':
+        chunks, mimetype = ndjson_chunks(rows), 'application/x-ndjson'
+    else:
+        chunks, mimetype = json_array_chunks(rows, key), 'application/json'
+    return Response(stream_with_context(chunks), mimetype=mimetype)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Applicant, EducationalProgram, AdmissionData
+from .models import Applicant, EducationalProgram, AdmissionData, AdmissionResult
 
 @admin.register(EducationalProgram)
 class EducationalProgramAdmin(admin.ModelAdmin):
@@ -19,3 +19,9 @@ class AdmissionDataAdmin(admin.ModelAdmin):
     list_filter = ('educational_program', 'date', 'has_consent', 'priority')
     search_fields = ('applicant__id',)
     date_hierarchy = 'date'
+
+@admin.register(AdmissionResult)
+class AdmissionResultAdmin(admin.ModelAdmin):
+    list_display = ('program', 'calculation_date', 'passing_score', 'enrolled_count', 'is_shortage', 'calculation_time')
+    list_filter = ('program', 'calculation_date', 'is_shortage')
+    date_hierarchy = 'calculation_date'
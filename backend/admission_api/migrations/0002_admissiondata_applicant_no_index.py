@@ -0,0 +1,19 @@
+# Generated by Django 4.2 on 2026-10-19 06:53
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission_api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='admissiondata',
+            name='applicant',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to='admission_api.applicant', verbose_name='Абитуриент'),
+        ),
+    ]
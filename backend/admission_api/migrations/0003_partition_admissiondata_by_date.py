@@ -0,0 +1,150 @@
+import re
+from datetime import datetime
+
+from django.db import migrations
+
+
+TABLE = 'admission_api_admissiondata'
+UNPARTITIONED = f'{TABLE}_unpartitioned'
+
+
+# Работа с секциями зафиксирована здесь в том виде, в каком она была на
+# момент миграции: изменения university.partitions не должны ее затрагивать
+
+def partition_table(parent_table, list_date):
+    return f'{parent_table}_{list_date:%Y%m%d}'
+
+
+def partition_dates(connection, parent_table):
+    pattern = re.compile(rf'^{re.escape(parent_table)}_(\d{{8}})$')
+    with connection.cursor() as cursor:
+        tables = connection.introspection.get_table_list(cursor)
+    dates = []
+    for table in tables:
+        match = pattern.match(table.name)
+        if match:
+            dates.append(datetime.strptime(match.group(1), '%Y%m%d').date())
+    return sorted(dates)
+
+
+def create_partition(connection, parent_table, list_date):
+    table = partition_table(parent_table, list_date)
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {qn(table)} PARTITION OF {qn(parent_table)} FOR VALUES IN (%s)',
+                [list_date]
+            )
+        else:
+            _clone_sqlite_table(cursor, parent_table, table, f'{list_date:%Y%m%d}')
+    return table
+
+
+def drop_partition(connection, parent_table, list_date):
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {qn(partition_table(parent_table, list_date))}')
+
+
+def _clone_sqlite_table(cursor, parent_table, table, suffix):
+    cursor.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = %s AND sql IS NOT NULL ORDER BY type DESC",
+        [parent_table]
+    )
+    for object_type, name, sql in cursor.fetchall():
+        if object_type == 'table':
+            sql = sql.replace(f'CREATE TABLE "{parent_table}"', f'CREATE TABLE IF NOT EXISTS "{table}"', 1)
+            sql = re.sub(r'(REFERENCES "\w+" \("id"\))', r'\1 ON DELETE CASCADE', sql)
+        else:
+            sql = re.sub(r'^CREATE (UNIQUE )?INDEX ', r'CREATE \1INDEX IF NOT EXISTS ', sql)
+            sql = sql.replace(f'"{name}"', f'"{name}_{suffix}"', 1)
+            sql = sql.replace(f'ON "{parent_table}"', f'ON "{table}"', 1)
+        cursor.execute(sql)
+
+
+def _table_constraints(cursor, table):
+    cursor.execute(
+        "SELECT conname, contype, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass",
+        [table]
+    )
+    constraints = cursor.fetchall()
+    cursor.execute(
+        "SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s "
+        "AND indexname NOT IN (SELECT conname FROM pg_constraint WHERE conrelid = %s::regclass)",
+        [table, table]
+    )
+    return constraints, cursor.fetchall()
+
+
+def _rebuild_postgresql(connection, partitioned):
+    """
+    Пересоздает таблицу с тем же именем, схемой, ограничениями и индексами:
+    секционированную по date (partitioned=True) или обычную.
+    """
+    with connection.cursor() as cursor:
+        constraints, indexes = _table_constraints(cursor, TABLE)
+        cursor.execute(f'ALTER TABLE {TABLE} RENAME TO {UNPARTITIONED}')
+        cursor.execute(
+            f'CREATE TABLE {TABLE} (LIKE {UNPARTITIONED} INCLUDING DEFAULTS INCLUDING IDENTITY)'
+            + (' PARTITION BY LIST (date)' if partitioned else '')
+        )
+        if partitioned:
+            cursor.execute(f'SELECT DISTINCT date FROM {UNPARTITIONED}')
+            for (list_date,) in cursor.fetchall():
+                create_partition(connection, TABLE, list_date)
+        cursor.execute(f'INSERT INTO {TABLE} SELECT * FROM {UNPARTITIONED}')
+        cursor.execute(f'DROP TABLE {UNPARTITIONED} CASCADE')
+
+        for name, kind, definition in constraints:
+            if kind == 'p':
+                # Первичный ключ секционированной таблицы обязан включать ключ секционирования
+                definition = 'PRIMARY KEY (id, date)' if partitioned else 'PRIMARY KEY (id)'
+            cursor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {name} {definition}')
+        for name, definition in indexes:
+            cursor.execute(definition)
+        cursor.execute(
+            f"SELECT setval(pg_get_serial_sequence(%s, 'id'), COALESCE(MAX(id), 0) + 1, false) FROM {TABLE}",
+            [TABLE]
+        )
+
+
+def partition_by_date(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        _rebuild_postgresql(connection, partitioned=True)
+        return
+
+    # SQLite: записи каждой даты переносятся в отдельную таблицу
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT DISTINCT date FROM {TABLE}')
+        list_dates = [row[0] for row in cursor.fetchall()]
+        for list_date in list_dates:
+            table = create_partition(connection, TABLE, list_date)
+            cursor.execute(f'INSERT INTO "{table}" SELECT * FROM {TABLE} WHERE date = %s', [list_date])
+        cursor.execute(f'DELETE FROM {TABLE}')
+
+
+def merge_partitions(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        _rebuild_postgresql(connection, partitioned=False)
+        return
+
+    columns = 'date, has_consent, priority, educational_program_id, applicant_id'
+    with connection.cursor() as cursor:
+        for list_date in partition_dates(connection, TABLE):
+            table = partition_table(TABLE, list_date)
+            cursor.execute(f'INSERT INTO {TABLE} ({columns}) SELECT {columns} FROM "{table}"')
+            drop_partition(connection, TABLE, list_date)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission_api', '0002_admissiondata_applicant_no_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_by_date, merge_partitions),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-19 07:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission_api', '0003_partition_admissiondata_by_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyAggregate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('priority', models.IntegerField(verbose_name='Приоритет ОП')),
+                ('has_consent', models.BooleanField(verbose_name='Наличие согласия о зачислении')),
+                ('applications', models.IntegerField(default=0, verbose_name='Количество заявлений')),
+                ('educational_program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admission_api.educationalprogram', verbose_name='Образовательная программа')),
+            ],
+            options={
+                'verbose_name': 'Агрегат заявлений за день',
+                'verbose_name_plural': 'Агрегаты заявлений за день',
+                'unique_together': {('date', 'educational_program', 'priority', 'has_consent')},
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 4.2 on 2026-10-19 07:04
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission_api', '0004_dailyaggregate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdmissionResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('calculation_date', models.DateField(verbose_name='Дата расчета')),
+                ('passing_score', models.IntegerField(blank=True, null=True, verbose_name='Проходной балл')),
+                ('enrolled_count', models.IntegerField(default=0, verbose_name='Количество зачисленных')),
+                ('is_shortage', models.BooleanField(default=False, verbose_name='Недобор')),
+                ('calculation_time', models.DateTimeField(auto_now_add=True, verbose_name='Время расчета')),
+                ('program', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='admission_results', to='admission_api.educationalprogram', verbose_name='Образовательная программа')),
+            ],
+            options={
+                'verbose_name': 'Результат зачисления',
+                'verbose_name_plural': 'Результаты зачисления',
+                'ordering': ['-calculation_date', 'program'],
+            },
+        ),
+        migrations.CreateModel(
+            name='EnrolledApplicant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('priority', models.IntegerField(verbose_name='Приоритет зачисления')),
+                ('total_score', models.IntegerField(verbose_name='Сумма баллов')),
+                ('enrollment_order', models.IntegerField(verbose_name='Порядковый номер зачисления')),
+                ('admission_result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrolled_applicants', to='admission_api.admissionresult', verbose_name='Результат зачисления')),
+                ('applicant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='enrollment_history', to='admission_api.applicant', verbose_name='Абитуриент')),
+            ],
+            options={
+                'verbose_name': 'Зачисленный абитуриент',
+                'verbose_name_plural': 'Зачисленные абитуриенты',
+                'ordering': ['enrollment_order'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='admissionresult',
+            index=models.Index(fields=['calculation_date'], name='admission_a_calcula_e88177_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='admissionresult',
+            unique_together={('program', 'calculation_date')},
+        ),
+    ]
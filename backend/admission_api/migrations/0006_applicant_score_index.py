@@ -0,0 +1,17 @@
+# Generated by Django 4.2 on 2026-10-19 07:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admission_api', '0005_admissionresult_enrolledapplicant'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='applicant',
+            index=models.Index(fields=['-total_score', 'id'], name='applicant_score_id_idx'),
+        ),
+    ]
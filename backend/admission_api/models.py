@@ -27,10 +27,15 @@ class Applicant(models.Model):
     class Meta:
         verbose_name = "Абитуриент"
         verbose_name_plural = "Абитуриенты"
+        indexes = [
+            # Порядок конкурсного списка: страницы таблицы данных читаются по индексу
+            models.Index(fields=['-total_score', 'id'], name='applicant_score_id_idx'),
+        ]
 
 
 class AdmissionData(models.Model):
-    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, verbose_name="Абитуриент")
+    # Отдельный индекс не нужен: applicant_id - первая колонка уникального ключа
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, verbose_name="Абитуриент", db_index=False)
     educational_program = models.ForeignKey(EducationalProgram, on_delete=models.CASCADE, verbose_name="Образовательная программа")
     date = models.DateField(verbose_name="Дата")
     has_consent = models.BooleanField(verbose_name="Наличие согласия о зачислении")
@@ -43,3 +48,59 @@ class AdmissionData(models.Model):
         unique_together = ('applicant', 'educational_program', 'date')
         verbose_name = "Запись о поступлении"
         verbose_name_plural = "Записи о поступлении"
+
+
+class DailyAggregate(models.Model):
+    """Количество заявлений за дату в разрезе программа × приоритет × согласие"""
+    date = models.DateField(verbose_name="Дата")
+    educational_program = models.ForeignKey(EducationalProgram, on_delete=models.CASCADE, verbose_name="Образовательная программа")
+    priority = models.IntegerField(verbose_name="Приоритет ОП")
+    has_consent = models.BooleanField(verbose_name="Наличие согласия о зачислении")
+    applications = models.IntegerField(default=0, verbose_name="Количество заявлений")
+
+    def __str__(self):
+        return f"{self.educational_program} - {self.date} - приоритет {self.priority}: {self.applications}"
+
+    class Meta:
+        unique_together = ('date', 'educational_program', 'priority', 'has_consent')
+        verbose_name = "Агрегат заявлений за день"
+        verbose_name_plural = "Агрегаты заявлений за день"
+
+
+class AdmissionResult(models.Model):
+    """Результат зачисления на программу за дату"""
+    program = models.ForeignKey(EducationalProgram, on_delete=models.CASCADE, related_name='admission_results', verbose_name="Образовательная программа")
+    calculation_date = models.DateField(verbose_name="Дата расчета")
+    passing_score = models.IntegerField(null=True, blank=True, verbose_name="Проходной балл")
+    enrolled_count = models.IntegerField(default=0, verbose_name="Количество зачисленных")
+    is_shortage = models.BooleanField(default=False, verbose_name="Недобор")
+    calculation_time = models.DateTimeField(auto_now_add=True, verbose_name="Время расчета")
+
+    def __str__(self):
+        if self.is_shortage:
+            return f"{self.program} ({self.calculation_date}): НЕДОБОР"
+        return f"{self.program} ({self.calculation_date}): {self.passing_score} баллов"
+
+    class Meta:
+        unique_together = ('program', 'calculation_date')
+        indexes = [models.Index(fields=['calculation_date'])]
+        ordering = ['-calculation_date', 'program']
+        verbose_name = "Результат зачисления"
+        verbose_name_plural = "Результаты зачисления"
+
+
+class EnrolledApplicant(models.Model):
+    """Зачисленный абитуриент"""
+    admission_result = models.ForeignKey(AdmissionResult, on_delete=models.CASCADE, related_name='enrolled_applicants', verbose_name="Результат зачисления")
+    applicant = models.ForeignKey(Applicant, on_delete=models.CASCADE, related_name='enrollment_history', verbose_name="Абитуриент")
+    priority = models.IntegerField(verbose_name="Приоритет зачисления")
+    total_score = models.IntegerField(verbose_name="Сумма баллов")
+    enrollment_order = models.IntegerField(verbose_name="Порядковый номер зачисления")
+
+    def __str__(self):
+        return f"{self.applicant} зачислен на {self.admission_result.program}"
+
+    class Meta:
+        ordering = ['enrollment_order']
+        verbose_name = "Зачисленный абитуриент"
+        verbose_name_plural = "Зачисленные абитуриенты"
@@ -71,6 +71,17 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'admission_api.wsgi.application'
+ASGI_APPLICATION = 'admission_api.asgi.application'
+
+# Потоки для блокирующей работы асинхронных представлений (загрузка, отчеты)
+BLOCKING_EXECUTOR_WORKERS = int(os.environ.get('BLOCKING_EXECUTOR_WORKERS', 4))
+
+# Суммарный размер готовых отчетов, хранимых в памяти процесса
+REPORT_CACHE_MAX_BYTES = int(os.environ.get('REPORT_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+# Процессы сборки отчетов, предел заданий в очереди и срок хранения готового задания (с)
+REPORT_WORKERS = int(os.environ.get('REPORT_WORKERS', 2))
+REPORT_MAX_PENDING_JOBS = int(os.environ.get('REPORT_MAX_PENDING_JOBS', 16))
+REPORT_JOB_TTL = int(os.environ.get('REPORT_JOB_TTL', 600))
 
 
 # Database
@@ -83,6 +94,24 @@ DATABASES = {
     }
 }
 
+# PostgreSQL включается переменными окружения (в т.ч. для локально запущенного сервера)
+if os.environ.get('POSTGRES_DB'):
+    DATABASES['default'] = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': os.environ['POSTGRES_DB'],
+        'USER': os.environ.get('POSTGRES_USER', 'postgres'),
+        'PASSWORD': os.environ.get('POSTGRES_PASSWORD', ''),
+        'HOST': os.environ.get('POSTGRES_HOST', 'localhost'),
+        'PORT': os.environ.get('POSTGRES_PORT', '5432'),
+    }
+
+# Размер пакета при массовой загрузке конкурсных списков
+INGEST_BATCH_SIZE = int(os.environ.get('INGEST_BATCH_SIZE', 50000))
+# Сколько секунд версия снимка даты хранится в кэше без обращения к базе.
+# Процесс, загрузивший данные, сбрасывает ее сразу; для нескольких процессов
+# нужен общий бэкенд CACHES (Redis, Memcached), иначе устаревание ограничено этим сроком
+SNAPSHOT_VERSION_TTL = int(os.environ.get('SNAPSHOT_VERSION_TTL', 5))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -104,8 +104,13 @@ urlpatterns = [
     path('load-data/', views.load_data, name='load_data'),
     path('update-data/', views.update_data, name='update_data'),
     path('calculate-passing-scores/', views.calculate_passing_scores, name='calculate_passing_scores'),
+    path('passing-score-dynamics/', views.passing_score_dynamics, name='passing_score_dynamics'),
     path('generate-pdf-report/', views.generate_pdf_report, name='generate_pdf_report'),
+    path('reports/jobs/', views.submit_report, name='submit_report'),
+    path('reports/jobs/<str:job_id>/', views.report_job, name='report_job'),
+    path('reports/jobs/<str:job_id>/download/', views.download_report, name='download_report'),
     path('visualize-data/', views.visualize_data, name='visualize_data'),
+    path('visualize-data/grid/', views.visualize_data_grid, name='visualize_data_grid'),
     path('clear-database/', views.clear_database, name='clear_database'),
     path('upload/', views.load_data, name='load_data'),
     path('generate-test-data/', views.generate_test_data, name='generate_test_data'),
@@ -1,16 +1,30 @@
 from django.shortcuts import render
+from django.urls import reverse
 from django.http import JsonResponse, HttpResponse
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
 from django.contrib.auth.decorators import login_required
 from django.utils.dateparse import parse_date
+from django.db import transaction
 from datetime import datetime
+import asyncio
 import json
 import pandas as pd
 
 from admission_api.models import Applicant, EducationalProgram, AdmissionData
 from university.data_generator import run_data_generation
 from university.admission_calculator import AdmissionCalculator
-from university.pdf_reporter import PDFReporter
+from university.ingest import AdmissionIngestor
+from university.partitions import AdmissionPartitionRouter
+from university.aggregates import refresh_daily_aggregates
+from university.results import recompute_admission_results
+from university.purge import AdmissionPurger
+from university.snapshots import snapshot_etag, snapshot_version
+from university import report_jobs, singleflight
+from university.executors import run_blocking
+from university.grid import AdmissionGrid, GRID_DEFAULT_SORT
+from university.pagination import parse_page_size
+from university.streaming import STREAM_CHUNK_SIZE, STREAM_FORMATS, streaming_json_response
 
 
 def index(request):
@@ -19,55 +33,32 @@ def index(request):
     return render(request, 'index.html', {'programs': programs})
 
 
-def load_data(request):
+def _ingest_uploaded_file(uploaded_file):
+    """Разбирает файл и сохраняет данные одной пакетной загрузкой; возвращает число записей"""
+    if uploaded_file.name.endswith('.xlsx'):
+        df = pd.read_excel(uploaded_file)
+    else:
+        df = pd.read_csv(uploaded_file)
+
+    ingestor = AdmissionIngestor()
+    ingestor.ingest(ingestor.normalize_frame(df))
+    return len(df)
+
+
+async def load_data(request):
     """Загрузка данных из файла"""
     if request.method == 'POST' and request.FILES:
         uploaded_file = request.FILES['file']
 
+        # Определение типа файла
+        if not uploaded_file.name.endswith(('.xlsx', '.csv')):
+            return JsonResponse({'error': 'Неподдерживаемый формат файла'}, status=400)
+
         try:
-            # Определение типа файла
-            if uploaded_file.name.endswith('.xlsx'):
-                df = pd.read_excel(uploaded_file)
-            elif uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
-            else:
-                return JsonResponse({'error': 'Неподдерживаемый формат файла'}, status=400)
+            # Разбор файла и загрузка выполняются в пуле потоков
+            loaded = await run_blocking(_ingest_uploaded_file, uploaded_file)
 
-            # Сохранение данных в базу
-            for _, row in df.iterrows():
-                # Получаем или создаем абитуриента
-                applicant, created = Applicant.objects.get_or_create(
-                    id=row['ID'],
-                    defaults={
-                        'physics_ikt': row['Балл Физика/ИКТ'],
-                        'russian_lang': row['Балл Русский язык'],
-                        'math': row['Балл Математика'],
-                        'achievements': row['Балл за индивидуальные достижения'],
-                        'total_score': row['Сумма баллов']
-                    }
-                )
-
-                # Получаем программу
-                program = EducationalProgram.objects.get(code=row['ОП'])
-
-                # Создаем или обновляем запись в AdmissionData
-                admission_data, created = AdmissionData.objects.get_or_create(
-                    applicant=applicant,
-                    educational_program=program,
-                    defaults={
-                        'date': parse_date(row['Дата']) if 'Дата' in row else datetime.now().date(),
-                        'has_consent': bool(row['Наличие согласия о зачислении в ВУЗ']),
-                        'priority': int(row['Приоритет ОП'])
-                    }
-                )
-
-                if not created:
-                    # Обновляем существующую запись
-                    admission_data.has_consent = bool(row['Наличие согласия о зачислении в ВУЗ'])
-                    admission_data.priority = int(row['Приоритет ОП'])
-                    admission_data.save()
-
-            return JsonResponse({'success': True, 'message': f'Загружено {len(df)} записей'})
+            return JsonResponse({'success': True, 'message': f'Загружено {loaded} записей'})
 
         except Exception as e:
             return JsonResponse({'error': f'Ошибка при загрузке данных: {str(e)}'}, status=400)
@@ -75,7 +66,86 @@ def load_data(request):
     return render(request, 'load_data.html')
 
 
-def update_data(request):
+def _list_date(row):
+    """Дата конкурсного списка строки файла (без колонки даты - сегодня)"""
+    return parse_date(str(row['Дата'])) if 'Дата' in row else datetime.now().date()
+
+
+def _apply_update(uploaded_files):
+    """
+    Сверяет загруженные файлы с базой: удаляет, добавляет и изменяет заявления;
+    возвращает число обработанных, добавленных, измененных и удаленных записей
+    """
+    all_records = []
+    total_processed = 0
+
+    # Обрабатываем каждый загруженный файл
+    for uploaded_file in uploaded_files:
+        if uploaded_file.name.endswith('.xlsx'):
+            df = pd.read_excel(uploaded_file)
+        else:
+            df = pd.read_csv(uploaded_file)
+
+        # Добавляем записи из файла в общий список
+        for _, row in df.iterrows():
+            all_records.append(row)
+        total_processed += len(df)
+
+    # Получаем все существующие записи в базе данных (по секциям дат)
+    # и создаем словарь для быстрого поиска (ключ: (ID абитуриента, код программы))
+    existing_map = {}
+    for list_date, admissions in AdmissionPartitionRouter().querysets():
+        for adm in admissions.select_related('applicant', 'educational_program'):
+            key = (adm.applicant.id, adm.educational_program.code)
+            existing_map[key] = adm
+
+    # Создаем словарь новых записей для быстрого поиска
+    new_records_map = {}
+    for row in all_records:
+        key = (row['ID'], row['ОП'])
+        new_records_map[key] = row
+
+    # 1. Определяем абитуриентов, которых нужно удалить (есть в БД, но нет в новых данных)
+    to_delete = []
+    for key, adm in existing_map.items():
+        if key not in new_records_map:
+            to_delete.append(adm)
+
+    # 2. Определяем абитуриентов, которых нужно добавить (есть в новых данных, но нет в БД)
+    to_add = []
+    for key, row in new_records_map.items():
+        if key not in existing_map:
+            to_add.append(row)
+
+    # 3. Определяем абитуриентов, которых нужно обновить (есть и в БД, и в новых данных)
+    to_update = []
+    for key, row in new_records_map.items():
+        if key in existing_map:
+            to_update.append((existing_map[key], row))
+
+    # Заявление, у которого изменилась дата, переносится в секцию новой даты:
+    # строка старой даты удаляется, новая загружается вместе с остальными
+    to_move = [adm for adm, row in to_update if adm.date != _list_date(row)]
+
+    # Изменения и пересчет агрегатов и результатов выполняются в одной транзакции
+    with transaction.atomic():
+        # Удаляем записи
+        for adm in to_delete + to_move:
+            adm.delete()
+        deleted_dates = {adm.date for adm in to_delete + to_move}
+        refresh_daily_aggregates(deleted_dates)
+        recompute_admission_results(deleted_dates)
+
+        # Добавляем и обновляем записи одной пакетной загрузкой
+        if to_add or to_update:
+            changed_rows = to_add + [row for _, row in to_update]
+            ingestor = AdmissionIngestor()
+            ingestor.ingest(ingestor.normalize_frame(pd.DataFrame(changed_rows)))
+
+    return total_processed, len(to_add), len(to_update), len(to_delete)
+
+
+async def update_data(request):
     """Обновление данных (удаление, добавление, изменение)"""
     if request.method == 'POST':
         try:
@@ -85,110 +155,14 @@ def update_data(request):
             if not uploaded_files:
                 return JsonResponse({'error': 'Не загружены файлы для обновления'}, status=400)
 
-            all_records = []
-            total_processed = 0
-
-            # Обрабатываем каждый загруженный файл
-            for uploaded_file in uploaded_files:
-                # Определение типа файла
-                if uploaded_file.name.endswith('.xlsx'):
-                    df = pd.read_excel(uploaded_file)
-                elif uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
-                else:
-                    return JsonResponse({'error': 'Неподдерживаемый формат файла'}, status=400)
-
-                # Добавляем записи из файла в общий список
-                for _, row in df.iterrows():
-                    all_records.append(row)
-                total_processed += len(df)
-
-            # Получаем все существующие записи в базе данных
-            existing_admissions = AdmissionData.objects.select_related('applicant', 'educational_program').all()
-            
-            # Создаем словарь существующих записей для быстрого поиска (ключ: (ID абитуриента, код программы))
-            existing_map = {}
-            for adm in existing_admissions:
-                key = (adm.applicant.id, adm.educational_program.code)
-                existing_map[key] = adm
-
-            # Создаем словарь новых записей для быстрого поиска
-            new_records_map = {}
-            for row in all_records:
-                key = (row['ID'], row['ОП'])
-                new_records_map[key] = row
-
-            # 1. Определяем абитуриентов, которых нужно удалить (есть в БД, но нет в новых данных)
-            to_delete = []
-            for key, adm in existing_map.items():
-                if key not in new_records_map:
-                    to_delete.append(adm)
-
-            # 2. Определяем абитуриентов, которых нужно добавить (есть в новых данных, но нет в БД)
-            to_add = []
-            for key, row in new_records_map.items():
-                if key not in existing_map:
-                    to_add.append(row)
-
-            # 3. Определяем абитуриентов, которых нужно обновить (есть и в БД, и в новых данных)
-            to_update = []
-            for key, row in new_records_map.items():
-                if key in existing_map:
-                    to_update.append((existing_map[key], row))
-
-            # Выполняем операции с базой данных
-            deleted_count = 0
-            added_count = 0
-            updated_count = 0
-
-            # Удаляем записи
-            for adm in to_delete:
-                adm.delete()
-                deleted_count += 1
-
-            # Добавляем и обновляем записи
-            for row in to_add:
-                # Получаем или создаем абитуриента
-                applicant, created = Applicant.objects.get_or_create(
-                    id=row['ID'],
-                    defaults={
-                        'physics_ikt': row['Балл Физика/ИКТ'],
-                        'russian_lang': row['Балл Русский язык'],
-                        'math': row['Балл Математика'],
-                        'achievements': row['Балл за индивидуальные достижения'],
-                        'total_score': row['Сумма баллов']
-                    }
-                )
-
-                # Получаем программу
-                program = EducationalProgram.objects.get(code=row['ОП'])
-
-                # Создаем новую запись в AdmissionData
-                AdmissionData.objects.create(
-                    applicant=applicant,
-                    educational_program=program,
-                    date=parse_date(row['Дата']) if 'Дата' in row else datetime.now().date(),
-                    has_consent=bool(row['Наличие согласия о зачислении в ВУЗ']),
-                    priority=int(row['Приоритет ОП'])
-                )
-                added_count += 1
-
-            # Обновляем существующие записи
-            for existing_adm, row in to_update:
-                # Обновляем информацию об абитуриенте
-                existing_adm.applicant.physics_ikt = row['Балл Физика/ИКТ']
-                existing_adm.applicant.russian_lang = row['Балл Русский язык']
-                existing_adm.applicant.math = row['Балл Математика']
-                existing_adm.applicant.achievements = row['Балл за индивидуальные достижения']
-                existing_adm.applicant.total_score = row['Сумма баллов']
-                existing_adm.applicant.save()
-
-                # Обновляем информацию в AdmissionData
-                existing_adm.date = parse_date(row['Дата']) if 'Дата' in row else datetime.now().date()
-                existing_adm.has_consent = bool(row['Наличие согласия о зачислении в ВУЗ'])
-                existing_adm.priority = int(row['Приоритет ОП'])
-                existing_adm.save()
-                updated_count += 1
+            # Определение типа файлов
+            if not all(f.name.endswith(('.xlsx', '.csv')) for f in uploaded_files):
+                return JsonResponse({'error': 'Неподдерживаемый формат файла'}, status=400)
+
+            # Разбор файлов и сверка с базой выполняются в пуле потоков
+            total_processed, added_count, updated_count, deleted_count = await run_blocking(
+                _apply_update, uploaded_files
+            )
 
             return JsonResponse({
                 'success': True, 
@@ -205,6 +179,37 @@ def update_data(request):
     return render(request, 'update_data.html')
 
 
+def _requested_date(request):
+    """Дата страницы проходных баллов из GET-параметра (по умолчанию - сегодня)"""
+    try:
+        return parse_date(request.GET.get('date', datetime.now().strftime('%Y-%m-%d')))
+    except ValueError:
+        return None
+
+
+def _passing_scores_etag(request):
+    if request.method != 'GET':
+        return None
+    return snapshot_etag(_requested_date(request))
+
+
+def _passing_scores_last_modified(request):
+    if request.method != 'GET':
+        return None
+    return snapshot_version(_requested_date(request))
+
+
+def _passing_scores_page_data(target_date):
+    calculator = AdmissionCalculator()
+    return (
+        calculator.calculate_passing_scores(target_date),
+        calculator.get_admitted_applicants(target_date),
+        calculator.get_statistics(target_date),
+    )
+
+
+# Пока список за дату не перезагружен, повторный GET получает 304 без обращения к базе
+@condition(etag_func=_passing_scores_etag, last_modified_func=_passing_scores_last_modified)
 def calculate_passing_scores(request):
     """Расчет проходных баллов"""
     if request.method == 'POST':
@@ -213,8 +218,11 @@ def calculate_passing_scores(request):
             if not date_str:
                 return JsonResponse({'error': 'Не указана дата'}, status=400)
 
-            calculator = AdmissionCalculator()
-            passing_scores = calculator.calculate_passing_scores(parse_date(date_str))
+            target_date = parse_date(date_str)
+            passing_scores = singleflight.allocations.do(
+                ('passing_scores', target_date, snapshot_version(target_date)),
+                AdmissionCalculator().calculate_passing_scores, target_date
+            )
 
             return JsonResponse({
                 'success': True,
@@ -227,12 +235,14 @@ def calculate_passing_scores(request):
 
     # Если GET запрос - показываем страницу с результатами
     date_str = request.GET.get('date', datetime.now().strftime('%Y-%m-%d'))
-    calculator = AdmissionCalculator()
 
     try:
-        passing_scores = calculator.calculate_passing_scores(parse_date(date_str))
-        admitted_lists = calculator.get_admitted_applicants(parse_date(date_str))
-        stats = calculator.get_statistics(parse_date(date_str))
+        # Одновременные запросы одной и той же страницы ждут один расчет
+        target_date = parse_date(date_str)
+        passing_scores, admitted_lists, stats = singleflight.allocations.do(
+            ('passing_scores_page', target_date, snapshot_version(target_date)),
+            _passing_scores_page_data, target_date
+        )
 
         return render(request, 'passing_scores.html', {
             'passing_scores': passing_scores,
@@ -244,70 +254,221 @@ def calculate_passing_scores(request):
         return JsonResponse({'error': f'Ошибка при получении данных: {str(e)}'}, status=500)
 
 
-def generate_pdf_report(request):
+def passing_score_dynamics(request):
+    """Проходные баллы за период (start, end) в виде матрицы программа x дата"""
+    try:
+        start_date = parse_date(request.GET['start']) if request.GET.get('start') else None
+        end_date = parse_date(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return JsonResponse({'error': 'Некорректная дата, ожидается формат ГГГГ-ММ-ДД'}, status=400)
+
+    try:
+        return JsonResponse(AdmissionCalculator().get_passing_score_matrix(start_date, end_date))
+    except Exception as e:
+        return JsonResponse({'error': f'Ошибка при расчете динамики проходных баллов: {str(e)}'}, status=500)
+
+
+def _submit_pdf_report(report_date):
+    """
+    Задание на PDF-отчет за дату: одно на снимок, готовый отчет снимка
+    берется из кэша отчетов
+    """
+    return report_jobs.reports.submit_pdf_report(report_date, snapshot_version(report_date))
+
+
+async def generate_pdf_report(request):
     """Генерация PDF-отчета"""
     date_str = request.GET.get('date')
     if not date_str:
         date_str = datetime.now().strftime('%d.%m')
 
     try:
-        reporter = PDFReporter()
-        pdf_buffer = reporter.generate_report(parse_date(date_str))
+        # Сборка PDF выполняется процессами отчетов; ожидание не занимает потоки
+        job = await run_blocking(_submit_pdf_report, parse_date(date_str))
+        pdf_content = await asyncio.wrap_future(job.future)
 
-        response = HttpResponse(pdf_buffer.getvalue(), content_type='application/pdf')
+        response = HttpResponse(pdf_content, content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="report_{date_str}.pdf"'
         return response
 
+    except report_jobs.JobQueueFull as e:
+        return JsonResponse({'error': str(e)}, status=503, headers={'Retry-After': '5'})
     except Exception as e:
         return JsonResponse({'error': f'Ошибка при генерации отчета: {str(e)}'}, status=500)
 
 
+# Сколько секунд клиент может ждать задание отчета через ?wait=
+REPORT_WAIT_TIMEOUT = 60
+
+
+def _report_job_response(job, status=200):
+    """Состояние задания отчета и адреса для опроса и скачивания"""
+    data = job.to_dict()
+    data['status_url'] = reverse('report_job', args=[job.id])
+    if data['state'] == 'done':
+        data['download_url'] = reverse('download_report', args=[job.id])
+    return JsonResponse(data, status=status)
+
+
+def submit_report(request):
+    """Постановка PDF-отчета за дату (date, ГГГГ-ММ-ДД) в очередь"""
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Метод не поддерживается'}, status=405)
+
+    try:
+        report_date = parse_date(request.POST.get('date') or datetime.now().strftime('%Y-%m-%d'))
+    except ValueError:
+        report_date = None
+    if report_date is None:
+        return JsonResponse({'error': 'Некорректная дата, ожидается формат ГГГГ-ММ-ДД'}, status=400)
+
+    try:
+        return _report_job_response(_submit_pdf_report(report_date), status=202)
+    except report_jobs.JobQueueFull as e:
+        return JsonResponse({'error': str(e)}, status=503, headers={'Retry-After': '5'})
+    except Exception as e:
+        return JsonResponse({'error': f'Ошибка при генерации отчета: {str(e)}'}, status=500)
+
+
+def report_job(request, job_id):
+    """Состояние задания отчета; ?wait=N - ждать его завершения до N секунд"""
+    job = report_jobs.reports.get(job_id)
+    if job is None:
+        return JsonResponse({'error': 'Задание отчета не найдено'}, status=404)
+
+    try:
+        wait = min(float(request.GET.get('wait', 0)), REPORT_WAIT_TIMEOUT)
+    except ValueError:
+        return JsonResponse({'error': 'Некорректное время ожидания'}, status=400)
+    if wait > 0:
+        job.wait(wait)
+
+    return _report_job_response(job)
+
+
+def download_report(request, job_id):
+    """PDF готового задания отчета"""
+    job = report_jobs.reports.get(job_id)
+    if job is None:
+        return JsonResponse({'error': 'Задание отчета не найдено'}, status=404)
+    if job.state != 'done':
+        return _report_job_response(job, status=409)
+
+    report_date = job.key[1]
+    response = HttpResponse(job.future.result(), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="report_{report_date:%d.%m}.pdf"'
+    return response
+
+
+# Колонки записи визуализации и поля, из которых они читаются
+VISUALIZE_COLUMNS = ('id', 'program_name', 'program_code', 'total_score', 'has_consent', 'priority')
+VISUALIZE_FIELDS = ('applicant_id', 'educational_program__name', 'educational_program__code',
+                    'applicant__total_score', 'has_consent', 'priority')
+
+
+def _visualize_rows(querysets, program_filter):
+    """
+    Записи для визуализации, секция за секцией, без загрузки всех строк в память.
+
+    Из базы читаются кортежи колонок, объекты моделей не создаются.
+    """
+    for list_date, admissions in querysets:
+        if program_filter:
+            admissions = admissions.filter(educational_program__code=program_filter)
+        # В секции одна дата, поэтому она форматируется один раз
+        date_text = list_date.strftime('%d.%m.%Y') if list_date else ''
+
+        for values in admissions.values_list(*VISUALIZE_FIELDS).iterator(chunk_size=STREAM_CHUNK_SIZE):
+            row = dict(zip(VISUALIZE_COLUMNS, values))
+            row['date'] = date_text
+            yield row
+
+
 def visualize_data(request):
-    """Визуализация данных"""
+    """Визуализация данных (format=ndjson|json - потоковая выдача записей)"""
     date_filter = request.GET.get('date', '')
     program_filter = request.GET.get('program', '')
+    stream_format = request.GET.get('format', '')
 
-    # Фильтрация данных
-    admissions = AdmissionData.objects.select_related('applicant', 'educational_program')
-
-    if date_filter:
-        admissions = admissions.filter(date=parse_date(date_filter))
-
-    if program_filter:
-        admissions = admissions.filter(educational_program__code=program_filter)
-
-    # Подготовка данных для шаблона
-    data_list = []
-    for adm in admissions:
-        data_list.append({
-            'id': adm.applicant.id,
-            'program_name': adm.educational_program.name,
-            'program_code': adm.educational_program.code,
-            'total_score': adm.applicant.total_score,
-            'has_consent': adm.has_consent,
-            'priority': adm.priority,
-            'date': adm.date.strftime('%d.%m.%Y') if adm.date else ''
-        })
+    # Потоковая выдача: записи сериализуются по мере чтения из курсора
+    if stream_format:
+        if stream_format not in STREAM_FORMATS:
+            return JsonResponse({'error': f'Неподдерживаемый формат: {stream_format}'}, status=400)
 
+        # Фильтрация данных: с датой читается только ее секция
+        partitions = AdmissionPartitionRouter()
+        if date_filter:
+            target_date = parse_date(date_filter)
+            querysets = [(target_date, partitions.queryset(target_date))]
+        else:
+            querysets = list(partitions.querysets())
+
+        return streaming_json_response(_visualize_rows(querysets, program_filter), stream_format, 'data', request)
+
+    # Страница таблицы: записи подгружаются по частям из visualize_data_grid
     programs = EducationalProgram.objects.all()
 
     return render(request, 'visualize_data.html', {
-        'data_list': data_list,
         'programs': programs,
-        'selected_date': date_filter,
-        'selected_program': program_filter
+        'selected_date': date_filter or _latest_list_date(),
+        'selected_program': program_filter,
     })
 
 
+def _latest_list_date():
+    """Последняя дата, за которую загружен конкурсный список, в формате ГГГГ-ММ-ДД"""
+    dates = AdmissionPartitionRouter().dates()
+    return max(dates).isoformat() if dates else ''
+
+
+def _optional_int(value):
+    return int(value) if value not in (None, '') else None
+
+
+def visualize_data_grid(request):
+    """
+    Страница таблицы данных за дату: фильтры program, priority, consent
+    (true/false), score_min, score_max; сортировка sort; курсор cursor и limit
+    """
+    try:
+        date_str = request.GET.get('date') or _latest_list_date()
+        list_date = parse_date(date_str) if date_str else None
+        if list_date is None:
+            return JsonResponse({'error': 'Не указана дата'}, status=400)
+
+        consent = request.GET.get('consent', '')
+        if consent not in ('', 'true', 'false'):
+            raise ValueError('consent должен быть true или false')
+
+        page = AdmissionGrid(list_date).page(
+            program=request.GET.get('program', ''),
+            priority=_optional_int(request.GET.get('priority')),
+            has_consent={'true': True, 'false': False}.get(consent),
+            score_min=_optional_int(request.GET.get('score_min')),
+            score_max=_optional_int(request.GET.get('score_max')),
+            sort=request.GET.get('sort') or GRID_DEFAULT_SORT,
+            cursor=request.GET.get('cursor', ''),
+            page_size=parse_page_size(request.GET.get('limit', '')),
+        )
+        return JsonResponse(page)
+    except ValueError as e:
+        return JsonResponse({'error': f'Некорректные параметры: {str(e)}'}, status=400)
+    except Exception as e:
+        return JsonResponse({'error': f'Ошибка при получении данных: {str(e)}'}, status=500)
+
+
 def clear_database(request):
-    """Очистка базы данных"""
+    """Очистка базы данных (целиком или за одну дату)"""
     if request.method == 'POST':
         try:
-            # Удаляем все записи AdmissionData
-            AdmissionData.objects.all().delete()
-            # Удаляем всех абитуриентов (после удаления связанных записей)
-            Applicant.objects.all().delete()
+            # Данные удаляются на уровне СУБД, без загрузки объектов в память
+            purger = AdmissionPurger()
+            date_str = request.POST.get('date')
+            if date_str:
+                purger.purge_date(parse_date(date_str))
+                return JsonResponse({'success': True, 'message': f'Данные за {date_str} удалены'})
 
+            purger.purge_all()
             return JsonResponse({'success': True, 'message': 'База данных очищена'})
 
         except Exception as e:
@@ -0,0 +1,68 @@
+# backend/benchmark_ingest.py
+"""
+Замер скорости массовой загрузки конкурсных списков.
+
+Для проверки на локально запущенном PostgreSQL:
+    POSTGRES_DB=admission POSTGRES_HOST=localhost python manage.py migrate
+    POSTGRES_DB=admission POSTGRES_HOST=localhost python benchmark_ingest.py 1000000
+Без переменных POSTGRES_* используется SQLite (executemany).
+"""
+import os
+import sys
+import random
+from datetime import date
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admission_api.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.db import connection
+from admission_api.models import EducationalProgram
+from university.ingest import AdmissionIngestor
+
+PROGRAMS = [
+    {'code': 'ПМ', 'name': 'Прикладная математика', 'seats': 40},
+    {'code': 'ИВТ', 'name': 'Информатика и вычислительная техника', 'seats': 50},
+    {'code': 'ИТСС', 'name': 'Инфокоммуникационные технологии и системы связи', 'seats': 30},
+    {'code': 'ИБ', 'name': 'Информационная безопасность', 'seats': 20},
+]
+
+
+def synthetic_rows(count, program_ids, list_date):
+    """Синтетический конкурсный список: каждый абитуриент подает на 1-4 программы"""
+    rng = random.Random(42)
+    produced = 0
+    applicant_id = 1
+    while produced < count:
+        physics, russian, math = rng.randint(40, 100), rng.randint(50, 100), rng.randint(45, 100)
+        achievements = rng.choice([0, 1, 2, 3, 5, 10])
+        total = physics + russian + math + achievements
+        programs = rng.sample(program_ids, rng.randint(1, len(program_ids)))
+        for priority, program_id in enumerate(programs, 1):
+            yield (applicant_id, program_id, list_date, rng.random() < 0.5, priority,
+                   physics, russian, math, achievements, total)
+            produced += 1
+            if produced >= count:
+                return
+        applicant_id += 1
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+    for program in PROGRAMS:
+        EducationalProgram.objects.get_or_create(code=program['code'], defaults=program)
+    program_ids = list(EducationalProgram.objects.values_list('id', flat=True))
+
+    rows = list(synthetic_rows(count, program_ids, date(2023, 8, 4)))
+
+    print(f"СУБД: {connection.vendor}, строк: {len(rows)}")
+    result = AdmissionIngestor().ingest(rows)
+    print(f"Метод: {result['method']}, пакетов: {result['batches']}")
+    print(f"Время: {result['seconds']:.2f} с, скорость: {result['rows'] / result['seconds']:,.0f} строк/с")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+# backend/benchmark_list_api.py
+"""
+Замер стоимости сборки ответа списковых API: создание объектов ORM и
+словарей против чтения кортежей колонок и быстрого сериализатора.
+
+    python benchmark_list_api.py 50000
+С переменными POSTGRES_* замер выполняется на PostgreSQL. Запускать на
+тестовой базе: синтетические абитуриенты записываются с ID 1..N.
+"""
+import os
+import sys
+import json
+import time
+from datetime import date
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'admission_api.settings')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+django.setup()
+
+from django.db import connection
+from admission_api.models import EducationalProgram
+from admission_api.views import _visualize_rows
+from university.ingest import AdmissionIngestor
+from university.partitions import AdmissionPartitionRouter
+from university.streaming import dumps
+from benchmark_ingest import PROGRAMS, synthetic_rows
+
+# Дата, которая не пересекается с реальными конкурсными списками
+BENCHMARK_DATE = date(2000, 1, 1)
+
+
+def orm_rows(admissions):
+    """Прежний путь: объект модели на строку и ручное копирование атрибутов"""
+    data_list = []
+    for adm in admissions.select_related('applicant', 'educational_program'):
+        data_list.append({
+            'id': adm.applicant.id,
+            'program_name': adm.educational_program.name,
+            'program_code': adm.educational_program.code,
+            'total_score': adm.applicant.total_score,
+            'has_consent': adm.has_consent,
+            'priority': adm.priority,
+            'date': adm.date.strftime('%d.%m.%Y') if adm.date else ''
+        })
+    return data_list
+
+
+def measure(label, build, serialize):
+    started = time.perf_counter()
+    rows = build()
+    fetched = time.perf_counter()
+    body = serialize({'data': rows})
+    finished = time.perf_counter()
+    print(f"{label:<28} выборка+словари: {fetched - started:6.2f} с, "
+          f"сериализация: {finished - fetched:6.2f} с, всего: {finished - started:6.2f} с, {len(body) / 1e6:.1f} МБ")
+    return finished - started
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    for program in PROGRAMS:
+        EducationalProgram.objects.get_or_create(code=program['code'], defaults=program)
+    program_ids = list(EducationalProgram.objects.values_list('id', flat=True))
+
+    partitions = AdmissionPartitionRouter()
+    if partitions.queryset(BENCHMARK_DATE).count() < count:
+        AdmissionIngestor().ingest(synthetic_rows(count, program_ids, BENCHMARK_DATE))
+    admissions = partitions.queryset(BENCHMARK_DATE)[:count]
+
+    print(f"СУБД: {connection.vendor}, строк в ответе: {count}")
+    before = measure('ORM + json.dumps', lambda: orm_rows(admissions),
+                     lambda data: json.dumps(data, ensure_ascii=False).encode())
+    after = measure('кортежи + быстрый JSON', lambda: list(_visualize_rows([(BENCHMARK_DATE, admissions)], '')),
+                    dumps)
+    print(f"Ускорение: {before / after:.1f}x")
+
+    # Данные замера не должны попадать в отчеты
+    from university.purge import AdmissionPurger
+    AdmissionPurger().purge_date(BENCHMARK_DATE)
+
+
+if __name__ == '__main__':
+    main()
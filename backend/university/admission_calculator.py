@@ -1,37 +1,33 @@
 from collections import defaultdict
-from admission_api.models import Applicant, EducationalProgram, AdmissionData
+from django.db.models import Count
+from admission_api.models import Applicant, EducationalProgram, AdmissionData, DailyAggregate, AdmissionResult, EnrolledApplicant
+from .aggregates import application_counts
+from .results import ensure_admission_results, recompute_admission_results
 
 
 class AdmissionCalculator:
+    """
+    Чтение результатов зачисления.
+
+    Сами результаты рассчитываются при загрузке данных
+    (university.results.recompute_admission_results) и хранятся в
+    AdmissionResult и EnrolledApplicant.
+    """
+
     @staticmethod
     def calculate_passing_scores(date):
         """
-        Рассчитывает проходные баллы для всех программ на определенную дату
+        Возвращает проходные баллы для всех программ на определенную дату
         """
-        programs = EducationalProgram.objects.all()
-        passing_scores = {}
-
-        for program in programs:
-            # Получаем всех абитуриентов с согласием на зачисление для этой программы
-            admitted_applicants = AdmissionData.objects.filter(
-                educational_program=program,
-                date=date,
-                has_consent=True
-            ).select_related('applicant')
-
-            # Сортируем по баллам (по убыванию), затем по приоритету (по возрастанию)
-            sorted_applicants = sorted(
-                admitted_applicants,
-                key=lambda x: (-x.applicant.total_score, x.priority)
-            )
+        results = ensure_admission_results(date)
+        if not results:
+            # Дата без заявлений: на каждой программе НЕДОБОР, результаты не сохраняются
+            return {program.code: "НЕДОБОР" for program in EducationalProgram.objects.all()}
 
+        passing_scores = {}
+        for result in results:
             # Если абитуриентов меньше мест, то проходной балл - НЕДОБОР
-            if len(sorted_applicants) < program.seats:
-                passing_scores[program.code] = "НЕДОБОР"
-            else:
-                # Проходной балл - балл последнего зачисленного абитуриента
-                last_admitted = sorted_applicants[program.seats - 1]
-                passing_scores[program.code] = last_admitted.applicant.total_score
+            passing_scores[result.program.code] = "НЕДОБОР" if result.is_shortage else result.passing_score
 
         return passing_scores
 
@@ -40,87 +36,104 @@ class AdmissionCalculator:
         """
         Получает список зачисленных абитуриентов для всех программ
         """
-        programs = EducationalProgram.objects.all()
-        admitted_lists = {}
-
-        for program in programs:
-            # Получаем всех абитуриентов с согласием на зачисление для этой программы
-            admitted_applicants = AdmissionData.objects.filter(
-                educational_program=program,
-                date=date,
-                has_consent=True
-            ).select_related('applicant')
-
-            # Сортируем по баллам (по убыванию), затем по приоритету (по возрастанию)
-            sorted_applicants = sorted(
-                admitted_applicants,
-                key=lambda x: (-x.applicant.total_score, x.priority)
-            )
-
-            # Берем только тех, кто попадает в лимит мест
-            admitted_for_program = sorted_applicants[:program.seats]
-
-            # Формируем список ID и баллов
-            admitted_info = [
-                {
-                    'id': applicant.applicant.id,
-                    'total_score': applicant.applicant.total_score
-                }
-                for applicant in admitted_for_program
-            ]
-
-            admitted_lists[program.code] = admitted_info
+        results = ensure_admission_results(date)
+        if not results:
+            # Дата без заявлений: списки зачисленных всех программ пусты
+            return {program.code: [] for program in EducationalProgram.objects.all()}
+        admitted_lists = {result.program.code: [] for result in results}
+
+        enrolled = EnrolledApplicant.objects.filter(
+            admission_result__calculation_date=date
+        ).order_by('admission_result_id', 'enrollment_order').values_list(
+            'admission_result__program__code', 'applicant_id', 'total_score'
+        )
+        for code, applicant_id, total_score in enrolled:
+            admitted_lists[code].append({
+                'id': applicant_id,
+                'total_score': total_score
+            })
 
         return admitted_lists
 
     @staticmethod
-    def get_statistics(date):
+    def get_passing_score_matrix(start_date=None, end_date=None):
         """
-        Получает статистику по программам для отчета
-        """
-        programs = EducationalProgram.objects.all()
-        statistics = {}
+        Проходные баллы за период в виде матрицы программа x дата.
 
-        for program in programs:
-            # Все абитуриенты на программу
-            all_applicants = AdmissionData.objects.filter(
-                educational_program=program,
-                date=date
-            )
+        Возвращает {'dates': [...], 'programs': [...],
+        'scores': {код: [балл по датам]}, 'enrolled': {код: [зачислено по датам]}};
+        ось дат - даты, за которые есть заявления (по агрегатам), результаты
+        берутся одним запросом к сохраненным и при отсутствии рассчитываются.
+        """
+        period = {}
+        if start_date is not None:
+            period['date__gte'] = start_date
+        if end_date is not None:
+            period['date__lte'] = end_date
+        dates = list(
+            DailyAggregate.objects.filter(**period).order_by('date').values_list('date', flat=True).distinct()
+        )
+
+        stored = set(AdmissionResult.objects.filter(calculation_date__in=dates).values_list(
+            'calculation_date', flat=True
+        ).distinct())
+        missing = set(dates) - stored
+        if missing:
+            recompute_admission_results(missing)
+
+        programs = list(EducationalProgram.objects.order_by('id').values_list('code', flat=True))
+        position = {list_date: i for i, list_date in enumerate(dates)}
+        scores = {code: [None] * len(dates) for code in programs}
+        enrolled = {code: [0] * len(dates) for code in programs}
+
+        results = AdmissionResult.objects.filter(calculation_date__in=dates).values_list(
+            'calculation_date', 'program__code', 'passing_score', 'is_shortage', 'enrolled_count'
+        )
+        for calculation_date, code, passing_score, is_shortage, enrolled_count in results:
+            scores[code][position[calculation_date]] = "НЕДОБОР" if is_shortage else passing_score
+            enrolled[code][position[calculation_date]] = enrolled_count
+
+        return {'dates': dates, 'programs': programs, 'scores': scores, 'enrolled': enrolled}
 
-            # Абитуриенты с согласием
-            consent_applicants = all_applicants.filter(has_consent=True)
+    @staticmethod
+    def get_statistics(date):
+        """
+        Получает статистику по программам для отчета.
 
-            # Сортируем абитуриентов с согласием для определения зачисленных
-            sorted_consents = sorted(
-                consent_applicants,
-                key=lambda x: (-x.applicant.total_score, x.priority)
-            )
+        Количество заявлений берется из агрегатов за день, приоритеты
+        зачисленных - из сохраненных списков зачисления.
+        """
+        results = ensure_admission_results(date)
+        counts = application_counts(date)
 
-            admitted_count = min(len(sorted_consents), program.seats)
-            admitted_applicants = sorted_consents[:admitted_count]
+        admitted_priority_counts = defaultdict(lambda: defaultdict(int))
+        admitted = EnrolledApplicant.objects.filter(
+            admission_result__calculation_date=date
+        ).values_list('admission_result__program__code', 'priority').annotate(count=Count('id')).order_by()
+        for code, priority, count in admitted:
+            admitted_priority_counts[code][priority] = count
 
-            # Статистика по приоритетам
-            priority_counts = defaultdict(int)
-            admitted_priority_counts = defaultdict(int)
+        statistics = {}
 
-            for applicant in all_applicants:
-                priority_counts[applicant.priority] += 1
+        for result in results:
+            program = result.program
+            program_counts = counts[program.code]
 
-            for applicant in admitted_applicants:
-                admitted_priority_counts[applicant.priority] += 1
+            # Статистика по приоритетам
+            priority_counts = program_counts['by_priority']
+            program_admitted = admitted_priority_counts[program.code]
 
             statistics[program.code] = {
-                'total_applications': all_applicants.count(),
+                'total_applications': program_counts['total'],
                 'seats': program.seats,
                 'first_priority': priority_counts[1],
                 'second_priority': priority_counts[2],
                 'third_priority': priority_counts[3],
                 'fourth_priority': priority_counts[4],
-                'admitted_first_priority': admitted_priority_counts[1],
-                'admitted_second_priority': admitted_priority_counts[2],
-                'admitted_third_priority': admitted_priority_counts[3],
-                'admitted_fourth_priority': admitted_priority_counts[4]
+                'admitted_first_priority': program_admitted[1],
+                'admitted_second_priority': program_admitted[2],
+                'admitted_third_priority': program_admitted[3],
+                'admitted_fourth_priority': program_admitted[4]
             }
 
         return statistics
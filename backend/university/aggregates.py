@@ -0,0 +1,70 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Count
+
+from admission_api.models import EducationalProgram, DailyAggregate
+from .partitions import AdmissionPartitionRouter
+
+
+PRIORITIES = (1, 2, 3, 4)
+
+
+def refresh_daily_aggregates(dates, using=DEFAULT_DB_ALIAS):
+    """
+    Пересчитывает агрегаты заявлений для указанных дат.
+
+    Вызывается внутри транзакции загрузки, поэтому агрегаты всегда
+    согласованы с секциями дат. Стоимость - один GROUP BY по секции даты.
+    """
+    partitions = AdmissionPartitionRouter(using)
+    with transaction.atomic(using=using):
+        for list_date in set(dates):
+            counts = (
+                partitions.queryset(list_date)
+                .values('educational_program_id', 'priority', 'has_consent')
+                .annotate(applications=Count('id'))
+                .order_by()
+            )
+            DailyAggregate.objects.using(using).filter(date=list_date).delete()
+            DailyAggregate.objects.using(using).bulk_create([
+                DailyAggregate(
+                    date=list_date,
+                    educational_program_id=row['educational_program_id'],
+                    priority=row['priority'],
+                    has_consent=row['has_consent'],
+                    applications=row['applications'],
+                )
+                for row in counts
+            ])
+
+
+def application_counts(date, using=DEFAULT_DB_ALIAS):
+    """
+    Счетчики заявлений по программам за дату из агрегатов (O(программ)).
+
+    Возвращает {код программы: {'total', 'with_consent', 'by_priority',
+    'consent_by_priority'}} для всех программ, включая программы без заявлений.
+    """
+    counts = {
+        code: {
+            'total': 0,
+            'with_consent': 0,
+            'by_priority': {priority: 0 for priority in PRIORITIES},
+            'consent_by_priority': {priority: 0 for priority in PRIORITIES},
+        }
+        for code in EducationalProgram.objects.using(using).values_list('code', flat=True)
+    }
+
+    rows = DailyAggregate.objects.using(using).filter(date=date).values_list(
+        'educational_program__code', 'priority', 'has_consent', 'applications'
+    )
+    for code, priority, has_consent, applications in rows:
+        program_counts = counts[code]
+        program_counts['total'] += applications
+        program_counts['by_priority'][priority] = program_counts['by_priority'].get(priority, 0) + applications
+        if has_consent:
+            program_counts['with_consent'] += applications
+            program_counts['consent_by_priority'][priority] = (
+                program_counts['consent_by_priority'].get(priority, 0) + applications
+            )
+
+    return counts
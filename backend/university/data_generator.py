@@ -2,6 +2,9 @@ import random
 import pandas as pd
 from datetime import datetime
 from admission_api.models import Applicant, EducationalProgram, AdmissionData
+from .aggregates import refresh_daily_aggregates
+from .partitions import AdmissionPartitionRouter
+from .results import recompute_admission_results
 
 
 class DataGenerator:
@@ -131,6 +134,12 @@ class DataGenerator:
 
     def save_to_database(self, date, applicants_data):
         """Сохраняет данные в базу данных"""
+        # Записи даты хранятся в ее секции
+        list_date = datetime.strptime(date, '%d.%m').date() if '.' in date else datetime.now().date()
+        partitions = AdmissionPartitionRouter()
+        partitions.ensure(list_date)
+        admission_model = partitions.model_for(list_date)
+
         for applicant_id, data in applicants_data:
             # Получаем или создаем абитуриента
             applicant, created = Applicant.objects.get_or_create(
@@ -149,11 +158,11 @@ class DataGenerator:
             program = EducationalProgram.objects.get(code=program_code)
 
             # Создаем или обновляем запись в AdmissionData
-            admission_data, created = AdmissionData.objects.get_or_create(
+            admission_data, created = admission_model.objects.get_or_create(
                 applicant=applicant,
                 educational_program=program,
+                date=list_date,
                 defaults={
-                    'date': datetime.strptime(date, '%d.%m').date() if '.' in date else datetime.now().date(),
                     'has_consent': data['has_consent'],
                     'priority': data['priority']
                 }
@@ -165,6 +174,9 @@ class DataGenerator:
                 admission_data.priority = data['priority']
                 admission_data.save()
 
+        refresh_daily_aggregates([list_date])
+        recompute_admission_results([list_date])
+
     def generate_all_data(self):
         """Генерирует все тестовые данные для всех дат"""
         dates = ['01.08', '02.08', '03.08', '04.08']
@@ -0,0 +1,34 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+
+
+# Общий пул для всех асинхронных представлений процесса
+_executor = ThreadPoolExecutor(
+    max_workers=settings.BLOCKING_EXECUTOR_WORKERS,
+    thread_name_prefix='blocking'
+)
+
+
+def _call_and_close_connections(func, args, kwargs):
+    try:
+        return func(*args, **kwargs)
+    finally:
+        # Соединения с БД принадлежат потоку пула: закрываем их после задачи,
+        # так как сигнал окончания запроса закрывает только соединения своего потока
+        connections.close_all()
+
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Выполняет блокирующую функцию (разбор файла, запросы к БД, сборку PDF)
+    в ограниченном пуле потоков, не занимая цикл событий асинхронного представления
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _executor,
+        functools.partial(_call_and_close_connections, func, args, kwargs)
+    )
@@ -0,0 +1,104 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import Sum
+
+from admission_api.models import EducationalProgram, DailyAggregate
+from .pagination import DEFAULT_PAGE_SIZE, decode_cursor, encode_cursor, keyset_filter
+from .partitions import AdmissionPartitionRouter
+
+
+# Сортировки таблицы данных и их полный порядок (последние поля - уникальный
+# ключ записи за дату). Сортировка по баллу идет по индексу абитуриентов
+# (-total_score, id), по ID - по уникальному индексу записей.
+GRID_SORTS = {
+    '-total_score': ('-applicant__total_score', 'applicant_id', 'educational_program_id'),
+    'total_score': ('applicant__total_score', '-applicant_id', '-educational_program_id'),
+    'id': ('applicant_id', 'educational_program_id'),
+    '-id': ('-applicant_id', '-educational_program_id'),
+}
+GRID_DEFAULT_SORT = '-total_score'
+
+GRID_FIELDS = ('applicant_id', 'educational_program_id', 'applicant__total_score', 'has_consent', 'priority')
+
+
+class AdmissionGrid:
+    """
+    Постраничная выдача конкурсного списка одной даты для таблицы данных.
+
+    Страница - один запрос с LIMIT по индексу в порядке сортировки и
+    условием «после курсора» вместо OFFSET, поэтому ее стоимость не зависит
+    от длины списка. Общее количество записей берется из агрегатов за день,
+    если фильтр не ограничивает баллы.
+    """
+
+    def __init__(self, list_date, using=DEFAULT_DB_ALIAS):
+        self.date = list_date
+        self.using = using
+        self.programs = {
+            program_id: (code, name)
+            for program_id, code, name in EducationalProgram.objects.using(using).values_list('id', 'code', 'name')
+        }
+
+    def page(self, program=None, priority=None, has_consent=None, score_min=None, score_max=None,
+             sort=GRID_DEFAULT_SORT, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+        """
+        Страница записей: {'date', 'sort', 'data', 'next_cursor', 'total'}.
+
+        program - код программы; cursor - next_cursor предыдущей страницы.
+        Неизвестная сортировка или некорректный курсор - ValueError.
+        """
+        if sort not in GRID_SORTS:
+            raise ValueError(f'Неподдерживаемая сортировка: {sort}')
+        ordering = GRID_SORTS[sort]
+
+        filters = {}
+        if program:
+            filters['educational_program_id'] = next(
+                (program_id for program_id, (code, _) in self.programs.items() if code == program), None
+            )
+        if priority is not None:
+            filters['priority'] = priority
+        if has_consent is not None:
+            filters['has_consent'] = has_consent
+
+        admissions = AdmissionPartitionRouter(self.using).queryset(self.date).filter(**filters)
+        if score_min is not None:
+            admissions = admissions.filter(applicant__total_score__gte=score_min)
+        if score_max is not None:
+            admissions = admissions.filter(applicant__total_score__lte=score_max)
+        if cursor:
+            admissions = admissions.filter(keyset_filter(ordering, decode_cursor(cursor, len(ordering))))
+
+        rows = list(admissions.order_by(*ordering).values_list(*GRID_FIELDS)[:page_size + 1])
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            values = dict(zip(GRID_FIELDS, rows[-1]))
+            next_cursor = encode_cursor(*(values[field.lstrip('-')] for field in ordering))
+
+        date_text = self.date.strftime('%d.%m.%Y')
+        data = []
+        for applicant_id, program_id, total_score, consent, row_priority in rows:
+            code, name = self.programs[program_id]
+            data.append({
+                'id': applicant_id,
+                'program_name': name,
+                'program_code': code,
+                'total_score': total_score,
+                'has_consent': consent,
+                'priority': row_priority,
+                'date': date_text,
+            })
+
+        total = None
+        if score_min is None and score_max is None:
+            total = DailyAggregate.objects.using(self.using).filter(date=self.date, **filters).aggregate(
+                total=Sum('applications')
+            )['total'] or 0
+
+        return {
+            'date': self.date.isoformat(),
+            'sort': sort,
+            'data': data,
+            'next_cursor': next_cursor,
+            'total': total,
+        }
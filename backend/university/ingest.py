@@ -0,0 +1,234 @@
+import io
+import time
+from datetime import datetime
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils.dateparse import parse_date
+
+from admission_api.models import Applicant, EducationalProgram, AdmissionData
+from .aggregates import refresh_daily_aggregates
+from .partitions import AdmissionPartitionRouter
+from .results import recompute_admission_results
+
+
+# Колонки конкурсного списка в загружаемых файлах
+COLUMN_ID = 'ID'
+COLUMN_PROGRAM = 'ОП'
+COLUMN_DATE = 'Дата'
+COLUMN_CONSENT = 'Наличие согласия о зачислении в ВУЗ'
+COLUMN_PRIORITY = 'Приоритет ОП'
+COLUMN_PHYSICS = 'Балл Физика/ИКТ'
+COLUMN_RUSSIAN = 'Балл Русский язык'
+COLUMN_MATH = 'Балл Математика'
+COLUMN_ACHIEVEMENTS = 'Балл за индивидуальные достижения'
+COLUMN_TOTAL = 'Сумма баллов'
+
+# Порядок полей нормализованной строки:
+# (applicant_id, program_id, list_date, has_consent, priority,
+#  physics_ikt, russian_lang, math, achievements, total_score)
+STAGING_COLUMNS = (
+    ('applicant_id', 'integer'),
+    ('program_id', 'bigint'),
+    ('list_date', 'date'),
+    ('has_consent', 'boolean'),
+    ('priority', 'integer'),
+    ('physics_ikt', 'integer'),
+    ('russian_lang', 'integer'),
+    ('math', 'integer'),
+    ('achievements', 'integer'),
+    ('total_score', 'integer'),
+)
+
+STAGING_TABLE = 'admission_staging'
+STAGING_ROW_FORMAT = '%d,%d,%s,%s,%d,%d,%d,%d,%d,%d\n'
+
+# Память под сортировки при слиянии пакета (DISTINCT ON по staging-таблице)
+MERGE_WORK_MEM = '64MB'
+
+
+class AdmissionIngestor:
+    """
+    Массовая загрузка конкурсных списков.
+
+    На PostgreSQL пакеты потоково передаются через COPY FROM STDIN во
+    временную staging-таблицу и сливаются в основные таблицы одним
+    INSERT ... ON CONFLICT. На остальных СУБД (SQLite) тот же upsert
+    выполняется через executemany.
+    """
+
+    def __init__(self, batch_size=None, using=DEFAULT_DB_ALIAS):
+        self.batch_size = batch_size or settings.INGEST_BATCH_SIZE
+        self.using = using
+        self.partitions = AdmissionPartitionRouter(using)
+        self.touched_dates = set()
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def uses_copy(self):
+        return self.connection.vendor == 'postgresql'
+
+    def normalize_frame(self, df):
+        """
+        Приводит DataFrame конкурсного списка к нормализованным кортежам
+        """
+        program_ids = dict(EducationalProgram.objects.using(self.using).values_list('code', 'id'))
+        unknown = set(df[COLUMN_PROGRAM].unique()) - set(program_ids)
+        if unknown:
+            raise ValueError(f'Неизвестные образовательные программы: {", ".join(map(str, sorted(unknown)))}')
+
+        if COLUMN_DATE in df:
+            dates = {value: parse_date(str(value)) for value in df[COLUMN_DATE].unique()}
+            list_dates = df[COLUMN_DATE].map(dates).tolist()
+        else:
+            list_dates = [datetime.now().date()] * len(df)
+
+        return zip(
+            df[COLUMN_ID].astype(int).tolist(),
+            df[COLUMN_PROGRAM].map(program_ids).tolist(),
+            list_dates,
+            df[COLUMN_CONSENT].astype(bool).tolist(),
+            df[COLUMN_PRIORITY].astype(int).tolist(),
+            df[COLUMN_PHYSICS].astype(int).tolist(),
+            df[COLUMN_RUSSIAN].astype(int).tolist(),
+            df[COLUMN_MATH].astype(int).tolist(),
+            df[COLUMN_ACHIEVEMENTS].astype(int).tolist(),
+            df[COLUMN_TOTAL].astype(int).tolist(),
+        )
+
+    def ingest(self, rows):
+        """
+        Загружает нормализованные строки пакетами в одной транзакции.
+
+        Агрегаты и результаты зачисления затронутых дат пересчитываются
+        в той же транзакции.
+        """
+        started = time.perf_counter()
+        processed = 0
+        batches = 0
+        self.touched_dates = set()
+
+        with transaction.atomic(using=self.using):
+            with self.connection.cursor() as cursor:
+                if self.uses_copy:
+                    self._create_staging_table(cursor)
+
+                for batch in self._batches(rows):
+                    if self.uses_copy:
+                        self._copy_batch(cursor, batch)
+                    else:
+                        self._executemany_batch(cursor, batch)
+                    processed += len(batch)
+                    batches += 1
+
+            refresh_daily_aggregates(self.touched_dates, using=self.using)
+            recompute_admission_results(self.touched_dates, using=self.using)
+
+        return {
+            'rows': processed,
+            'batches': batches,
+            'method': 'copy' if self.uses_copy else 'executemany',
+            'seconds': time.perf_counter() - started,
+        }
+
+    def _batches(self, rows):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    # --- PostgreSQL: COPY в staging-таблицу и слияние ---
+
+    def _create_staging_table(self, cursor):
+        columns = ', '.join(f'{name} {sql_type}' for name, sql_type in STAGING_COLUMNS)
+        cursor.execute(f'CREATE TEMP TABLE {STAGING_TABLE} ({columns}) ON COMMIT DROP')
+        cursor.execute(f"SET LOCAL work_mem = '{MERGE_WORK_MEM}'")
+
+    def _copy_batch(self, cursor, batch):
+        buffer = io.StringIO()
+        buffer.write(''.join(STAGING_ROW_FORMAT % row for row in batch))
+        buffer.seek(0)
+
+        cursor.execute(f'TRUNCATE {STAGING_TABLE}')
+        cursor.copy_expert(f'COPY {STAGING_TABLE} FROM STDIN WITH (FORMAT csv)', buffer)
+
+        # Строки попадут в секции своих дат, секции должны существовать заранее
+        cursor.execute(f'SELECT DISTINCT list_date FROM {STAGING_TABLE}')
+        for (list_date,) in cursor.fetchall():
+            self.partitions.ensure(list_date)
+            self.touched_dates.add(list_date)
+        self._merge_staging(cursor)
+
+    def _merge_staging(self, cursor):
+        applicant_table = Applicant._meta.db_table
+        admission_table = AdmissionData._meta.db_table
+
+        cursor.execute(f"""
+            INSERT INTO {applicant_table} (id, physics_ikt, russian_lang, math, achievements, total_score)
+            SELECT DISTINCT ON (applicant_id)
+                   applicant_id, physics_ikt, russian_lang, math, achievements, total_score
+            FROM {STAGING_TABLE}
+            ORDER BY applicant_id
+            ON CONFLICT (id) DO UPDATE SET
+                physics_ikt = EXCLUDED.physics_ikt,
+                russian_lang = EXCLUDED.russian_lang,
+                math = EXCLUDED.math,
+                achievements = EXCLUDED.achievements,
+                total_score = EXCLUDED.total_score
+            WHERE ({applicant_table}.physics_ikt, {applicant_table}.russian_lang, {applicant_table}.math,
+                   {applicant_table}.achievements, {applicant_table}.total_score)
+                  IS DISTINCT FROM
+                  (EXCLUDED.physics_ikt, EXCLUDED.russian_lang, EXCLUDED.math,
+                   EXCLUDED.achievements, EXCLUDED.total_score)
+        """)
+        cursor.execute(f"""
+            INSERT INTO {admission_table} (applicant_id, educational_program_id, date, has_consent, priority)
+            SELECT DISTINCT ON (applicant_id, program_id, list_date)
+                   applicant_id, program_id, list_date, has_consent, priority
+            FROM {STAGING_TABLE}
+            ORDER BY applicant_id, program_id, list_date
+            ON CONFLICT (applicant_id, educational_program_id, date) DO UPDATE SET
+                has_consent = EXCLUDED.has_consent,
+                priority = EXCLUDED.priority
+            WHERE ({admission_table}.has_consent, {admission_table}.priority)
+                  IS DISTINCT FROM (EXCLUDED.has_consent, EXCLUDED.priority)
+        """)
+
+    # --- Остальные СУБД: executemany с upsert ---
+
+    def _executemany_batch(self, cursor, batch):
+        applicant_table = Applicant._meta.db_table
+
+        applicants = {row[0]: (row[0],) + tuple(row[5:]) for row in batch}
+        cursor.executemany(f"""
+            INSERT INTO {applicant_table} (id, physics_ikt, russian_lang, math, achievements, total_score)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT (id) DO UPDATE SET
+                physics_ikt = excluded.physics_ikt,
+                russian_lang = excluded.russian_lang,
+                math = excluded.math,
+                achievements = excluded.achievements,
+                total_score = excluded.total_score
+        """, list(applicants.values()))
+
+        # Каждая дата пишется в свою таблицу
+        rows_by_date = {}
+        for row in batch:
+            rows_by_date.setdefault(row[2], []).append(row[:5])
+        for list_date, rows in rows_by_date.items():
+            admission_table = self.partitions.ensure(list_date)
+            self.touched_dates.add(list_date)
+            cursor.executemany(f"""
+                INSERT INTO "{admission_table}" (applicant_id, educational_program_id, date, has_consent, priority)
+                VALUES (%s, %s, %s, %s, %s)
+                ON CONFLICT (applicant_id, educational_program_id, date) DO UPDATE SET
+                    has_consent = excluded.has_consent,
+                    priority = excluded.priority
+            """, rows)
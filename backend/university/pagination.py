@@ -0,0 +1,56 @@
+import base64
+import json
+
+from django.db.models import Q
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(*key):
+    """Кодирует ключ сортировки последней записи страницы в непрозрачный курсор"""
+    raw = json.dumps(key, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """
+    Восстанавливает ключ сортировки из курсора encode_cursor.
+
+    Для всего, что не является курсором ожидаемой длины, выбрасывает ValueError.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        key = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError('Некорректный курсор') from e
+    if not isinstance(key, list) or len(key) != size or not all(isinstance(part, int) for part in key):
+        raise ValueError('Некорректный курсор')
+    return tuple(key)
+
+
+def parse_page_size(value):
+    """Размер страницы из параметра запроса, не больше MAX_PAGE_SIZE"""
+    if not value:
+        return DEFAULT_PAGE_SIZE
+    page_size = int(value)
+    if page_size < 1:
+        raise ValueError('Размер страницы должен быть положительным')
+    return min(page_size, MAX_PAGE_SIZE)
+
+
+def keyset_filter(ordering, key):
+    """
+    Условие «после ключа key» для сортировки ordering (поля order_by,
+    '-' перед именем - по убыванию): записи, идущие в этом порядке после key
+    """
+    fields = [field.lstrip('-') for field in ordering]
+    condition = Q()
+    for position, field in enumerate(ordering):
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{fields[position]}__{lookup}': key[position]})
+        for previous, value in zip(fields[:position], key):
+            step &= Q(**{previous: value})
+        condition |= step
+    return condition
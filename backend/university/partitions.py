@@ -0,0 +1,187 @@
+import re
+from datetime import datetime
+
+from django.db import DEFAULT_DB_ALIAS, connections, models
+
+from admission_api.models import AdmissionData
+
+
+# Модели отдельных дней для SQLite создаются один раз на процесс
+_day_models = {}
+
+
+def partition_table(parent_table, list_date):
+    """Имя таблицы-секции для даты конкурсного списка"""
+    return f'{parent_table}_{list_date:%Y%m%d}'
+
+
+def archive_table(parent_table, list_date):
+    """Имя архивной таблицы для отключенной секции"""
+    return f'{parent_table}_archive_{list_date:%Y%m%d}'
+
+
+def partition_dates(connection, parent_table):
+    """Даты, для которых в базе есть секции"""
+    pattern = re.compile(rf'^{re.escape(parent_table)}_(\d{{8}})$')
+    with connection.cursor() as cursor:
+        # table_names() не включает секции PostgreSQL, поэтому берем полный список
+        tables = connection.introspection.get_table_list(cursor)
+    dates = []
+    for table in tables:
+        match = pattern.match(table.name)
+        if match:
+            dates.append(datetime.strptime(match.group(1), '%Y%m%d').date())
+    return sorted(dates)
+
+
+def create_partition(connection, parent_table, list_date):
+    """
+    Создает секцию для даты, если ее еще нет.
+
+    На PostgreSQL это нативная секция LIST (date), на SQLite - отдельная
+    таблица с той же схемой и индексами, что и родительская.
+    """
+    table = partition_table(parent_table, list_date)
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {qn(table)} PARTITION OF {qn(parent_table)} FOR VALUES IN (%s)',
+                [list_date]
+            )
+        else:
+            _clone_sqlite_table(cursor, parent_table, table, f'{list_date:%Y%m%d}')
+    return table
+
+
+def drop_partition(connection, parent_table, list_date):
+    """Удаляет секцию даты целиком, без построчного удаления"""
+    qn = connection.ops.quote_name
+    table = partition_table(parent_table, list_date)
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE IF EXISTS {qn(table)}')
+    # Модель дня остается в _day_models: секция той же даты создается заново
+    # с той же схемой, а повторная регистрация модели в Django не допускается
+
+
+def archive_partition(connection, parent_table, list_date):
+    """Отключает секцию даты и сохраняет ее под архивным именем"""
+    qn = connection.ops.quote_name
+    table = partition_table(parent_table, list_date)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'ALTER TABLE {qn(parent_table)} DETACH PARTITION {qn(table)}')
+        cursor.execute(f'ALTER TABLE {qn(table)} RENAME TO {qn(archive_table(parent_table, list_date))}')
+
+
+def _clone_sqlite_table(cursor, parent_table, table, suffix):
+    cursor.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE tbl_name = %s AND sql IS NOT NULL ORDER BY type DESC",
+        [parent_table]
+    )
+    for object_type, name, sql in cursor.fetchall():
+        if object_type == 'table':
+            sql = sql.replace(f'CREATE TABLE "{parent_table}"', f'CREATE TABLE IF NOT EXISTS "{table}"', 1)
+            # Каскадное удаление выполняет сама СУБД, ORM о таблицах дней не знает
+            sql = re.sub(r'(REFERENCES "\w+" \("id"\))', r'\1 ON DELETE CASCADE', sql)
+        else:
+            sql = re.sub(r'^CREATE (UNIQUE )?INDEX ', r'CREATE \1INDEX IF NOT EXISTS ', sql)
+            sql = sql.replace(f'"{name}"', f'"{name}_{suffix}"', 1)
+            sql = sql.replace(f'ON "{parent_table}"', f'ON "{table}"', 1)
+        cursor.execute(sql)
+
+
+def _day_model(list_date):
+    """
+    Модель ORM поверх таблицы одного дня (SQLite).
+
+    Поля копируются из AdmissionData, обратные связи у абитуриента и
+    программы не создаются: каскадное удаление выполняет СУБД.
+    """
+    table = partition_table(AdmissionData._meta.db_table, list_date)
+    if table not in _day_models:
+        attrs = {'__module__': AdmissionData.__module__, '__str__': AdmissionData.__str__}
+        for field in AdmissionData._meta.local_fields:
+            if field.primary_key:
+                continue
+            name, path, args, kwargs = field.deconstruct()
+            if field.is_relation:
+                kwargs['related_name'] = '+'
+                kwargs['on_delete'] = models.DO_NOTHING
+            attrs[name] = field.__class__(*args, **kwargs)
+        attrs['Meta'] = type('Meta', (), {
+            'app_label': AdmissionData._meta.app_label,
+            'db_table': table,
+            'managed': False,
+            'unique_together': AdmissionData._meta.unique_together,
+        })
+        _day_models[table] = type(f'AdmissionData{list_date:%Y%m%d}', (models.Model,), attrs)
+    return _day_models[table]
+
+
+class AdmissionPartitionRouter:
+    """
+    Маршрутизация записей AdmissionData по секциям дат.
+
+    На PostgreSQL все запросы идут к родительской таблице, а секцию по
+    условию на дату выбирает планировщик. На SQLite каждая дата хранится в
+    своей таблице, и маршрутизатор выдает модель этой таблицы.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.parent_table = AdmissionData._meta.db_table
+        self._ensured = set()
+        # Список секций читается из каталога СУБД один раз на маршрутизатор
+        # и сбрасывается, когда этот маршрутизатор создает или удаляет секцию
+        self._dates = None
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    @property
+    def native(self):
+        return self.connection.vendor == 'postgresql'
+
+    def table_name(self, list_date):
+        return partition_table(self.parent_table, list_date)
+
+    def dates(self):
+        if self._dates is None:
+            self._dates = partition_dates(self.connection, self.parent_table)
+        return list(self._dates)
+
+    def ensure(self, list_date):
+        """Гарантирует наличие секции для даты и возвращает имя ее таблицы"""
+        if list_date not in self._ensured:
+            create_partition(self.connection, self.parent_table, list_date)
+            self._ensured.add(list_date)
+            self._dates = None
+        return self.table_name(list_date)
+
+    def model_for(self, list_date):
+        if self.native:
+            return AdmissionData
+        return _day_model(list_date)
+
+    def queryset(self, list_date):
+        """Записи одной даты: запрос затрагивает только ее секцию"""
+        if not self.native and list_date not in self.dates():
+            return AdmissionData.objects.using(self.using).none()
+        return self.model_for(list_date).objects.using(self.using).filter(date=list_date)
+
+    def querysets(self):
+        """Записи по всем датам, секция за секцией"""
+        for list_date in self.dates():
+            yield list_date, self.queryset(list_date)
+
+    def drop(self, list_date):
+        drop_partition(self.connection, self.parent_table, list_date)
+        self._ensured.discard(list_date)
+        self._dates = None
+
+    def archive(self, list_date):
+        archive_partition(self.connection, self.parent_table, list_date)
+        self._ensured.discard(list_date)
+        self._dates = None
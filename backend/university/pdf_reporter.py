@@ -1,22 +1,109 @@
 from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import SimpleDocTemplate, Table, LongTable, TableStyle, Paragraph, Spacer, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
 from reportlab.lib import colors
 from datetime import datetime
 from io import BytesIO
-import matplotlib.pyplot as plt
-import base64
+import hashlib
+import logging
+from itertools import islice
+from django.core.cache import cache
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from .admission_calculator import AdmissionCalculator
+from .snapshots import snapshot_version
+from . import singleflight
+
+
+logger = logging.getLogger(__name__)
+
+# Сколько секунд готовый график динамики хранится в кэше; ключ меняется
+# вместе с версиями снимков дат, поэтому устаревший график не отдается
+CHART_CACHE_TTL = 24 * 60 * 60
+
+
+# Строк в одной таблице длинного списка. ReportLab заново разбивает таблицу
+# на каждой странице, поэтому одна таблица на список верстается за квадратичное
+# время; куски фиксированного размера с повтором заголовка - за линейное.
+LIST_CHUNK_ROWS = 500
+
+
+def list_tables(header, rows, col_widths, style):
+    """
+    Длинный список в виде кусков LongTable по LIST_CHUNK_ROWS строк с
+    заголовком на каждой странице; rows - любой итерируемый объект,
+    читается по куску за раз
+    """
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, LIST_CHUNK_ROWS))
+        if not chunk:
+            return
+        table = LongTable([header] + chunk, colWidths=col_widths, repeatRows=1)
+        table.setStyle(style)
+        yield table
+
+
+def render_dynamics_chart(matrix):
+    """
+    PNG-график динамики проходных баллов по матрице get_passing_score_matrix.
+
+    Строится через объектный API Figure/Agg без глобального состояния pyplot,
+    поэтому графики можно строить одновременно в нескольких потоках.
+    """
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    date_labels = [d.strftime('%d.%m') for d in matrix['dates']]
+
+    for program in matrix['programs']:
+        scores_over_time = [
+            # НЕДОБОР и даты без результатов - разрыв линии
+            float('nan') if score == "НЕДОБОР" or score is None else score
+            for score in matrix['scores'][program]
+        ]
+        ax.plot(date_labels, scores_over_time, marker='o', label=program)
+
+    ax.set_xlabel('Дата')
+    ax.set_ylabel('Проходной балл')
+    ax.set_title('Динамика проходных баллов по образовательным программам')
+    ax.legend()
+    ax.grid(True)
+
+    img_buffer = BytesIO()
+    fig.savefig(img_buffer, format='png')
+    return img_buffer.getvalue()
 
 
 class PDFReporter:
     def __init__(self):
         self.calculator = AdmissionCalculator()
 
-    def generate_report(self, date):
+    def dynamics_chart(self):
         """
-        Генерирует PDF-отчет для определенной даты
+        PNG-график динамики проходных баллов за все даты с заявлениями или
+        None, если заявлений нет. Строится один раз на набор версий снимков
+        дат и берется из кэша в следующих отчетах.
+        """
+        # Проходные баллы за все даты с заявлениями одним запросом к сохраненным результатам
+        matrix = self.calculator.get_passing_score_matrix()
+        if not matrix['dates']:
+            return None
+
+        versions = repr([(d, snapshot_version(d)) for d in matrix['dates']])
+        key = f'dynamics-chart:{hashlib.sha1(versions.encode()).hexdigest()}'
+        chart = cache.get(key)
+        if chart is None:
+            # Одновременные отчеты строят график один раз
+            chart = singleflight.reports.do(key, render_dynamics_chart, matrix)
+            cache.set(key, chart, CHART_CACHE_TTL)
+        return chart
+
+    def generate_report(self, date, chart=None):
+        """
+        Генерирует PDF-отчет для определенной даты; chart - готовый PNG-график
+        динамики (dynamics_chart), без него график строится здесь
         """
         buffer = BytesIO()
         doc = SimpleDocTemplate(buffer, pagesize=A4)
@@ -63,47 +150,29 @@ class PDFReporter:
 
         # График динамики проходных баллов (если есть данные за другие даты)
         try:
-            # Попробуем получить данные за все даты для графика
-            all_dates = ['01.08', '02.08', '03.08', '04.08']
-            program_codes = ['ПМ', 'ИВТ', 'ИТСС', 'ИБ']
-
-            fig, ax = plt.subplots(figsize=(10, 6))
-
-            for program in program_codes:
-                scores_over_time = []
-                for d in all_dates:
-                    try:
-                        scores = self.calculator.calculate_passing_scores(d)
-                        score = scores[program]
-                        if isinstance(score, str) and score == "НЕДОБОР":
-                            scores_over_time.append(0)  # Временное значение для НЕДОБОРА
-                        else:
-                            scores_over_time.append(score)
-                    except:
-                        scores_over_time.append(0)
-
-                ax.plot(all_dates, scores_over_time, marker='o', label=program)
-
-            ax.set_xlabel('Дата')
-            ax.set_ylabel('Проходной балл')
-            ax.set_title('Динамика проходных баллов по образовательным программам')
-            ax.legend()
-            ax.grid(True)
-
-            # Сохраняем график во временный буфер
-            img_buffer = BytesIO()
-            plt.savefig(img_buffer, format='png')
-            img_buffer.seek(0)
-            plt.close()
-
-            elements.append(Spacer(1, 12))
-        except:
-            # Если не удалось создать график, просто пропускаем
-            pass
+            if chart is None:
+                chart = self.dynamics_chart()
+            if chart is not None:
+                elements.append(Paragraph('Динамика проходных баллов:', styles['Heading2']))
+                elements.append(Image(BytesIO(chart), width=6.2 * inch, height=3.72 * inch))
+                elements.append(Spacer(1, 12))
+        except Exception:
+            # Если не удалось создать график, отчет формируется без него
+            logger.exception('Не удалось построить график динамики проходных баллов')
 
         # Списки зачисленных абитуриентов
         admitted_lists = self.calculator.get_admitted_applicants(date)
         elements.append(Paragraph('Списки зачисленных абитуриентов:', styles['Heading2']))
+        admitted_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
 
         for program_code, admitted in admitted_lists.items():
             program_names = {
@@ -116,22 +185,13 @@ class PDFReporter:
             elements.append(Paragraph(f'{program_names[program_code]}:', styles['Heading3']))
 
             if admitted:
-                admitted_data = [['ID', 'Сумма баллов']]
-                for applicant in admitted:
-                    admitted_data.append([str(applicant['id']), str(applicant['total_score'])])
-
-                admitted_table = Table(admitted_data)
-                admitted_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 8),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                elements.append(admitted_table)
+                # Длинные списки разбиваются на таблицы с заголовком на каждой странице
+                elements.extend(list_tables(
+                    ['ID', 'Сумма баллов'],
+                    ([str(applicant['id']), str(applicant['total_score'])] for applicant in admitted),
+                    [1.5 * inch] * 2,
+                    admitted_style
+                ))
             else:
                 elements.append(Paragraph('Нет зачисленных абитуриентов.', styles['Normal']))
 
@@ -0,0 +1,80 @@
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from admission_api.models import Applicant, AdmissionData, DailyAggregate, AdmissionResult, EnrolledApplicant
+from .partitions import AdmissionPartitionRouter
+from .snapshots import invalidate_snapshots
+
+
+class AdmissionPurger:
+    """
+    Массовое удаление конкурсных списков без коллектора удаления Django.
+
+    Коллектор загружает в память все связанные объекты, чтобы эмулировать
+    каскад. Здесь данные удаляются целиком на уровне СУБД: секции дат
+    удаляются (DROP TABLE), остальные таблицы очищаются TRUNCATE на
+    PostgreSQL или одним DELETE на SQLite. Вместе с данными удаляются
+    зависящие от них агрегаты, результаты зачисления и версии снимков.
+    """
+
+    def __init__(self, using=DEFAULT_DB_ALIAS):
+        self.using = using
+        self.partitions = AdmissionPartitionRouter(using)
+
+    @property
+    def connection(self):
+        return connections[self.using]
+
+    def purge_all(self):
+        """Удаляет все конкурсные списки, абитуриентов и результаты"""
+        qn = self.connection.ops.quote_name
+        # Порядок важен для SQLite: сначала зависимые таблицы
+        tables = [qn(model._meta.db_table) for model in (
+            EnrolledApplicant, AdmissionResult, DailyAggregate, AdmissionData, Applicant
+        )]
+
+        with transaction.atomic(using=self.using):
+            invalidate_snapshots(AdmissionResult.objects.using(self.using).values_list(
+                'calculation_date', flat=True
+            ).distinct(), using=self.using)
+            for list_date in self.partitions.dates():
+                self.partitions.drop(list_date)
+            with self.connection.cursor() as cursor:
+                if self.connection.vendor == 'postgresql':
+                    cursor.execute(f'TRUNCATE {", ".join(tables)}')
+                else:
+                    for table in tables:
+                        cursor.execute(f'DELETE FROM {table}')
+
+    def purge_date(self, list_date):
+        """
+        Удаляет конкурсный список одной даты и абитуриентов, у которых
+        не осталось заявлений за другие даты
+        """
+        qn = self.connection.ops.quote_name
+        enrolled_table = qn(EnrolledApplicant._meta.db_table)
+        result_table = qn(AdmissionResult._meta.db_table)
+        aggregate_table = qn(DailyAggregate._meta.db_table)
+        applicant_table = qn(Applicant._meta.db_table)
+
+        with transaction.atomic(using=self.using):
+            invalidate_snapshots([list_date], using=self.using)
+            self.partitions.drop(list_date)
+            with self.connection.cursor() as cursor:
+                cursor.execute(
+                    f'DELETE FROM {enrolled_table} WHERE admission_result_id IN '
+                    f'(SELECT id FROM {result_table} WHERE calculation_date = %s)',
+                    [list_date]
+                )
+                cursor.execute(f'DELETE FROM {result_table} WHERE calculation_date = %s', [list_date])
+                cursor.execute(f'DELETE FROM {aggregate_table} WHERE date = %s', [list_date])
+
+                # На SQLite заявления каждой даты лежат в своей таблице
+                if self.partitions.native:
+                    admission_tables = [AdmissionData._meta.db_table]
+                else:
+                    admission_tables = [self.partitions.table_name(d) for d in self.partitions.dates()]
+                still_applied = ''.join(
+                    f' AND NOT EXISTS (SELECT 1 FROM {qn(table)} a WHERE a.applicant_id = {applicant_table}.id)'
+                    for table in admission_tables
+                )
+                cursor.execute(f'DELETE FROM {applicant_table} WHERE TRUE{still_applied}')
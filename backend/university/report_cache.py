@@ -0,0 +1,54 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+
+
+class ReportCache:
+    """
+    Готовые отчеты по ключу (тип отчета, дата, версия снимка) в памяти процесса.
+
+    Отчет собирается один раз на снимок: новая версия того же отчета
+    вытесняет старые, а суммарный размер ограничен max_bytes - сверх него
+    удаляются давно не запрашивавшиеся отчеты (LRU).
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._reports = OrderedDict()
+        self._size = 0
+
+    def get(self, kind, date, version):
+        """Содержимое отчета или None, если его нет в кэше"""
+        key = (kind, date, version)
+        with self._lock:
+            content = self._reports.get(key)
+            if content is not None:
+                self._reports.move_to_end(key)
+            return content
+
+    def put(self, kind, date, version, content):
+        """Сохраняет отчет, вытесняя его прежние версии и давно не запрашивавшиеся отчеты"""
+        if len(content) > self.max_bytes:
+            return
+        with self._lock:
+            for stale in [cached for cached in self._reports if cached[:2] == (kind, date)]:
+                self._size -= len(self._reports.pop(stale))
+            self._reports[(kind, date, version)] = content
+            self._size += len(content)
+            while self._size > self.max_bytes:
+                _, evicted = self._reports.popitem(last=False)
+                self._size -= len(evicted)
+
+    def get_or_build(self, kind, date, version, build):
+        """Содержимое отчета; при промахе вызывает build() и сохраняет результат"""
+        content = self.get(kind, date, version)
+        if content is None:
+            content = build()
+            self.put(kind, date, version, content)
+        return content
+
+
+# Общий для всех запросов процесса
+reports = ReportCache(settings.REPORT_CACHE_MAX_BYTES)
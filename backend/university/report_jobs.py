@@ -0,0 +1,168 @@
+import logging
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+from django.conf import settings
+
+from . import report_cache
+
+
+logger = logging.getLogger(__name__)
+
+class JobQueueFull(Exception):
+    """Очередь отчетов заполнена: REPORT_MAX_PENDING_JOBS заданий ждут или выполняются"""
+
+
+def _init_worker():
+    import django
+    django.setup()
+
+
+def _render_pdf_report(report_date, chart):
+    from .pdf_reporter import PDFReporter
+    return PDFReporter().generate_report(report_date, chart).getvalue()
+
+
+def _dynamics_chart():
+    """
+    График динамики для задания отчета. Строится и кэшируется в процессе,
+    принимающем задания: процессы пула запускаются заново, и их кэш в памяти
+    (LocMemCache) не виден ни друг другу, ни следующим процессам пула
+    """
+    from .pdf_reporter import PDFReporter
+    try:
+        return PDFReporter().dynamics_chart()
+    except Exception:
+        # Процесс пула попробует построить график еще раз
+        logger.exception('Не удалось построить график динамики проходных баллов')
+        return None
+
+
+class ReportJob:
+    def __init__(self, job_id, key, future):
+        self.id = job_id
+        self.key = key
+        self.future = future
+        self.finished_at = None
+
+    @property
+    def state(self):
+        if not self.future.done():
+            return 'running' if self.future.running() else 'queued'
+        return 'failed' if self.future.exception() is not None else 'done'
+
+    def wait(self, timeout):
+        """Ждет завершения задания не дольше timeout секунд; возвращает его состояние"""
+        try:
+            self.future.exception(timeout=timeout)
+        except TimeoutError:
+            pass
+        return self.state
+
+    def to_dict(self):
+        data = {'job_id': self.id, 'state': self.state}
+        if data['state'] == 'failed':
+            data['error'] = f'Ошибка при генерации отчета: {self.future.exception()}'
+        return data
+
+
+class ReportJobQueue:
+    """
+    Задания на сборку отчетов, выполняемые ограниченным пулом процессов:
+    верстка ReportLab не занимает ни потоки запросов, ни пул run_blocking.
+
+    На ключ (тип отчета, дата, версия снимка) создается одно задание;
+    готовый отчет кладется в кэш отчетов, и повторный запрос того же снимка
+    завершается сразу, без обращения к пулу. Идентификаторы заданий известны
+    только создавшему их процессу.
+    """
+
+    def __init__(self, workers, max_pending, finished_ttl):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.finished_ttl = finished_ttl
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs = {}
+        self._by_key = {}
+
+    def _pool(self):
+        if self._executor is None:
+            # Процессы запускаются заново и не наследуют соединения с БД этого процесса
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker
+            )
+        return self._executor
+
+    def submit_pdf_report(self, report_date, version):
+        key = ('pdf', report_date, version)
+        chart = None if self._known(key) else _dynamics_chart()
+        return self._submit(key, _render_pdf_report, report_date, chart)
+
+    def _known(self, key):
+        """Есть ли уже задание с этим ключом или готовый отчет в кэше"""
+        with self._lock:
+            job = self._by_key.get(key)
+            if job is not None and job.state != 'failed':
+                return True
+        return report_cache.reports.get(*key) is not None
+
+    def _submit(self, key, func, *args):
+        with self._lock:
+            self._forget_expired()
+            job = self._by_key.get(key)
+            if job is not None and job.state != 'failed':
+                return job
+
+            future = None
+            cached = report_cache.reports.get(*key)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+            else:
+                pending = sum(1 for queued in self._jobs.values() if not queued.future.done())
+                if pending >= self.max_pending:
+                    raise JobQueueFull('Слишком много отчетов в очереди, повторите запрос позже')
+                try:
+                    future = self._pool().submit(func, *args)
+                except BrokenProcessPool:
+                    # Процесс пула завершился аварийно и сломал пул; создаем новый
+                    self._executor = None
+                    future = self._pool().submit(func, *args)
+
+            job = ReportJob(uuid.uuid4().hex, key, future)
+            future.add_done_callback(lambda done: self._finished(job))
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            return job
+
+    def _finished(self, job):
+        job.finished_at = time.monotonic()
+        if job.future.exception() is None:
+            report_cache.reports.put(*job.key, job.future.result())
+
+    def get(self, job_id):
+        with self._lock:
+            self._forget_expired()
+            return self._jobs.get(job_id)
+
+    def _forget_expired(self):
+        expired = time.monotonic() - self.finished_ttl
+        for job in [job for job in self._jobs.values() if job.finished_at and job.finished_at < expired]:
+            del self._jobs[job.id]
+            if self._by_key.get(job.key) is job:
+                del self._by_key[job.key]
+
+
+# Общая для всех запросов процесса
+reports = ReportJobQueue(
+    settings.REPORT_WORKERS,
+    settings.REPORT_MAX_PENDING_JOBS,
+    settings.REPORT_JOB_TTL
+)
@@ -0,0 +1,73 @@
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from admission_api.models import EducationalProgram, AdmissionResult, EnrolledApplicant
+from .partitions import AdmissionPartitionRouter
+from .snapshots import invalidate_snapshots
+
+
+def recompute_admission_results(dates, using=DEFAULT_DB_ALIAS):
+    """
+    Пересчитывает и сохраняет результаты зачисления для указанных дат.
+
+    Для каждой программы зачисляются первые seats абитуриентов с согласием
+    (по убыванию суммы баллов, затем по приоритету). Результаты и списки
+    зачисленных записываются пакетно, старые результаты дат удаляются,
+    версии снимков дат сбрасываются.
+    """
+    partitions = AdmissionPartitionRouter(using)
+    programs = list(EducationalProgram.objects.using(using).all())
+
+    with transaction.atomic(using=using):
+        invalidate_snapshots(dates, using=using)
+        for list_date in set(dates):
+            EnrolledApplicant.objects.using(using).filter(admission_result__calculation_date=list_date).delete()
+            AdmissionResult.objects.using(using).filter(calculation_date=list_date).delete()
+
+            enrolled_by_program = {}
+            for program in programs:
+                enrolled_by_program[program.id] = list(
+                    partitions.queryset(list_date).filter(
+                        educational_program_id=program.id,
+                        has_consent=True
+                    ).order_by('-applicant__total_score', 'priority', 'applicant_id').values_list(
+                        'applicant_id', 'priority', 'applicant__total_score'
+                    )[:program.seats]
+                )
+
+            results = []
+            for program in programs:
+                enrolled = enrolled_by_program[program.id]
+                # Если абитуриентов меньше мест, то проходной балл - НЕДОБОР
+                is_shortage = len(enrolled) < program.seats
+                results.append(AdmissionResult(
+                    program=program,
+                    calculation_date=list_date,
+                    passing_score=enrolled[-1][2] if enrolled and not is_shortage else None,
+                    enrolled_count=len(enrolled),
+                    is_shortage=is_shortage,
+                ))
+            AdmissionResult.objects.using(using).bulk_create(results)
+
+            EnrolledApplicant.objects.using(using).bulk_create([
+                EnrolledApplicant(
+                    admission_result=result,
+                    applicant_id=applicant_id,
+                    priority=priority,
+                    total_score=total_score,
+                    enrollment_order=order,
+                )
+                for result in results
+                for order, (applicant_id, priority, total_score) in enumerate(enrolled_by_program[result.program_id], 1)
+            ], batch_size=5000)
+
+
+def ensure_admission_results(date, using=DEFAULT_DB_ALIAS):
+    """
+    Результаты зачисления за дату; при отсутствии рассчитываются один раз
+    (например, для данных, загруженных до появления сохраненных результатов).
+    Для даты без заявлений ничего не записывается и результатов нет.
+    """
+    results = AdmissionResult.objects.using(using).filter(calculation_date=date).select_related('program')
+    if not results.exists() and AdmissionPartitionRouter(using).queryset(date).exists():
+        recompute_admission_results([date], using=using)
+    return results
@@ -0,0 +1,51 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    Не более одного вычисления на ключ одновременно в пределах процесса.
+
+    Потоки, запросившие ключ, который уже вычисляется, ждут это вычисление и
+    получают его результат (или исключение) вместо запуска собственного.
+    После завершения результат не кэшируется.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+# Общие для всех запросов процесса: расчеты зачисления и сборка отчетов
+allocations = SingleFlight()
+reports = SingleFlight()
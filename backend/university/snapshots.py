@@ -0,0 +1,51 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Max
+
+from admission_api.models import AdmissionResult
+
+
+# Значение в кэше для даты без сохраненных результатов
+NO_SNAPSHOT = 'none'
+
+
+def _cache_key(date):
+    return f'snapshot-version:{date:%Y-%m-%d}'
+
+
+def snapshot_version(date, using=DEFAULT_DB_ALIAS):
+    """
+    Версия снимка данных за дату - время последнего пересчета результатов.
+
+    Читается из кэша; база запрашивается только при промахе. None, если
+    результаты за дату еще не рассчитаны.
+    """
+    if date is None:
+        return None
+    key = _cache_key(date)
+    version = cache.get(key)
+    if version is None:
+        version = AdmissionResult.objects.using(using).filter(
+            calculation_date=date
+        ).aggregate(version=Max('calculation_time'))['version'] or NO_SNAPSHOT
+        cache.set(key, version, settings.SNAPSHOT_VERSION_TTL)
+    return None if version == NO_SNAPSHOT else version
+
+
+def snapshot_etag(date):
+    """Строгий ETag снимка даты (без кавычек) или None"""
+    version = snapshot_version(date)
+    if version is None:
+        return None
+    return hashlib.sha1(f'{date:%Y-%m-%d}:{version.isoformat()}'.encode()).hexdigest()
+
+
+def invalidate_snapshots(dates, using=DEFAULT_DB_ALIAS):
+    """
+    Сбрасывает закэшированные версии дат после фиксации транзакции
+    """
+    keys = [_cache_key(date) for date in set(dates)]
+    transaction.on_commit(lambda: cache.delete_many(keys), using=using)
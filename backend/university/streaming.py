@@ -0,0 +1,79 @@
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - без orjson используется стандартный json
+    orjson = None
+
+
+# Количество строк, которое сервер читает из курсора за один раз
+STREAM_CHUNK_SIZE = 2000
+
+# Форматы потоковой выдачи: NDJSON (строка JSON на запись) и обычный JSON-массив
+STREAM_FORMATS = ('ndjson', 'json')
+
+
+def dumps(obj):
+    """Быстрая сериализация в JSON (bytes, UTF-8): orjson, если установлен"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def ndjson_chunks(rows):
+    """Сериализует записи по мере чтения: одна строка JSON на запись"""
+    for row in rows:
+        yield dumps(row) + b'\n'
+
+
+def json_array_chunks(rows, key):
+    """
+    Сериализует записи как {"<key>": [...]} по частям, не собирая список
+    """
+    yield b'{' + dumps(key) + b':['
+    separator = b''
+    for row in rows:
+        yield separator + dumps(row)
+        separator = b','
+    yield b']}'
+
+
+async def async_chunks(chunks):
+    """
+    Асинхронный итератор по частям ответа для ASGI: записи читаются из курсора
+    и сериализуются порциями по STREAM_CHUNK_SIZE в потоке запроса
+    (thread_sensitive - тот же поток и то же соединение с БД, что у
+    представления), а цикл событий отправляет каждую порцию по готовности
+    """
+    read_batch = sync_to_async(lambda: b''.join(islice(chunks, STREAM_CHUNK_SIZE)), thread_sensitive=True)
+    try:
+        while True:
+            batch = await read_batch()
+            if not batch:
+                break
+            yield batch
+    finally:
+        # Клиент мог отключиться раньше: курсор закрывается в том же потоке
+        await sync_to_async(chunks.close, thread_sensitive=True)()
+
+
+def streaming_json_response(rows, stream_format, key, request=None):
+    """
+    Потоковый ответ с записями rows в формате ndjson или json.
+
+    Под ASGI ответ получает асинхронный итератор: синхронный Django 4.2
+    собирает в список целиком до отправки первого байта
+    """
+    if stream_format == 'ndjson':
+        chunks, content_type = ndjson_chunks(rows), 'application/x-ndjson; charset=utf-8'
+    else:
+        chunks, content_type = json_array_chunks(rows, key), 'application/json; charset=utf-8'
+
+    if isinstance(request, ASGIRequest):
+        chunks = async_chunks(chunks)
+    return StreamingHttpResponse(chunks, content_type=content_type)
@@ -0,0 +1,423 @@
+import json
+import unittest
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import pandas as pd
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+
+from admission_api.models import AdmissionResult, Applicant, DailyAggregate, EducationalProgram, EnrolledApplicant
+from university import pdf_reporter, report_jobs
+from university.admission_calculator import AdmissionCalculator
+from university.ingest import AdmissionIngestor
+from university.partitions import AdmissionPartitionRouter
+from university.purge import AdmissionPurger
+
+
+FIRST_DAY = date(2024, 8, 1)
+SECOND_DAY = date(2024, 8, 2)
+
+
+def list_row(applicant_id, program, list_date, consent=True, priority=1, total=240):
+    """Строка конкурсного списка в формате загружаемых файлов"""
+    return {
+        'ID': applicant_id,
+        'ОП': program,
+        'Дата': list_date.isoformat(),
+        'Наличие согласия о зачислении в ВУЗ': consent,
+        'Приоритет ОП': priority,
+        'Балл Физика/ИКТ': 80,
+        'Балл Русский язык': 80,
+        'Балл Математика': total - 160,
+        'Балл за индивидуальные достижения': 0,
+        'Сумма баллов': total,
+    }
+
+
+class AdmissionFixtures:
+    """Две программы и загрузка конкурсных списков через AdmissionIngestor"""
+
+    def setUp(self):
+        # Версии снимков и отчеты в кэше относятся к данным предыдущих тестов
+        cache.clear()
+        self.pm = EducationalProgram.objects.create(code='ПМ', name='Прикладная математика', seats=2)
+        self.ivt = EducationalProgram.objects.create(code='ИВТ', name='Информатика', seats=1)
+        self.partitions = AdmissionPartitionRouter()
+
+    def ingest(self, rows, **kwargs):
+        ingestor = AdmissionIngestor(**kwargs)
+        return ingestor.ingest(ingestor.normalize_frame(pd.DataFrame(rows)))
+
+    def stored(self, list_date):
+        """Заявления даты: {(ID абитуриента, код программы): (согласие, приоритет)}"""
+        return {
+            (applicant_id, code): (has_consent, priority)
+            for applicant_id, code, has_consent, priority in self.partitions.queryset(list_date).values_list(
+                'applicant_id', 'educational_program__code', 'has_consent', 'priority'
+            )
+        }
+
+
+class AdmissionTestCase(AdmissionFixtures, TestCase):
+
+    def ingest(self, rows, **kwargs):
+        # Версии снимков сбрасываются после фиксации транзакции загрузки
+        with self.captureOnCommitCallbacks(execute=True):
+            return super().ingest(rows, **kwargs)
+
+
+class IngestTests(AdmissionTestCase):
+
+    def test_repeated_ingest_updates_rows_in_place(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY, consent=False), list_row(2, 'ИВТ', FIRST_DAY)])
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY, consent=True, priority=2, total=250)])
+
+        self.assertEqual(self.stored(FIRST_DAY), {(1, 'ПМ'): (True, 2), (2, 'ИВТ'): (True, 1)})
+        self.assertEqual(Applicant.objects.get(id=1).total_score, 250)
+
+    def test_batches_cover_every_row(self):
+        stats = self.ingest([list_row(i, 'ПМ', FIRST_DAY) for i in range(1, 8)], batch_size=3)
+
+        self.assertEqual((stats['rows'], stats['batches']), (7, 3))
+        self.assertEqual(len(self.stored(FIRST_DAY)), 7)
+
+    def test_rows_are_routed_to_partitions_of_their_dates(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY), list_row(1, 'ПМ', SECOND_DAY), list_row(2, 'ИВТ', SECOND_DAY)])
+
+        self.assertEqual(self.partitions.dates(), [FIRST_DAY, SECOND_DAY])
+        self.assertEqual(set(self.stored(FIRST_DAY)), {(1, 'ПМ')})
+        self.assertEqual(set(self.stored(SECOND_DAY)), {(1, 'ПМ'), (2, 'ИВТ')})
+        self.assertFalse(self.partitions.queryset(date(2024, 8, 3)).exists())
+
+    def test_unknown_program_is_rejected(self):
+        with self.assertRaises(ValueError):
+            self.ingest([list_row(1, 'XX', FIRST_DAY)])
+
+
+class UpdateDataTests(AdmissionFixtures, TransactionTestCase):
+    """update_data сверяет данные в пуле потоков, поэтому его изменения фиксируются в базе"""
+
+    def tearDown(self):
+        # Очистка таблиц после теста не знает о таблицах-секциях
+        for list_date in self.partitions.dates():
+            self.partitions.drop(list_date)
+
+    def upload(self, rows):
+        content = pd.DataFrame(rows).to_csv(index=False).encode()
+        response = self.client.post('/update-data/', {'files': SimpleUploadedFile('list.csv', content)})
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def test_changed_date_moves_the_application(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY), list_row(2, 'ПМ', FIRST_DAY)])
+
+        result = self.upload([list_row(1, 'ПМ', SECOND_DAY), list_row(2, 'ПМ', FIRST_DAY, priority=3)])
+
+        self.assertEqual((result['added_count'], result['updated_count'], result['deleted_count']), (0, 2, 0))
+        self.assertEqual(self.stored(FIRST_DAY), {(2, 'ПМ'): (True, 3)})
+        self.assertEqual(self.stored(SECOND_DAY), {(1, 'ПМ'): (True, 1)})
+
+    def test_missing_applications_are_deleted(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY), list_row(2, 'ИВТ', FIRST_DAY)])
+
+        result = self.upload([list_row(2, 'ИВТ', FIRST_DAY), list_row(3, 'ПМ', FIRST_DAY)])
+
+        self.assertEqual((result['added_count'], result['updated_count'], result['deleted_count']), (1, 1, 1))
+        self.assertEqual(set(self.stored(FIRST_DAY)), {(2, 'ИВТ'), (3, 'ПМ')})
+
+
+@unittest.skipUnless(connection.vendor == 'postgresql', 'нужен PostgreSQL (переменные окружения POSTGRES_*)')
+class PostgresIngestTests(AdmissionTestCase):
+    """Загрузка через COPY и staging-таблицу на локально запущенном PostgreSQL"""
+
+    def test_copy_ingest_merges_batches(self):
+        rows = [list_row(i, 'ПМ', FIRST_DAY, consent=i % 2 == 0) for i in range(1, 11)]
+        # Повтор строки в другом пакете обновляет ее, а не дублирует
+        rows.append(list_row(1, 'ПМ', FIRST_DAY, consent=True, priority=4))
+
+        stats = self.ingest(rows, batch_size=4)
+
+        self.assertEqual((stats['method'], stats['rows'], stats['batches']), ('copy', 11, 3))
+        stored = self.stored(FIRST_DAY)
+        self.assertEqual(len(stored), 10)
+        self.assertEqual(stored[(1, 'ПМ')], (True, 4))
+
+    def test_copy_ingest_creates_native_partitions(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY), list_row(1, 'ПМ', SECOND_DAY)])
+
+        self.assertEqual(self.partitions.dates(), [FIRST_DAY, SECOND_DAY])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM pg_inherits WHERE inhparent = %s::regclass',
+                [self.partitions.parent_table]
+            )
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+
+class PartitionRouterTests(AdmissionTestCase):
+
+    def test_partition_list_is_read_once_per_router(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY)])
+        partitions = AdmissionPartitionRouter()
+        partitions.dates()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(partitions.dates(), [FIRST_DAY])
+
+    def test_created_and_dropped_partitions_refresh_the_list(self):
+        partitions = AdmissionPartitionRouter()
+        self.assertEqual(partitions.dates(), [])
+
+        partitions.ensure(SECOND_DAY)
+        self.assertEqual(partitions.dates(), [SECOND_DAY])
+
+        partitions.drop(SECOND_DAY)
+        self.assertEqual(partitions.dates(), [])
+
+
+class AdmissionResultTests(AdmissionTestCase):
+
+    def test_results_are_stored_with_the_ingest(self):
+        self.ingest([
+            list_row(1, 'ПМ', FIRST_DAY, total=270),
+            list_row(2, 'ПМ', FIRST_DAY, total=260),
+            list_row(3, 'ПМ', FIRST_DAY, total=250),
+            list_row(4, 'ПМ', FIRST_DAY, consent=False, total=280),
+            list_row(5, 'ИВТ', FIRST_DAY, consent=False),
+        ])
+
+        results = {result.program.code: result for result in AdmissionResult.objects.filter(calculation_date=FIRST_DAY)}
+        self.assertEqual((results['ПМ'].passing_score, results['ПМ'].enrolled_count, results['ПМ'].is_shortage), (260, 2, False))
+        self.assertEqual((results['ИВТ'].passing_score, results['ИВТ'].is_shortage), (None, True))
+        self.assertEqual(
+            list(results['ПМ'].enrolled_applicants.values_list('applicant_id', 'enrollment_order')),
+            [(1, 1), (2, 2)]
+        )
+        self.assertEqual(AdmissionCalculator.calculate_passing_scores(FIRST_DAY), {'ПМ': 260, 'ИВТ': 'НЕДОБОР'})
+
+    def test_missing_results_are_computed_once_on_read(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY), list_row(2, 'ПМ', FIRST_DAY, total=230)])
+        AdmissionResult.objects.all().delete()
+
+        self.assertEqual(AdmissionCalculator.calculate_passing_scores(FIRST_DAY)['ПМ'], 230)
+        self.assertEqual(AdmissionResult.objects.filter(calculation_date=FIRST_DAY).count(), 2)
+
+    def test_date_without_applications_stores_nothing(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY)])
+        empty_day = date(2030, 1, 1)
+
+        self.assertEqual(AdmissionCalculator.calculate_passing_scores(empty_day), {'ПМ': 'НЕДОБОР', 'ИВТ': 'НЕДОБОР'})
+        self.assertEqual(AdmissionCalculator.get_admitted_applicants(empty_day), {'ПМ': [], 'ИВТ': []})
+        self.assertFalse(AdmissionResult.objects.filter(calculation_date=empty_day).exists())
+
+    def test_page_of_a_date_without_applications_stores_nothing(self):
+        response = self.client.get('/calculate-passing-scores/?date=2030-01-01')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(AdmissionResult.objects.exists())
+
+    def test_date_without_applications_is_short_on_every_program(self):
+        response = self.client.post('/calculate-passing-scores/', {'date': '2030-01-01'})
+
+        self.assertEqual(response.json()['passing_scores'], {'ПМ': 'НЕДОБОР', 'ИВТ': 'НЕДОБОР'})
+        self.assertFalse(AdmissionResult.objects.exists())
+
+
+class ConditionalGetTests(AdmissionTestCase):
+
+    def test_unchanged_snapshot_answers_304(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY)])
+        url = f'/calculate-passing-scores/?date={FIRST_DAY}'
+
+        first = self.client.get(url)
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.has_header('Last-Modified'))
+
+        repeated = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(repeated.status_code, 304)
+
+    def test_ingest_changes_the_etag(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY)])
+        url = f'/calculate-passing-scores/?date={FIRST_DAY}'
+        etag = self.client.get(url)['ETag']
+
+        self.ingest([list_row(2, 'ПМ', FIRST_DAY)])
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class PassingScoreMatrixTests(AdmissionTestCase):
+
+    def test_matrix_has_a_column_per_date_with_applications(self):
+        self.ingest([
+            list_row(1, 'ПМ', FIRST_DAY, total=270), list_row(2, 'ПМ', FIRST_DAY, total=250),
+            list_row(1, 'ПМ', SECOND_DAY, total=270), list_row(3, 'ИВТ', SECOND_DAY, total=230),
+        ])
+
+        matrix = AdmissionCalculator.get_passing_score_matrix()
+
+        self.assertEqual(matrix['dates'], [FIRST_DAY, SECOND_DAY])
+        self.assertEqual(matrix['scores'], {'ПМ': [250, 'НЕДОБОР'], 'ИВТ': ['НЕДОБОР', 230]})
+        self.assertEqual(matrix['enrolled'], {'ПМ': [2, 1], 'ИВТ': [0, 1]})
+        self.assertEqual(AdmissionCalculator.get_passing_score_matrix(SECOND_DAY)['dates'], [SECOND_DAY])
+
+    def test_querying_an_empty_date_adds_no_column(self):
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY)])
+
+        AdmissionCalculator.calculate_passing_scores(date(2030, 1, 1))
+        self.client.get('/calculate-passing-scores/?date=2030-01-01')
+
+        self.assertEqual(AdmissionCalculator.get_passing_score_matrix()['dates'], [FIRST_DAY])
+        response = self.client.get('/passing-score-dynamics/')
+        self.assertEqual(response.json()['dates'], [FIRST_DAY.isoformat()])
+
+    def test_dates_loaded_without_results_are_computed(self):
+        self.ingest([list_row(1, 'ИВТ', FIRST_DAY, total=255)])
+        AdmissionResult.objects.all().delete()
+
+        matrix = AdmissionCalculator.get_passing_score_matrix()
+
+        self.assertEqual((matrix['dates'], matrix['scores']['ИВТ']), ([FIRST_DAY], [255]))
+
+
+class PurgeTests(AdmissionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY), list_row(2, 'ПМ', FIRST_DAY), list_row(2, 'ИВТ', SECOND_DAY)])
+
+    def test_purge_date_removes_the_date_and_applicants_left_without_applications(self):
+        AdmissionPurger().purge_date(FIRST_DAY)
+
+        self.assertEqual(AdmissionPartitionRouter().dates(), [SECOND_DAY])
+        self.assertEqual(list(Applicant.objects.values_list('id', flat=True)), [2])
+        self.assertFalse(AdmissionResult.objects.filter(calculation_date=FIRST_DAY).exists())
+        self.assertFalse(DailyAggregate.objects.filter(date=FIRST_DAY).exists())
+        # Данные другой даты не затрагиваются
+        self.assertEqual(self.stored(SECOND_DAY), {(2, 'ИВТ'): (True, 1)})
+        self.assertTrue(AdmissionResult.objects.filter(calculation_date=SECOND_DAY).exists())
+
+    def test_purge_all_keeps_only_the_programs(self):
+        AdmissionPurger().purge_all()
+
+        self.assertEqual(AdmissionPartitionRouter().dates(), [])
+        for model in (Applicant, DailyAggregate, AdmissionResult, EnrolledApplicant):
+            self.assertFalse(model.objects.exists(), model.__name__)
+        self.assertEqual(EducationalProgram.objects.count(), 2)
+
+
+class GridPagingTests(AdmissionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # Баллы 250, 249, 249, 248, 248, 247, 247: при равных баллах порядок задает ID
+        self.ingest([list_row(i, 'ПМ', FIRST_DAY, total=250 - i // 2) for i in range(1, 8)])
+
+    def pages(self, **params):
+        """Все страницы таблицы данных по три записи, по курсорам next_cursor"""
+        pages, cursor = [], ''
+        while True:
+            response = self.client.get('/visualize-data/grid/', {
+                'date': FIRST_DAY.isoformat(), 'limit': 3, 'cursor': cursor, **params
+            })
+            self.assertEqual(response.status_code, 200, response.content)
+            pages.append(response.json())
+            cursor = pages[-1]['next_cursor']
+            if not cursor:
+                return pages
+
+    def test_pages_follow_the_sort_without_gaps_or_repeats(self):
+        pages = self.pages()
+
+        self.assertEqual([len(page['data']) for page in pages], [3, 3, 1])
+        self.assertEqual([row['id'] for page in pages for row in page['data']], [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(pages[0]['total'], 7)
+
+    def test_ascending_sort_reverses_ties(self):
+        pages = self.pages(sort='total_score')
+
+        self.assertEqual([row['id'] for page in pages for row in page['data']], [7, 6, 5, 4, 3, 2, 1])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/visualize-data/grid/', {'date': FIRST_DAY.isoformat(), 'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, 400)
+
+
+class StreamingTests(AdmissionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingest([list_row(i, 'ПМ', FIRST_DAY, total=250 - i) for i in range(1, 6)])
+
+    async def test_asgi_stream_sends_the_cursor_batch_by_batch(self):
+        with mock.patch('university.streaming.STREAM_CHUNK_SIZE', 2):
+            response = await self.async_client.get('/visualize-data/', {'date': FIRST_DAY.isoformat(), 'format': 'ndjson'})
+            chunks = [chunk async for chunk in response.streaming_content]
+
+        # Асинхронный итератор: Django не собирает ответ в список
+        self.assertTrue(response.is_async)
+        self.assertEqual(len(chunks), 3)
+        rows = [json.loads(line) for line in b''.join(chunks).splitlines()]
+        self.assertEqual(sorted(row['id'] for row in rows), [1, 2, 3, 4, 5])
+
+    def test_wsgi_stream_is_a_json_array(self):
+        response = self.client.get('/visualize-data/', {'date': FIRST_DAY.isoformat(), 'format': 'json'})
+
+        self.assertFalse(response.is_async)
+        data = json.loads(b''.join(response.streaming_content))['data']
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0]['date'], '01.08.2024')
+
+
+class ReportJobChartTests(AdmissionTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.ingest([list_row(1, 'ПМ', FIRST_DAY), list_row(2, 'ИВТ', FIRST_DAY)])
+        self.queue = report_jobs.ReportJobQueue(workers=1, max_pending=4, finished_ttl=60)
+        # Задание возвращает график, полученный из принимающего процесса
+        pool = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(pool.shutdown)
+        for patcher in (
+            mock.patch.object(self.queue, '_pool', return_value=pool),
+            mock.patch.object(report_jobs, '_render_pdf_report', lambda report_date, chart: chart),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_chart_is_rendered_once_in_the_submitting_process(self):
+        with mock.patch.object(pdf_reporter, 'render_dynamics_chart', wraps=pdf_reporter.render_dynamics_chart) as render:
+            first = self.queue.submit_pdf_report(FIRST_DAY, 'v1').future.result(timeout=10)
+            second = self.queue.submit_pdf_report(SECOND_DAY, 'v1').future.result(timeout=10)
+
+        self.assertTrue(first.startswith(b'\x89PNG'))
+        self.assertEqual(second, first)
+        self.assertEqual(render.call_count, 1)
+
+    def test_known_job_is_submitted_without_a_chart(self):
+        job = self.queue.submit_pdf_report(FIRST_DAY, 'v1')
+        job.future.result(timeout=10)
+
+        with mock.patch.object(pdf_reporter.PDFReporter, 'dynamics_chart') as dynamics_chart:
+            self.assertIs(self.queue.submit_pdf_report(FIRST_DAY, 'v1'), job)
+        dynamics_chart.assert_not_called()
+
+    def test_report_uses_the_chart_it_is_given(self):
+        # Статистика отчета перечисляет все четыре программы
+        EducationalProgram.objects.create(code='ИТСС', name='Инфокоммуникационные технологии', seats=1)
+        EducationalProgram.objects.create(code='ИБ', name='Информационная безопасность', seats=1)
+        self.ingest([list_row(1, 'ИБ', SECOND_DAY)])
+        chart = pdf_reporter.PDFReporter().dynamics_chart()
+
+        with mock.patch.object(pdf_reporter.PDFReporter, 'dynamics_chart') as dynamics_chart:
+            pdf = pdf_reporter.PDFReporter().generate_report(SECOND_DAY, chart).getvalue()
+
+        dynamics_chart.assert_not_called()
+        self.assertTrue(pdf.startswith(b'%PDF'))
@@ -0,0 +1,110 @@
+"""
+Microbenchmark for building the /api/applicants response:
+ORM instances + hand-built dicts + jsonify versus column tuples
+(SQLAlchemy Core select) + the fast JSON encoder.
+
+    python benchmark_api.py 50000
+
+Runs against an in-memory SQLite database unless DATABASE_URL is set;
+rows for 2000-01-01 are added to that database and left in place.
+"""
+import os
+import sys
+import time
+import random
+from datetime import date
+
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from flask import jsonify
+from sqlalchemy import select
+
+from app.main import create_app
+from app.models import db, AdmissionData
+from app.controllers.main_controller import APPLICANT_COLUMNS
+from app.utils.streaming import dumps
+
+
+BENCHMARK_DATE = date(2000, 1, 1)
+
+
+def seed(count):
+    """Insert count synthetic rows for BENCHMARK_DATE"""
+    rng = random.Random(42)
+    rows = []
+    for applicant_id in range(1, count + 1):
+        physics, russian, math = rng.randint(40, 100), rng.randint(50, 100), rng.randint(45, 100)
+        achievements = rng.choice([0, 1, 2, 3, 5, 10])
+        rows.append({
+            'date': BENCHMARK_DATE,
+            'applicant_id': applicant_id,
+            'educational_program': rng.choice(['PM', 'IVT', 'ITSS', 'IB']),
+            'consent_given': rng.random() < 0.5,
+            'priority_op': rng.randint(1, 4),
+            'physics_ikt': physics,
+            'russian_lang': russian,
+            'math': math,
+            'individual_achievements': achievements,
+            'total_score': physics + russian + math + achievements
+        })
+    db.session.bulk_insert_mappings(AdmissionData, rows)
+    db.session.commit()
+
+
+def orm_response():
+    """Previous path: one ORM instance per row, attributes copied into a dict"""
+    applicants = AdmissionData.query.filter(AdmissionData.date == BENCHMARK_DATE).order_by(
+        AdmissionData.total_score.desc(), AdmissionData.id
+    ).all()
+    applicants_data = []
+    for applicant in applicants:
+        applicants_data.append({
+            'id': applicant.id,
+            'applicant_id': applicant.applicant_id,
+            'educational_program': applicant.educational_program,
+            'priority_op': applicant.priority_op,
+            'consent_given': applicant.consent_given,
+            'physics_ikt': applicant.physics_ikt,
+            'russian_lang': applicant.russian_lang,
+            'math': applicant.math,
+            'individual_achievements': applicant.individual_achievements,
+            'total_score': applicant.total_score
+        })
+    return jsonify({'applicants': applicants_data}).get_data()
+
+
+def tuple_response():
+    """Current path: column tuples zipped into dicts, serialized with the fast encoder"""
+    query = select(*[getattr(AdmissionData, column) for column in APPLICANT_COLUMNS]).where(
+        AdmissionData.date == BENCHMARK_DATE
+    ).order_by(AdmissionData.total_score.desc(), AdmissionData.id)
+    rows = db.session.execute(query).all()
+    return dumps({'applicants': [dict(zip(APPLICANT_COLUMNS, row)) for row in rows]})
+
+
+def measure(label, build):
+    db.session.expunge_all()
+    started = time.perf_counter()
+    body = build()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<26} {elapsed:6.2f} s, {len(body) / 1e6:.1f} MB")
+    return elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    app = create_app()
+
+    with app.app_context():
+        db.create_all()
+        if AdmissionData.query.filter(AdmissionData.date == BENCHMARK_DATE).count() < count:
+            seed(count)
+
+        print(f"Rows in response: {count}")
+        before = measure('ORM + jsonify', orm_response)
+        after = measure('tuples + fast JSON', tuple_response)
+        print(f"Speedup: {before / after:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -92,6 +92,18 @@ class DataGenerator:
             }
         }
 
+        # Распределения баллов: смесь равномерных распределений на интервалах
+        # (интервал выбирается по весу), общие для поштучной и векторной генерации
+        self.score_mixtures = {
+            'physics_score': (((40, 60), (61, 80), (81, 100)), (0.3, 0.5, 0.2)),
+            'russian_score': (((50, 70), (71, 90), (91, 100)), (0.2, 0.5, 0.3)),
+            'math_score': (((45, 65), (66, 85), (86, 100)), (0.3, 0.4, 0.3)),
+        }
+        self.achievement_scores = ((0, 1, 2, 3, 5, 10), (0.3, 0.2, 0.2, 0.15, 0.1, 0.05))
+
+        # Вероятности подать заявления на 1, 2, 3 и 4 программы
+        self.program_count_weights = (0.3, 0.3, 0.2, 0.2)
+
         # Глобальный словарь для хранения всех абитуриентов
         # Ключ: original_id, Значение: данные абитуриента
         self.all_applicants = {}
@@ -105,25 +117,18 @@ class DataGenerator:
     def generate_applicant(self, applicant_id: int) -> Dict:
         """Генерация данных одного абитуриента"""
         # Генерация баллов с разными распределениями для реалистичности
-        physics_score = random.choices(
-            [random.randint(40, 60), random.randint(61, 80), random.randint(81, 100)],
-            weights=[0.3, 0.5, 0.2]
-        )[0]
-
-        russian_score = random.choices(
-            [random.randint(50, 70), random.randint(71, 90), random.randint(91, 100)],
-            weights=[0.2, 0.5, 0.3]
-        )[0]
-
-        math_score = random.choices(
-            [random.randint(45, 65), random.randint(66, 85), random.randint(86, 100)],
-            weights=[0.3, 0.4, 0.3]
-        )[0]
-
-        achievement_score = random.choices(
-            [0, 1, 2, 3, 5, 10],
-            weights=[0.3, 0.2, 0.2, 0.15, 0.1, 0.05]
-        )[0]
+        scores = {}
+        for subject, (bounds, weights) in self.score_mixtures.items():
+            scores[subject] = random.choices(
+                [random.randint(low, high) for low, high in bounds],
+                weights=weights
+            )[0]
+        physics_score = scores['physics_score']
+        russian_score = scores['russian_score']
+        math_score = scores['math_score']
+
+        values, weights = self.achievement_scores
+        achievement_score = random.choices(values, weights=weights)[0]
 
         total_score = physics_score + russian_score + math_score + achievement_score
 
@@ -139,6 +144,91 @@ class DataGenerator:
             'active_date': None  # Дата, когда абитуриент активен
         }
 
+    @staticmethod
+    def draw_mixture(bounds, weights, count: int) -> np.ndarray:
+        """Баллы count абитуриентов из смеси: интервал по весам, балл равномерно в нем"""
+        component = np.random.choice(len(weights), size=count, p=weights)
+        low = np.array([low for low, _ in bounds])[component]
+        high = np.array([high for _, high in bounds])[component]
+        return np.random.randint(low, high + 1)
+
+    def generate_applicant_columns(self, count: int) -> Dict[str, np.ndarray]:
+        """
+        Векторная генерация count новых абитуриентов: каждый балл - столбец
+        numpy, вытянутый за один вызов, с теми же распределениями, что и
+        generate_applicant
+        """
+        columns = {'id': np.arange(self.next_id, self.next_id + count)}
+        self.next_id += count
+
+        for subject, (bounds, weights) in self.score_mixtures.items():
+            columns[subject] = self.draw_mixture(bounds, weights, count)
+
+        values, weights = self.achievement_scores
+        columns['achievement_score'] = np.random.choice(values, size=count, p=weights)
+
+        columns['total_score'] = (
+            columns['physics_score'] +
+            columns['russian_score'] +
+            columns['math_score'] +
+            columns['achievement_score']
+        )
+        return columns
+
+    def draw_applications(self, count: int) -> np.ndarray:
+        """
+        Программы и приоритеты count абитуриентов одной матрицей count x число
+        программ (0 - заявления нет). Число программ выбирается по весам,
+        программы - начало случайной перестановки, приоритет - место в ней,
+        как при random.sample и assign_priorities.
+        """
+        program_total = len(self.program_list)
+        num_programs = np.random.choice(
+            np.arange(1, program_total + 1), size=count, p=self.program_count_weights
+        )
+        # Место каждой программы в случайной перестановке своей строки
+        positions = np.argsort(np.argsort(np.random.random((count, program_total)), axis=1), axis=1)
+        return np.where(positions < num_programs[:, None], positions + 1, 0)
+
+    def generate_load_day(self, date: str, count: int) -> Dict[str, pd.DataFrame]:
+        """
+        Конкурсный день из count новых абитуриентов для нагрузочных тестов.
+
+        Все столбцы дня генерируются векторно, без цикла по абитуриентам;
+        результат воспроизводим при тех же зернах генераторов.
+        Возвращает {программа: DataFrame в формате save_to_csv}.
+        """
+        print(f"\nВекторная генерация дня {date}: {count} абитуриентов...")
+
+        columns = self.generate_applicant_columns(count)
+        priorities = self.draw_applications(count)
+        # На 04.08 много согласий
+        consent = (np.random.random(count) < (0.8 if date == '04.08' else 0.3)).astype(int)
+
+        day_frames = {}
+        for index, program in enumerate(self.program_list):
+            applied = priorities[:, index] > 0
+            day_frames[program] = pd.DataFrame({
+                'ID': columns['id'][applied],
+                'Согласие': consent[applied],
+                'Приоритет': priorities[applied, index],
+                'Балл_Физика/ИКТ': columns['physics_score'][applied],
+                'Балл_Русский': columns['russian_score'][applied],
+                'Балл_Математика': columns['math_score'][applied],
+                'Балл_ИД': columns['achievement_score'][applied],
+                'Сумма_баллов': columns['total_score'][applied]
+            })
+        return day_frames
+
+    def save_frames_to_csv(self, day_frames: Dict[str, pd.DataFrame], date: str):
+        """Сохранение дня, сгенерированного generate_load_day, в CSV файлы"""
+        os.makedirs('output', exist_ok=True)
+
+        for program, df in day_frames.items():
+            filename = f"output/{self.programs[program]['slug']}_{date.replace('.', '_')}.csv"
+            df.to_csv(filename, index=False, encoding='utf-8-sig')
+            print(f"    Сохранено: {filename} ({len(df)} записей)")
+
     def assign_priorities(self, programs: List[str]) -> Dict[str, int]:
         """Назначение приоритетов программам"""
         shuffled = programs.copy()
@@ -322,7 +412,9 @@ class DataGenerator:
             applicant = self.generate_applicant(self.next_id)
 
             # Определяем на сколько программ подает абитуриент (1-4)
-            num_programs = random.choices([1, 2, 3, 4], weights=[0.3, 0.3, 0.2, 0.2])[0]
+            num_programs = random.choices(
+                range(1, len(self.program_list) + 1), weights=self.program_count_weights
+            )[0]
 
             # Выбираем программы
             if num_programs == 1:
@@ -546,5 +638,16 @@ class DataGenerator:
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Генератор конкурсных списков')
+    parser.add_argument('--load-test', type=int, metavar='N',
+                        help='сгенерировать один день из N абитуриентов для нагрузочных тестов')
+    parser.add_argument('--date', default='04.08', help='дата дня нагрузочного теста (по умолчанию 04.08)')
+    args = parser.parse_args()
+
     generator = DataGenerator()
-    generator.generate_all()
+    if args.load_test:
+        generator.save_frames_to_csv(generator.generate_load_day(args.date, args.load_test), args.date)
+    else:
+        generator.generate_all()
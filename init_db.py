@@ -23,6 +23,8 @@ def init_database():
         print("- Applicant")
         print("- EducationalProgram") 
         print("- AdmissionData")
+        print("- DailyAggregate")
+        print("- SnapshotVersion")
         print("\nEducational programs initialized:")
         programs = EducationalProgram.query.all()
         for prog in programs:
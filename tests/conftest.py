@@ -0,0 +1,57 @@
+"""
+Shared fixtures: the application on a temporary SQLite database with the
+four educational programs, and a helper that uploads a competition list
+"""
+import pytest
+
+from app.main import create_app
+from app.models import db
+from app.utils import rank_index, snapshots
+from app.utils.data_generator import initialize_educational_programs
+
+
+def application(applicant_id, program, consent=True, priority=1, total_score=240):
+    """One row of a competition list as accepted by /update_database"""
+    return {
+        'applicant_id': applicant_id,
+        'educational_program': program,
+        'consent_given': consent,
+        'priority_op': priority,
+        'physics_ikt': 80,
+        'russian_lang': 80,
+        'math': total_score - 160,
+        'individual_achievements': 0,
+        'total_score': total_score
+    }
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path / "admission.db"}')
+    app = create_app()
+    app.config['TESTING'] = True
+
+    # Process-wide caches must not carry snapshots over from another database
+    snapshots._versions.clear()
+    rank_index._indexes.clear()
+
+    with app.app_context():
+        db.create_all()
+        initialize_educational_programs(db)
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def upload(client):
+    """Replace the list of a date through /update_database"""
+    def upload(target_date, rows):
+        response = client.post('/update_database', json={'date': target_date.isoformat(), 'data': rows})
+        assert response.status_code == 200, response.get_json()
+        return response
+    return upload
@@ -0,0 +1,72 @@
+"""
+Daily aggregates must always match a recount of the raw applications
+"""
+from datetime import date
+
+from sqlalchemy import func
+
+from app.models import db, AdmissionData
+from app.utils.aggregates import PRIORITIES, get_application_counts
+
+from conftest import application
+
+
+LIST_DATE = date(2024, 8, 1)
+
+
+def recount(target_date):
+    """Application counts of a date computed directly from AdmissionData"""
+    counts = {}
+    rows = db.session.query(
+        AdmissionData.educational_program,
+        AdmissionData.priority_op,
+        AdmissionData.consent_given,
+        func.count(AdmissionData.id)
+    ).filter(
+        AdmissionData.date == target_date
+    ).group_by(
+        AdmissionData.educational_program,
+        AdmissionData.priority_op,
+        AdmissionData.consent_given
+    )
+    for program, priority, consent, applications in rows:
+        program_counts = counts.setdefault(program, {
+            'applications': 0,
+            'with_consent': 0,
+            'by_priority': {p: 0 for p in PRIORITIES}
+        })
+        program_counts['applications'] += applications
+        program_counts['by_priority'][priority] += applications
+        if consent:
+            program_counts['with_consent'] += applications
+    return counts
+
+
+def stored_counts(target_date):
+    """Aggregated counts of the programs that have applications"""
+    return {code: counts for code, counts in get_application_counts(target_date).items() if counts['applications']}
+
+
+def test_aggregates_match_a_recount_after_each_upload(upload):
+    upload(LIST_DATE, [
+        application(i, 'PM' if i % 3 else 'IVT', consent=i % 2 == 0, priority=i % 4 + 1)
+        for i in range(1, 40)
+    ])
+    assert stored_counts(LIST_DATE) == recount(LIST_DATE)
+
+    # Dropped applicants, changed consent and priority, a new program
+    upload(LIST_DATE, [
+        application(i, 'IB' if i > 30 else 'PM', consent=i % 5 == 0, priority=i % 2 + 1)
+        for i in range(10, 45)
+    ])
+    assert stored_counts(LIST_DATE) == recount(LIST_DATE)
+
+
+def test_stats_read_counts_from_aggregates(client, upload):
+    upload(LIST_DATE, [application(1, 'PM'), application(2, 'PM', consent=False), application(3, 'IB')])
+
+    stats = {row['code']: row for row in client.get(f'/api/stats?date={LIST_DATE}').get_json()['stats']}
+
+    assert (stats['PM']['applications'], stats['PM']['with_consent']) == (2, 1)
+    assert (stats['IB']['applications'], stats['IB']['with_consent']) == (1, 1)
+    assert stats['IVT']['applications'] == 0
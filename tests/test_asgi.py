@@ -0,0 +1,98 @@
+"""
+The ASGI entry point serves Flask requests concurrently and awaits report jobs on the event loop
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+
+import flask
+from flask import Flask
+
+from app import asgi
+from app.utils.report_jobs import ReportJob
+
+
+async def call(application, method, path, query_string=b'', body=b''):
+    """Status, body and body messages of one request to an ASGI application"""
+    scope = {
+        'type': 'http', 'method': method, 'path': path, 'query_string': query_string,
+        'root_path': '', 'headers': [(b'content-length', str(len(body)).encode())], 'http_version': '1.1',
+    }
+
+    messages = [
+        {'type': 'http.request', 'body': body[:2], 'more_body': True},
+        {'type': 'http.request', 'body': body[2:], 'more_body': False},
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    response = {'body': b'', 'messages': 0}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+        else:
+            response['body'] += message.get('body', b'')
+            response['messages'] += 1
+
+    await application(scope, receive, send)
+    return response
+
+
+def test_requests_are_served_concurrently():
+    slow = Flask(__name__)
+
+    @slow.route('/slow')
+    def slow_view():
+        time.sleep(0.5)
+        return 'done'
+
+    async def four_requests():
+        application = asgi.ThreadedWsgiToAsgi(slow)
+        return await asyncio.gather(*[call(application, 'GET', '/slow') for _ in range(4)])
+
+    started = time.monotonic()
+    responses = asyncio.run(four_requests())
+
+    assert [response['body'] for response in responses] == [b'done'] * 4
+    assert time.monotonic() - started < 1.5
+
+
+def test_request_body_is_received_and_the_response_streamed():
+    echo = Flask(__name__)
+
+    @echo.route('/echo', methods=['POST'])
+    def echo_view():
+        data = flask.request.get_data()
+        return flask.Response(data[i:i + 2] for i in range(0, len(data), 2))
+
+    response = asyncio.run(call(asgi.ThreadedWsgiToAsgi(echo), 'POST', '/echo', body=b'abcdef'))
+
+    assert response['status'] == 200
+    assert response['body'] == b'abcdef'
+    # One message per produced chunk, then the end of the body
+    assert response['messages'] == 4
+
+
+def test_waiting_for_a_report_job_holds_no_thread(monkeypatch):
+    future = Future()
+    job = ReportJob('1f', ('pdf', '2024-08-01', 'v1'), future)
+    monkeypatch.setattr(asgi.report_jobs.reports, 'get', lambda job_id: job if job_id == '1f' else None)
+    # Every Flask view has to wait for the single request thread
+    monkeypatch.setattr(asgi, '_request_executor', asgi.ThreadPoolExecutor(max_workers=1))
+
+    async def wait_and_poll():
+        waiting = asyncio.ensure_future(call(asgi.application, 'GET', '/api/reports/1f', b'wait=5'))
+        await asyncio.sleep(0.1)
+        unknown = await call(asgi.application, 'GET', '/api/reports/2f')
+        assert not waiting.done()
+        threading.Timer(0.1, future.set_result, ['/tmp/report.pdf']).start()
+        return unknown, await waiting
+
+    unknown, waited = asyncio.run(wait_and_poll())
+
+    assert unknown['status'] == 404
+    assert waited['status'] == 200
+    assert b'"state":"done"' in waited['body']
@@ -0,0 +1,50 @@
+"""
+Read endpoints carry the snapshot ETag of their date and answer 304 while it is unchanged
+"""
+from datetime import date
+
+import pytest
+
+from conftest import application
+
+
+LIST_DATE = date(2024, 8, 1)
+
+
+@pytest.fixture
+def uploaded(upload):
+    # PM has 40 places: 45 consenting applicants fill it and set a passing score
+    upload(LIST_DATE, [application(i, 'PM', total_score=300 - i) for i in range(1, 46)])
+
+
+def test_passing_scores_serializes_accepted_applicants(client, uploaded):
+    response = client.get(f'/passing_scores?date={LIST_DATE}')
+
+    assert response.status_code == 200, response.get_json()
+    pm = response.get_json()['scores']['PM']
+    assert pm['score'] == 260
+    assert pm['accepted_applicants'][0] == {'id': 1, 'total_score': 299, 'priority': 1}
+    assert len(pm['accepted_applicants']) == 40
+
+
+@pytest.mark.parametrize('url', ['/passing_scores', '/api/stats', '/api/applicants/1/status'])
+def test_unchanged_snapshot_answers_304(client, uploaded, url):
+    first = client.get(f'{url}?date={LIST_DATE}')
+    assert first.status_code == 200, first.get_json()
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+
+    repeated = client.get(f'{url}?date={LIST_DATE}', headers={'If-None-Match': etag})
+    assert repeated.status_code == 304
+    assert repeated.headers['ETag'] == etag
+    assert repeated.data == b''
+
+
+def test_new_upload_changes_the_etag(client, upload, uploaded):
+    etag = client.get(f'/passing_scores?date={LIST_DATE}').headers['ETag']
+
+    upload(LIST_DATE, [application(1, 'PM')])
+
+    response = client.get(f'/passing_scores?date={LIST_DATE}', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
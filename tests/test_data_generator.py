@@ -0,0 +1,56 @@
+"""
+Sample competition lists meet every intersection size of the specification tables
+"""
+import random
+from datetime import date
+
+import pytest
+
+from app.utils.data_generator import (
+    APPLICANT_COUNTS, assign_memberships, exact_region_counts, generate_admission_data,
+    intersection_targets, verify_intersections
+)
+
+
+SPEC_DATES = sorted(APPLICANT_COUNTS)
+
+
+def memberships(regions):
+    """(applicant_id, program) pairs of assign_memberships"""
+    return [(aid, prog) for aid, progs in assign_memberships(regions) for prog in progs]
+
+
+@pytest.mark.parametrize('date_str', SPEC_DATES)
+def test_spec_tables_are_met_exactly(date_str):
+    random.seed(42)
+    targets = intersection_targets(date_str)
+    regions = exact_region_counts(targets)
+    pairs = memberships(regions)
+
+    verify_intersections(pairs, targets)
+    # Every applicant belongs to exactly one group of programs
+    assert sum(regions.values()) == len({aid for aid, _ in pairs})
+
+
+@pytest.mark.parametrize('date_str', SPEC_DATES)
+def test_generated_lists_have_the_spec_counts(date_str):
+    data = generate_admission_data(date.fromisoformat(date_str))
+
+    assert data.groupby('educational_program')['applicant_id'].nunique().to_dict() == APPLICANT_COUNTS[date_str]
+    assert not data.duplicated(['applicant_id', 'educational_program']).any()
+
+
+def test_inconsistent_table_is_rejected():
+    # 10 applicants on PM and IVT cannot fit into 5 applicants of PM
+    targets = {frozenset({'PM'}): 5, frozenset({'IVT'}): 20, frozenset({'PM', 'IVT'}): 10}
+
+    with pytest.raises(ValueError, match='exactly PM'):
+        exact_region_counts(targets)
+
+
+def test_mismatched_memberships_are_rejected():
+    targets = intersection_targets(SPEC_DATES[0])
+    pairs = memberships(exact_region_counts(targets))
+
+    with pytest.raises(ValueError, match='differ from the specification'):
+        verify_intersections(pairs[1:], targets)
@@ -0,0 +1,84 @@
+"""
+Competition and accepted lists download as CSV or XLSX with the allocation of their snapshot
+"""
+import csv
+import io
+from datetime import date
+
+import pytest
+from openpyxl import load_workbook
+
+from app.utils import exports
+from app.utils.exports import ACCEPTED_COLUMNS, COMPETITION_COLUMNS
+
+from conftest import application
+
+
+LIST_DATE = date(2024, 8, 1)
+
+
+@pytest.fixture
+def uploaded(upload):
+    # IB has 20 places: 21 consenting applicants fill it, applicant 22 did not consent
+    upload(LIST_DATE, [application(i, 'IB', total_score=301 - i) for i in range(1, 22)] + [
+        application(22, 'IB', consent=False, total_score=300),
+    ])
+
+
+def csv_rows(response):
+    return list(csv.reader(io.StringIO(response.get_data(as_text=True))))
+
+
+def test_competition_list_csv(client, uploaded):
+    response = client.get(f'/api/export/competition?date={LIST_DATE}&program=IB')
+
+    assert response.status_code == 200
+    assert response.headers['ETag']
+    header, *rows = csv_rows(response)
+    assert header == list(COMPETITION_COLUMNS)
+    assert len(rows) == 22
+    # Rank by total score; applicant 21 stays outside the 20 places
+    assert [row[:2] for row in rows[:3]] == [['1', '1'], ['2', '22'], ['3', '2']]
+    assert rows[-1][1] == '21' and rows[-1][10] == ''
+    assert {row[11] for row in rows} == {'281'}
+
+
+def test_header_is_sent_before_the_rank_index_is_built(client, uploaded, monkeypatch):
+    built = []
+    get_rank_index = exports.get_rank_index
+    monkeypatch.setattr(exports, 'get_rank_index', lambda target_date: built.append(target_date) or get_rank_index(target_date))
+
+    chunks = iter(client.get(f'/api/export/competition?date={LIST_DATE}').response)
+
+    assert next(chunks) == (','.join(COMPETITION_COLUMNS) + '\r\n').encode()
+    assert built == []
+    assert b''.join(chunks).count(b'\r\n') == 22
+    assert built == [LIST_DATE]
+
+
+def test_accepted_list_csv_holds_the_allocated_applicants(client, uploaded):
+    header, *rows = csv_rows(client.get(f'/api/export/accepted?date={LIST_DATE}'))
+
+    assert header == list(ACCEPTED_COLUMNS)
+    assert [row[2] for row in rows] == ['IB'] * 20
+    assert [int(row[1]) for row in rows] == list(range(1, 21))
+
+
+def test_xlsx_export_has_the_same_rows(client, uploaded):
+    response = client.get(f'/api/export/accepted?date={LIST_DATE}&format=xlsx')
+
+    assert response.status_code == 200
+    sheet = load_workbook(io.BytesIO(response.data), read_only=True).active
+    rows = list(sheet.iter_rows(values_only=True))
+    assert rows[0] == ACCEPTED_COLUMNS
+    assert rows[1] == (1, 1, 'IB', 1, 300, 281)
+    assert len(rows) == 21
+
+
+@pytest.mark.parametrize('url, status', [
+    ('/api/export/unknown', 404),
+    ('/api/export/accepted?format=pdf', 400),
+    ('/api/export/accepted?date=01.08.2024', 400),
+])
+def test_invalid_requests_are_rejected(client, url, status):
+    assert client.get(url).status_code == status
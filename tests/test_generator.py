@@ -0,0 +1,81 @@
+"""
+Generated competition days are reproducible under a seed and follow the configured distributions
+"""
+import random
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_generator.generator import DataGenerator
+
+
+DAY_SIZE = 50000
+
+
+def load_day(seed, count=DAY_SIZE):
+    random.seed(seed)
+    np.random.seed(seed)
+    return DataGenerator().generate_load_day('01.08', count)
+
+
+@pytest.fixture(scope='module')
+def day():
+    return load_day(42)
+
+
+def test_load_day_is_reproducible_with_a_seed():
+    first, second, other = load_day(7, 1000), load_day(7, 1000), load_day(8, 1000)
+
+    for program in first:
+        pd.testing.assert_frame_equal(first[program], second[program])
+    assert any(not first[program].equals(other[program]) for program in first)
+
+
+def test_program_counts_follow_the_weights(day):
+    program_counts = Counter(pd.concat(day.values())['ID'].value_counts())
+
+    for num_programs, weight in enumerate(DataGenerator().program_count_weights, 1):
+        assert program_counts[num_programs] / DAY_SIZE == pytest.approx(weight, abs=0.01)
+
+
+def test_priorities_are_a_permutation_prefix(day):
+    priorities = pd.concat(day.values()).groupby('ID')['Приоритет'].agg(sorted)
+
+    assert all(row == list(range(1, len(row) + 1)) for row in priorities)
+
+
+def test_scores_follow_their_mixtures(day):
+    applicants = pd.concat(day.values()).drop_duplicates('ID')
+    generator = DataGenerator()
+    columns = {'physics_score': 'Балл_Физика/ИКТ', 'russian_score': 'Балл_Русский', 'math_score': 'Балл_Математика'}
+
+    for subject, (bounds, weights) in generator.score_mixtures.items():
+        scores = applicants[columns[subject]]
+        for (low, high), weight in zip(bounds, weights):
+            assert scores.between(low, high).mean() == pytest.approx(weight, abs=0.01)
+
+    values, weights = generator.achievement_scores
+    shares = applicants['Балл_ИД'].value_counts(normalize=True)
+    for value, weight in zip(values, weights):
+        assert shares[value] == pytest.approx(weight, abs=0.01)
+    assert (applicants['Сумма_баллов'] == applicants[[*columns.values(), 'Балл_ИД']].sum(axis=1)).all()
+
+
+def test_new_applicants_of_a_following_day_use_the_program_count_weights():
+    random.seed(42)
+    generator = DataGenerator()
+    for applicant_id in range(1, 201):
+        applicant = generator.generate_applicant(applicant_id)
+        applicant['applications'] = {'ПМ': 1}
+        generator.all_applicants[applicant_id] = applicant
+    generator.day_applicants['01.08'] = set(generator.all_applicants)
+    generator.next_id = 201
+    # Everyone new applies to all four programs
+    generator.program_count_weights = (0, 0, 0, 1)
+
+    day_data = generator.update_day_from_previous('02.08', '01.08')
+
+    new_ids = Counter(applicant['id'] for rows in day_data.values() for applicant in rows if applicant['id'] > 200)
+    assert new_ids and set(new_ids.values()) == {4}
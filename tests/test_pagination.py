@@ -0,0 +1,46 @@
+"""
+/api/applicants pages follow (total score desc, id) through next_cursor without gaps or repeats
+"""
+from datetime import date
+
+import pytest
+
+from conftest import application
+
+
+LIST_DATE = date(2024, 8, 1)
+
+
+@pytest.fixture
+def uploaded(upload):
+    # Scores 250, 249, 249, 248, 248, 247, 247: ties are ordered by row id
+    upload(LIST_DATE, [application(i, 'PM', total_score=250 - i // 2) for i in range(1, 8)])
+
+
+def test_pages_cover_the_list_once(client, uploaded):
+    pages, cursor = [], ''
+    while True:
+        response = client.get(f'/api/applicants?date={LIST_DATE}&limit=3&cursor={cursor}')
+        assert response.status_code == 200, response.get_json()
+        pages.append(response.get_json())
+        cursor = pages[-1]['next_cursor']
+        if not cursor:
+            break
+
+    assert [len(page['applicants']) for page in pages] == [3, 3, 1]
+    applicants = [row for page in pages for row in page['applicants']]
+    assert [row['applicant_id'] for row in applicants] == [1, 2, 3, 4, 5, 6, 7]
+    assert [row['total_score'] for row in applicants] == [250, 249, 249, 248, 248, 247, 247]
+
+
+def test_stream_continues_after_the_cursor(client, uploaded):
+    cursor = client.get(f'/api/applicants?date={LIST_DATE}&limit=2').get_json()['next_cursor']
+
+    response = client.get(f'/api/applicants?date={LIST_DATE}&format=json&cursor={cursor}')
+
+    assert [row['applicant_id'] for row in response.get_json()['applicants']] == [3, 4, 5, 6, 7]
+
+
+@pytest.mark.parametrize('query', ['cursor=garbage', 'limit=0', 'format=xml'])
+def test_invalid_paging_is_rejected(client, query):
+    assert client.get(f'/api/applicants?date={LIST_DATE}&{query}').status_code == 400
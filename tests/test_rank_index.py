@@ -0,0 +1,48 @@
+"""
+The process-wide rank index cache is bounded and never goes back to an older snapshot
+"""
+from datetime import date, timedelta
+
+from app.utils.rank_index import RankIndex, RankIndexCache
+
+
+LIST_DATE = date(2024, 8, 1)
+
+
+def rank_index(target_date, version, applicant_ids=(1,)):
+    rows = [
+        (row_id, applicant_id, 'PM', 1, True, 240)
+        for row_id, applicant_id in enumerate(applicant_ids, start=1)
+    ]
+    return RankIndex(target_date, version, {'PM': 1}, rows)
+
+
+def test_least_recently_used_date_is_dropped():
+    cache = RankIndexCache(max_dates=2)
+    days = [LIST_DATE + timedelta(days=n) for n in range(3)]
+    for day in days[:2]:
+        cache.put(rank_index(day, f'{day}-v1'))
+
+    assert cache.get(days[0], f'{days[0]}-v1') is not None
+    cache.put(rank_index(days[2], f'{days[2]}-v1'))
+
+    assert cache.get(days[1], f'{days[1]}-v1') is None
+    assert cache.get(days[0], f'{days[0]}-v1') is not None
+    assert cache.get(days[2], f'{days[2]}-v1') is not None
+
+
+def test_date_without_applications_is_not_kept():
+    cache = RankIndexCache(max_dates=2)
+    cache.put(rank_index(LIST_DATE, None, applicant_ids=()))
+
+    assert cache.get(LIST_DATE, None) is None
+
+
+def test_slow_build_of_an_older_snapshot_does_not_replace_a_newer_one():
+    cache = RankIndexCache(max_dates=2)
+    newer = rank_index(LIST_DATE, '2024-08-01-v10')
+    cache.put(newer)
+    cache.put(rank_index(LIST_DATE, '2024-08-01-v9'))
+
+    assert cache.get(LIST_DATE, '2024-08-01-v10') is newer
+    assert cache.get(LIST_DATE, '2024-08-01-v9') is None
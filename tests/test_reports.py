@@ -0,0 +1,87 @@
+"""
+PDF report jobs: every rendering step, including the section-parallel layout, is a task of the one report pool
+"""
+import multiprocessing
+import time
+from datetime import date
+
+import pytest
+from pypdf import PdfReader
+
+from app.utils import report_generator, report_jobs, snapshots
+from app.utils.report_cache import reports as report_cache
+from app.utils.report_data import AdmissionReport
+from app.utils.report_jobs import ReportJobQueue
+
+from conftest import application
+
+
+LIST_DATE = date(2024, 8, 1)
+PROGRAMS = ('PM', 'IVT', 'ITSS', 'IB')
+
+
+@pytest.fixture
+def uploaded(upload):
+    upload(LIST_DATE, [
+        application(i, PROGRAMS[i % len(PROGRAMS)], total_score=300 - i % 50)
+        for i in range(1, 201)
+    ])
+
+
+@pytest.fixture
+def report_directory(tmp_path, monkeypatch):
+    """Report cache of this test only, in this process and in the spawned report workers"""
+    monkeypatch.setenv('REPORT_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(report_cache, 'directory', str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def in_process_worker(app, monkeypatch):
+    monkeypatch.setattr(report_jobs, '_worker_app', app)
+
+
+def test_sections_of_a_large_report_are_tasks_of_the_report_pool(app, uploaded, report_directory, monkeypatch):
+    monkeypatch.setenv('PARALLEL_REPORT_MIN_ROWS', '1')
+    queue = ReportJobQueue(workers=2)
+    tasks = []
+    run = queue._run
+    monkeypatch.setattr(queue, '_run', lambda func, *args: tasks.append(func.__name__) or run(func, *args))
+    try:
+        path = queue.submit_pdf_report(LIST_DATE, f'{LIST_DATE}-v1').future.result(timeout=120)
+        rendering_processes = multiprocessing.active_children()
+    finally:
+        queue._pool().shutdown()
+
+    assert tasks == ['_prepare_pdf_report'] + ['_render_program_section'] * len(PROGRAMS) + ['_finish_pdf_report']
+    assert len(rendering_processes) <= 2
+    pdf = PdfReader(path)
+    assert [item.title.rsplit(' ', 1)[1] for item in pdf.outline] == [f'({code})' for code in PROGRAMS]
+    # The outline points at the first page of every section
+    for item, code in zip(pdf.outline, PROGRAMS):
+        assert f'({code})' in pdf.pages[pdf.get_destination_page_number(item)].extract_text()
+
+
+@pytest.mark.parametrize('min_rows, split, in_sections', [
+    (5000, True, False),
+    (1, False, False),
+    (1, True, True),
+])
+def test_report_is_laid_out_in_sections_only_when_large_and_split(uploaded, report_directory, in_process_worker,
+                                                                  monkeypatch, min_rows, split, in_sections):
+    monkeypatch.setattr(report_generator, 'PARALLEL_REPORT_MIN_ROWS', min_rows)
+
+    prepared = report_jobs._prepare_pdf_report(LIST_DATE, f'{LIST_DATE}-v1', split)
+
+    assert isinstance(prepared, AdmissionReport) == in_sections
+    if not in_sections:
+        assert len(PdfReader(prepared).pages) > 0
+
+
+def test_job_renders_the_version_it_was_submitted_for(uploaded, report_directory, in_process_worker, monkeypatch):
+    # The snapshot cache of a worker process still holds the version before an upload
+    monkeypatch.setitem(snapshots._versions, LIST_DATE, (time.monotonic() + 60, (f'{LIST_DATE}-v1', None)))
+
+    path = report_jobs._prepare_pdf_report(LIST_DATE, f'{LIST_DATE}-v2', False)
+
+    assert path == report_cache.path('pdf', LIST_DATE, f'{LIST_DATE}-v2')
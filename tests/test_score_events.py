@@ -0,0 +1,53 @@
+"""
+Passing-score changes reach the event streams of every worker process through the database
+"""
+from datetime import date
+
+from app.utils.score_events import ScoreEventBroker, _ThreadSubscriber
+
+from conftest import application
+
+
+LIST_DATE = date(2024, 8, 1)
+
+
+def pending(subscriber):
+    events = []
+    while not subscriber.queue.empty():
+        events.append(subscriber.queue.get_nowait())
+    return events
+
+
+def test_every_worker_publishes_an_upload_made_by_any_of_them(app, upload):
+    # One broker per worker process, each with its own connected client
+    workers = [ScoreEventBroker(), ScoreEventBroker()]
+    clients = [broker.subscribe(_ThreadSubscriber()) for broker in workers]
+    for broker in workers:
+        assert broker.poll() == []
+
+    upload(LIST_DATE, [application(i, 'IB', total_score=300 - i) for i in range(1, 26)])
+
+    for broker, client in zip(workers, clients):
+        broker.poll()
+        [event] = pending(client)
+        assert event['date'] == LIST_DATE.isoformat()
+        assert event['version'] == f'{LIST_DATE.isoformat()}-v1'
+        assert event['changes']['IB'] == {'score': 280, 'accepted_count': 20}
+        assert event['changes']['PM'] == {'score': 'НЕДОБОР', 'accepted_count': 0}
+
+
+def test_events_carry_only_changed_programs(app, upload):
+    broker = ScoreEventBroker()
+    client = broker.subscribe(_ThreadSubscriber())
+    broker.poll()
+    upload(LIST_DATE, [application(1, 'PM'), application(2, 'IB')])
+    broker.poll()
+    pending(client)
+
+    assert broker.poll() == []
+
+    upload(LIST_DATE, [application(1, 'PM'), application(2, 'IB'), application(3, 'IB', total_score=250)])
+    broker.poll()
+
+    [event] = pending(client)
+    assert event['changes'] == {'IB': {'score': 'НЕДОБОР', 'accepted_count': 2}}
@@ -0,0 +1,50 @@
+"""
+Concurrent identical requests share one computation, and what they share is plain data
+"""
+import threading
+import time
+from datetime import date
+
+from app.controllers import main_controller
+from app.utils.singleflight import SingleFlight
+
+from conftest import application
+
+
+LIST_DATE = date(2024, 8, 1)
+
+
+def test_concurrent_callers_share_one_computation():
+    flight = SingleFlight()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8 and all(result is results[0] for result in results)
+
+
+def test_shared_passing_scores_hold_no_orm_rows(app, upload):
+    upload(LIST_DATE, [application(i, 'IB', total_score=290 - i) for i in range(1, 30)])
+
+    scores = main_controller.coalesced_passing_scores(LIST_DATE)
+
+    def plain(value):
+        if isinstance(value, dict):
+            return all(isinstance(key, str) and plain(item) for key, item in value.items())
+        if isinstance(value, list):
+            return all(plain(item) for item in value)
+        return value is None or isinstance(value, (str, int, float, bool))
+
+    assert plain(scores)
+    assert scores['IB']['accepted_applicants'][0] == {'id': 1, 'total_score': 289, 'priority': 1}